@@ -7,7 +7,7 @@
 
 
 from PyQt6 import QtCore, QtGui, QtWidgets
-from db_operation_functions import queryComposer
+from repository import REPOSITORY
 from functools import partial
 
 
@@ -54,9 +54,9 @@ class addTypeUIDialog(object):
         self.cancelButton.setText(_translate("Dialog", "Отмена"))
 
     def confirm_button_slot(self, Dialog: QtWidgets.QDialog = None):
-        qc = queryComposer("equipment_type")
-        qc.insert_query({"equipment_type_name": self.lineEdit.text()})
-        qc.close_connection()
+        REPOSITORY.insert(
+            "equipment_type", {"equipment_type_name": self.lineEdit.text()}
+        )
         Dialog.close()
 
 
@@ -176,13 +176,7 @@ class addEquipUIDIalog(object):
 
     # data loaders
     def equip_type_data_loader(self):
-        qc = queryComposer("equipment_type")
-        raw_equip_type_data = qc.select_query(order_opt=["equipment_type_id"])
-        qc.close_connection()
-        self.equip_type_id_ref = {
-            e_type["equipment_type_id"]: e_type["equipment_type_name"]
-            for e_type in raw_equip_type_data
-        }
+        self.equip_type_id_ref = REPOSITORY.names("equipment_type")
 
     # def manufact_data_loader(self):
     #     qc = queryComposer("equipment_manufacturer")
@@ -221,7 +215,6 @@ class addEquipUIDIalog(object):
             self.equipInstallationDateField.setEnabled(True)
 
     def confirm_button_slot(self, Dialog):
-        qc = queryComposer("equipment")
         values = {
             "equipment_name": self.equipNameField.text(),
             "equipment_designation": self.equipDesignationField.text(),
@@ -239,8 +232,7 @@ class addEquipUIDIalog(object):
             values[
                 "equipment_installation_date"
             ] = self.equipInstallationDateField.text()
-        qc.insert_query(values)
-        qc.close_connection()
+        REPOSITORY.insert("equipment", values)
         Dialog.close()
 
 
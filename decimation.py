@@ -0,0 +1,223 @@
+"""
+Прореживание временных рядов датчиков для построения графиков.
+Функции принимают массивы времени (datetime64 или float64 в секундах)
+и значений (float64) и возвращают индексы оставляемых точек
+"""
+
+import time
+
+import numpy as np
+
+MODES = ("fixed", "minmax", "lttb")
+
+
+def as_seconds(times: np.ndarray) -> np.ndarray:
+    """
+    Время в секундах float64, datetime64 переводится в секунды от epoch
+
+    :param times: массив времени
+    :type times: np.ndarray
+    :return: время в секундах
+    :rtype: np.ndarray
+    """
+    times = np.asarray(times)
+    if np.issubdtype(times.dtype, np.datetime64):
+        return times.astype("datetime64[us]").astype(np.int64) / 1e6
+    return times.astype(np.float64, copy=False)
+
+
+def fixed_interval(times: np.ndarray, step: float) -> np.ndarray:
+    """
+    Первая точка каждого интервала длиной step секунд (интервалы от epoch)
+
+    :param times: время по возрастанию
+    :type times: np.ndarray
+    :param step: длина интервала в секундах, при step <= 0 остаются все точки
+    :type step: float
+    :return: индексы оставляемых точек
+    :rtype: np.ndarray
+    """
+    seconds = as_seconds(times)
+    if step <= 0 or len(seconds) == 0:
+        return np.arange(len(seconds))
+    bins = np.floor(seconds / step).astype(np.int64)
+    keep = np.empty(len(bins), dtype=bool)
+    keep[0] = True
+    np.not_equal(bins[1:], bins[:-1], out=keep[1:])
+    return np.flatnonzero(keep)
+
+
+def fixed_interval_chunks(chunks, step: float):
+    """
+    fixed_interval для ряда, который приходит порциями (например из select_stream).
+    Интервалы отсчитываются от epoch, поэтому результат совпадает с обработкой
+    всего ряда целиком, а память ограничена одной порцией
+
+    :param chunks: порции (время, значения) по возрастанию времени
+    :type chunks: Iterable[tuple(np.ndarray, np.ndarray)]
+    :param step: длина интервала в секундах, при step <= 0 остаются все точки
+    :type step: float
+    :yield: прореженные время и значения порции
+    :rtype: Iterator[tuple(np.ndarray, np.ndarray)]
+    """
+    last_bin = None
+    for times, values in chunks:
+        times = np.asarray(times)
+        values = np.asarray(values)
+        if len(times) == 0:
+            continue
+        if step <= 0:
+            yield times, values
+            continue
+        bins = np.floor(as_seconds(times) / step).astype(np.int64)
+        keep = np.empty(len(bins), dtype=bool)
+        keep[0] = bins[0] != last_bin
+        np.not_equal(bins[1:], bins[:-1], out=keep[1:])
+        last_bin = bins[-1]
+        yield times[keep], values[keep]
+
+
+def _bucket_starts(seconds: np.ndarray, n_buckets: int) -> np.ndarray:
+    # равные по времени интервалы, пустые интервалы отбрасываются
+    edges = np.linspace(seconds[0], seconds[-1], n_buckets + 1)[:-1]
+    return np.unique(np.searchsorted(seconds, edges, side="left"))
+
+
+def minmax(times: np.ndarray, values: np.ndarray, n_buckets: int) -> np.ndarray:
+    """
+    Огибающая: минимум и максимум каждого из n_buckets интервалов времени.
+    Сохраняет выбросы, которые теряются при прореживании через интервал
+
+    :param times: время по возрастанию
+    :type times: np.ndarray
+    :param values: значения
+    :type values: np.ndarray
+    :param n_buckets: количество интервалов (около ширины графика в пикселях)
+    :type n_buckets: int
+    :return: индексы оставляемых точек по возрастанию
+    :rtype: np.ndarray
+    """
+    seconds = as_seconds(times)
+    values = np.asarray(values, dtype=np.float64)
+    n = len(seconds)
+    if n <= 2 * n_buckets:
+        return np.arange(n)
+    starts = _bucket_starts(seconds, n_buckets)
+    counts = np.diff(np.append(starts, n))
+    idx = np.arange(n)
+    result = []
+    for reduce, pick in (
+        (np.fmin.reduceat, np.minimum.reduceat),
+        (np.fmax.reduceat, np.minimum.reduceat),
+    ):
+        extreme = np.repeat(reduce(values, starts), counts)
+        # first index where the value equals the bucket extreme, n if none (all nan)
+        result.append(pick(np.where(values == extreme, idx, n), starts))
+    result = np.unique(np.concatenate(result))
+    return result[result < n]
+
+
+def lttb(times: np.ndarray, values: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: из каждого интервала берётся точка,
+    образующая наибольший треугольник с соседними выбранными точками
+
+    :param times: время по возрастанию
+    :type times: np.ndarray
+    :param values: значения
+    :type values: np.ndarray
+    :param n_out: количество оставляемых точек, не меньше 3
+    :type n_out: int
+    :return: индексы оставляемых точек по возрастанию
+    :rtype: np.ndarray
+    """
+    if n_out < 3:
+        raise ValueError("Invalid n_out param")
+    x = as_seconds(times)
+    y = np.asarray(values, dtype=np.float64)
+    n = len(x)
+    if n <= n_out:
+        return np.arange(n)
+    # nan would win every comparison, such points are never selected
+    y_fin = np.where(np.isfinite(y), y, np.nan)
+    # первая и последняя точки остаются всегда, остальные делятся на n_out - 2 интервала
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    result = np.empty(n_out, dtype=np.int64)
+    result[0] = 0
+    result[-1] = n - 1
+    prev = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            nxt_lo, nxt_hi = edges[i + 1], edges[i + 2]
+            avg_x = x[nxt_lo:nxt_hi].mean()
+            avg_y = np.nanmean(y_fin[nxt_lo:nxt_hi]) if nxt_hi > nxt_lo else y[-1]
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+        area = np.abs(
+            (x[prev] - avg_x) * (y_fin[lo:hi] - y_fin[prev])
+            - (x[prev] - x[lo:hi]) * (avg_y - y_fin[prev])
+        )
+        if np.isnan(area).all():
+            best = lo
+        else:
+            best = lo + int(np.nanargmax(area))
+        result[i + 1] = best
+        prev = best
+    return result
+
+
+def decimate(
+    times: np.ndarray,
+    values: np.ndarray,
+    mode: str = "lttb",
+    n_out: int = 1000,
+    step: float = 0,
+):
+    """
+    Прореживание ряда одним из способов MODES
+
+    :param times: время по возрастанию (datetime64 или секунды)
+    :type times: np.ndarray
+    :param values: значения
+    :type values: np.ndarray
+    :param mode: fixed, minmax или lttb, defaults to "lttb"
+    :type mode: str, optional
+    :param n_out: количество точек для minmax (интервалов) и lttb, defaults to 1000
+    :type n_out: int, optional
+    :param step: длина интервала для fixed в секундах, defaults to 0
+    :type step: float, optional
+    :return: прореженные время и значения
+    :rtype: tuple(np.ndarray, np.ndarray)
+    """
+    times = np.asarray(times)
+    values = np.asarray(values)
+    if mode == "fixed":
+        idx = fixed_interval(times, step)
+    elif mode == "minmax":
+        idx = minmax(times, values, n_out)
+    elif mode == "lttb":
+        idx = lttb(times, values, n_out)
+    else:
+        raise ValueError("Invalid mode param")
+    return times[idx], values[idx]
+
+
+if __name__ == "__main__":
+    n_points = 1_000_000
+    rng = np.random.default_rng(0)
+    start = np.datetime64("2024-01-01T00:00:00", "us")
+    times = start + np.arange(n_points).astype("timedelta64[s]")
+    values = np.cumsum(rng.normal(size=n_points))
+    for mode, kwargs in (
+        ("fixed", {"step": 15 * 60}),
+        ("minmax", {"n_out": 1000}),
+        ("lttb", {"n_out": 1000}),
+    ):
+        begin = time.perf_counter()
+        out_times, _ = decimate(times, values, mode=mode, **kwargs)
+        elapsed = time.perf_counter() - begin
+        print(
+            f"{mode:>6}: {n_points} -> {len(out_times)} points in {elapsed * 1000:.1f} ms"
+            f" ({n_points / elapsed / 1e6:.1f} M points/s)"
+        )
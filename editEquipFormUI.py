@@ -7,7 +7,7 @@
 
 
 from PyQt6 import QtCore, QtGui, QtWidgets
-from db_operation_functions import queryComposer
+from repository import REPOSITORY
 from functools import partial
 
 
@@ -54,9 +54,9 @@ class addTypeUIDialog(object):
         self.cancelButton.setText(_translate("Dialog", "Отмена"))
 
     def confirm_button_slot(self, Dialog: QtWidgets.QDialog = None):
-        qc = queryComposer("equipment_type")
-        qc.insert_query({"equipment_type_name": self.lineEdit.text()})
-        qc.close_connection()
+        REPOSITORY.insert(
+            "equipment_type", {"equipment_type_name": self.lineEdit.text()}
+        )
         Dialog.close()
 
 
@@ -191,26 +191,11 @@ class editEquipUIDIalog(object):
 
     # data loaders
     def equip_data_loader(self, equip_id):
-        qc = queryComposer("equipment")
-        raw_equip_data = qc.select_query(
-            conditions=[
-                {
-                    "key_name": "equipment_id",
-                    "comp_operand": "=",
-                    "key_value": equip_id,
-                }
-            ]
-        )
-        self.current_equipment_data = raw_equip_data[0]
+        # copy, the dialog edits it in place before update
+        self.current_equipment_data = REPOSITORY.get("equipment", equip_id).as_dict()
 
     def equip_type_data_loader(self):
-        qc = queryComposer("equipment_type")
-        raw_equip_type_data = qc.select_query(order_opt=["equipment_type_id"])
-        qc.close_connection()
-        self.equip_type_id_ref = {
-            e_type["equipment_type_id"]: e_type["equipment_type_name"]
-            for e_type in raw_equip_type_data
-        }
+        self.equip_type_id_ref = REPOSITORY.names("equipment_type")
 
     # def manufact_data_loader(self):
     #     qc = queryComposer("equipment_manufacturer")
@@ -274,7 +259,6 @@ class editEquipUIDIalog(object):
             self.equipInstallationDateField.setEnabled(True)
 
     def confirm_button_slot(self, Dialog):
-        qc = queryComposer("equipment")
         self.current_equipment_data["equipment_name"] = self.equipNameField.text()
         self.current_equipment_data[
             "equipment_designation"
@@ -299,8 +283,7 @@ class editEquipUIDIalog(object):
             self.current_equipment_data[
                 "equipment_installation_date"
             ] = self.equipInstallationDateField.text()
-        qc.update_query(self.current_equipment_data)
-        qc.close_connection()
+        REPOSITORY.update("equipment", self.current_equipment_data)
         Dialog.close()
 
 
@@ -5,7 +5,7 @@
 # WARNING: Any manual changes made to this file will be lost when pyuic6 is
 # run again.  Do not edit this file unless you know what you are doing.
 
-from db_operation_functions import queryComposer
+from repository import REPOSITORY
 from PyQt6 import QtCore, QtGui, QtWidgets
 from functools import partial
 import datetime
@@ -55,14 +55,13 @@ class addUnitUIDialog(object):
         self.cancelButton.setText(_translate("Dialog", "Отмена"))
 
     def confirm_button_slot(self, Dialog: QtWidgets.QDialog = None):
-        qc = queryComposer("sensor_unit")
-        qc.insert_query(
+        REPOSITORY.insert(
+            "sensor_unit",
             {
                 "unit_name": self.lineEdit.text(),
                 "sensor_type_id": self.current_sensor_type_id,
-            }
+            },
         )
-        qc.close_connection()
         Dialog.close()
 
 
@@ -109,9 +108,7 @@ class addTypeUIDialog(object):
         self.cancelButton.setText(_translate("Dialog", "Отмена"))
 
     def confirm_button_slot(self, Dialog: QtWidgets.QDialog = None):
-        qc = queryComposer("sensor_type")
-        qc.insert_query({"sensor_type_name": self.lineEdit.text()})
-        qc.close_connection()
+        REPOSITORY.insert("sensor_type", {"sensor_type_name": self.lineEdit.text()})
         Dialog.close()
 
 
@@ -227,47 +224,18 @@ class editSensorUIDIalog(object):
         self.sensorCancelButton.setText(_translate("Dialog", "Отмена"))
 
     def sensor_type_data_loader(self):
-        qct = queryComposer("sensor_type")
-        raw_type_data = qct.select_query(order_opt=["sensor_type_id"])
-        qct.close_connection()
-        self.sensor_type_id_ref = {
-            s_type["sensor_type_id"]: s_type["sensor_type_name"]
-            for s_type in raw_type_data
-        }
+        self.sensor_type_id_ref = REPOSITORY.names("sensor_type")
 
     def sensor_data_loader(self, sensor_id):
-        qc = queryComposer("sensor")
-        raw_sensor_data = qc.select_query(
-            conditions=[
-                {
-                    "key_name": "sensor_id",
-                    "comp_operand": "=",
-                    "key_value": sensor_id,
-                }
-            ]
-        )
-        self.current_sensor_data_values = raw_sensor_data[0]
+        # copy, the dialog edits it in place before update
+        self.current_sensor_data_values = REPOSITORY.get("sensor", sensor_id).as_dict()
 
     def sensor_unit_data_loader(self):
-        qcu = queryComposer("sensor_unit")
-        raw_sensor_unit_data = qcu.select_query(order_opt=["unit_id"])
-        self.sensor_unit_id_ref = {
-            unit["unit_id"]: unit["unit_name"] for unit in raw_sensor_unit_data
-        }
-        self.sensor_unit_type_rel = {}
-        for unit in raw_sensor_unit_data:
-            if unit["sensor_type_id"] not in self.sensor_unit_type_rel.keys():
-                self.sensor_unit_type_rel[unit["sensor_type_id"]] = []
-            self.sensor_unit_type_rel[unit["sensor_type_id"]].append(unit["unit_id"])
+        self.sensor_unit_id_ref = REPOSITORY.names("sensor_unit")
+        self.sensor_unit_type_rel = REPOSITORY.index("sensor_unit", "sensor_type_id")
 
     def equipment_data_loader(self):
-        qc = queryComposer("equipment")
-        raw_equipment_data = qc.select_query(order_opt=["equipment_id"])
-        qc.close_connection()
-        self.equipment_id_ref = {
-            equip["equipment_id"]: equip["equipment_name"]
-            for equip in raw_equipment_data
-        }
+        self.equipment_id_ref = REPOSITORY.names("equipment")
 
     def sensor_type_placeholder(self):
         self.sensor_type_data_loader()
@@ -317,8 +285,6 @@ class editSensorUIDIalog(object):
         self.equipmentComboBox.addItems(self.equipment_id_ref.values())
 
     def confirm_button_slot(self, Dialog: QtWidgets.QDialog = None):
-        qc = queryComposer("sensor")
-
         self.current_sensor_data_values["sensor_name"] = self.sensorNameField.text()
         self.current_sensor_data_values[
             "limit_mode_value"
@@ -344,8 +310,7 @@ class editSensorUIDIalog(object):
             self.equipment_id_ref.keys()
         )[self.equipmentComboBox.currentIndex()]
         # values["sensor_installation_date"] = str(datetime.date.today())
-        qc.update_query(self.current_sensor_data_values)
-        qc.close_connection()
+        REPOSITORY.update("sensor", self.current_sensor_data_values)
         # here inquisition
         Dialog.close()
 
@@ -0,0 +1,110 @@
+"""
+Живой график датчика на вкладке оборудования.
+Вынесен из main.py: matplotlib с бэкендом QtAgg загружается только
+при создании первого графика, а не при запуске окна
+"""
+
+import matplotlib
+import numpy as np
+
+matplotlib.use("QtAgg")
+
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
+from matplotlib.figure import Figure
+from matplotlib.patches import PathPatch
+from matplotlib.path import Path
+
+from sensor_buffer import sensorRingBuffer
+
+csfont = {"fontname": "Calibri"}
+matplotlib.rcParams["font.family"] = "Calibri"
+
+
+class MplCanvas(FigureCanvasQTAgg):
+    def __init__(
+        self,
+        parent=None,
+        width=5,
+        height=4,
+        dpi=100,
+        current_sensor_data=None,
+        buffer_capacity=4096,
+        blit=True,
+    ):
+        fig = Figure(figsize=(width, height), dpi=dpi)
+        self.axes = fig.add_subplot(111, autoscale_on=False)
+        self.axes.grid()
+        self.axes.set_xticks([0, 5, 10, 15, 20, 25, 30, 35, 40, 45, 50, 55, 60])
+        self.axes.set_xticklabels(
+            [0, 5, 10, 15, 20, 25, 30, 35, 40, 45, 50, 55, 60],
+        )
+        self.axes.axhline(
+            y=0.8 * current_sensor_data["limit_mode_value"],
+            linestyle="--",
+            color="red",
+            dashes=(5, 5),
+        )
+        self.axes.set_title(current_sensor_data["sensor_name"], fontdict=csfont)
+
+        self.axes.set_ylabel(
+            f"Значение, {current_sensor_data['unit_name']}",
+        )
+
+        self.axes.set_xlim(0, 60)
+        self.axes.set_ylim(0, current_sensor_data["limit_mode_value"])
+
+        # preallocated storage, the plot is redrawn from views of it
+        self.buffer = sensorRingBuffer(buffer_capacity)
+        self._x_data = np.zeros(buffer_capacity, dtype=np.float64)
+        (self.line,) = self.axes.plot([], [], "b", alpha=0.4, animated=blit)
+        # fill polygon: line points, then baseline points in reverse order,
+        # unused vertices are collapsed into the first one
+        self._fill_path = Path(np.zeros((2 * buffer_capacity + 1, 2)))
+        self.fill = PathPatch(
+            self._fill_path, facecolor="blue", alpha=0.2, linewidth=0, animated=blit
+        )
+        self.axes.add_patch(self.fill)
+        super(MplCanvas, self).__init__(fig)
+        # blit mode: grid, limit line and labels are rendered once into a cached
+        # background, each tick redraws only the line and the fill on top of it
+        self.blit_enabled = blit
+        self._background = None
+        if blit:
+            self.mpl_connect("draw_event", self._on_draw)
+
+    def _on_draw(self, event):
+        # full redraw (first show, resize) - snapshot the static background
+        self._background = self.copy_from_bbox(self.axes.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self):
+        self.axes.draw_artist(self.fill)
+        self.axes.draw_artist(self.line)
+
+    def update_plot(self, current_time: float):
+        """
+        Перерисовка графика по данным буфера
+
+        :param current_time: текущее время в секундах (epoch), от него считается ось x
+        :type current_time: float
+        """
+        n_points = len(self.buffer)
+        x_data = self._x_data[:n_points]
+        np.subtract(current_time, self.buffer.times, out=x_data)
+        y_data = self.buffer.values
+        self.line.set_data(x_data, y_data)
+        vertices = self._fill_path.vertices
+        vertices[:n_points, 0] = x_data
+        vertices[:n_points, 1] = y_data
+        vertices[n_points : 2 * n_points, 0] = x_data[::-1]
+        vertices[n_points : 2 * n_points, 1] = 0
+        vertices[2 * n_points :] = vertices[0] if n_points else 0
+        self.fill.stale = True
+        if not self.blit_enabled:
+            self.draw()
+        elif self._background is None:
+            self.draw_idle()
+        else:
+            self.restore_region(self._background)
+            self._draw_animated()
+            self.blit(self.axes.bbox)
@@ -0,0 +1,387 @@
+import datetime
+import json
+import logging
+import select
+import threading
+import time
+
+import numpy as np
+import psycopg2
+from PyQt6 import QtCore
+
+from decimation import as_seconds
+from db_operation_functions import (
+    queryComposer,
+    sqlExpr,
+    DEFAULT_CONNECTION_PARAMS,
+    SENSOR_LOG_CHANNEL_PREFIX,
+)
+
+
+def fetch_sensor_logs(sensor_id: int, since=None):
+    """
+    Значения датчика новее since (или за последнюю минуту) в виде массивов
+
+    :param sensor_id: код датчика
+    :type sensor_id: int
+    :param since: время последнего полученного значения, defaults to None
+    :type since: datetime.datetime, optional
+    :return: время (секунды от epoch, log_datetime считается UTC), значения (float64)
+        и время последнего значения
+    :rtype: tuple(np.ndarray, np.ndarray, datetime.datetime)
+    """
+    qc = queryComposer("sensor_logs")
+    cond = [
+        {
+            "key_name": "sensor_id",
+            "comp_operand": "=",
+            "key_value": sensor_id,
+        },
+        {
+            "key_name": "log_datetime",
+            "comp_operand": "<=",
+            "key_value": sqlExpr("now()"),
+        },
+    ]
+    if since is None:
+        cond.append(
+            {
+                "key_name": "log_datetime",
+                "comp_operand": ">=",
+                "key_value": sqlExpr("now()-interval '1 minute'"),
+            }
+        )
+    else:
+        cond.append(
+            {
+                "key_name": "log_datetime",
+                "comp_operand": ">",
+                "key_value": since,
+            }
+        )
+    try:
+        data = qc.select_columns(
+            columns=["log_datetime", "sensor_value"],
+            conditions=cond,
+            order_opt=["log_datetime"],
+        )
+    finally:
+        qc.close_connection()
+    times = data["log_datetime"]
+    timestamps = as_seconds(times)
+    values = data["sensor_value"]
+    last_log_datetime = times[-1].astype(datetime.datetime) if len(times) else since
+    return timestamps, values, last_log_datetime
+
+
+def decode_notify_payload(payload: str):
+    """
+    Разбор уведомления триггера sensor_logs: {"t": [epoch, ...], "v": [value, ...]}
+
+    :param payload: текст уведомления
+    :type payload: str
+    :return: время (epoch, float64) и значения (float64), null значения -> nan
+    :rtype: tuple(np.ndarray, np.ndarray)
+    """
+    data = json.loads(payload)
+    return (
+        np.asarray(data["t"], dtype=np.float64),
+        np.asarray(data["v"], dtype=np.float64),
+    )
+
+
+class sensorFetchSignals(QtCore.QObject):
+    # generation, timestamps, values, last log_datetime
+    fetched = QtCore.pyqtSignal(int, object, object, object)
+    failed = QtCore.pyqtSignal(int, str)
+
+
+class sensorFetchTask(QtCore.QRunnable):
+    """Запрос новых значений датчика, выполняется в пуле потоков"""
+
+    def __init__(self, signals, generation: int, sensor_id: int, since) -> None:
+        super().__init__()
+        self.signals = signals
+        self.generation = generation
+        self.sensor_id = sensor_id
+        self.since = since
+
+    def run(self):
+        try:
+            timestamps, values, last_log_datetime = fetch_sensor_logs(
+                self.sensor_id, self.since
+            )
+        except Exception as e:
+            self.signals.failed.emit(self.generation, str(e))
+            return
+        self.signals.fetched.emit(
+            self.generation, timestamps, values, last_log_datetime
+        )
+
+
+class sensorNotifyListener(QtCore.QThread):
+    """
+    Поток, который на отдельном подключении слушает канал уведомлений
+    текущего датчика (триггер notify_sensor_logs, см. db_init)
+    """
+
+    # sensor_id, payload (empty when the rows did not fit into NOTIFY)
+    notified = QtCore.pyqtSignal(int, str)
+    # True when LISTEN is active, False when the connection was lost
+    connection_changed = QtCore.pyqtSignal(bool)
+
+    def __init__(
+        self, conn_params: dict = None, reconnect_delay: float = 5.0, parent=None
+    ) -> None:
+        """
+        :param conn_params: параметры подключения, defaults to DEFAULT_CONNECTION_PARAMS
+        :type conn_params: dict, optional
+        :param reconnect_delay: пауза перед переподключением (с), defaults to 5.0
+        :type reconnect_delay: float, optional
+        """
+        super().__init__(parent)
+        self.conn_params = (
+            DEFAULT_CONNECTION_PARAMS if conn_params is None else conn_params
+        )
+        self.reconnect_delay = reconnect_delay
+        self._lock = threading.Lock()
+        self._sensor_id = None
+        self._stopped = False
+
+    def listen_sensor(self, sensor_id: int) -> None:
+        with self._lock:
+            self._sensor_id = int(sensor_id)
+
+    def stop(self) -> None:
+        self._stopped = True
+        self.wait()
+
+    def run(self):
+        while not self._stopped:
+            conn = None
+            try:
+                conn = psycopg2.connect(**self.conn_params)
+                conn.set_session(autocommit=True)
+                self.connection_changed.emit(True)
+                self._listen(conn)
+            except psycopg2.Error as e:
+                logging.warning(f"Sensor listener error: {e}")
+                self.connection_changed.emit(False)
+                deadline = time.monotonic() + self.reconnect_delay
+                while not self._stopped and time.monotonic() < deadline:
+                    time.sleep(0.1)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+    def _listen(self, conn) -> None:
+        listening = None
+        while not self._stopped:
+            with self._lock:
+                sensor_id = self._sensor_id
+            if sensor_id != listening:
+                cursor = conn.cursor()
+                if listening is not None:
+                    cursor.execute(f"unlisten {SENSOR_LOG_CHANNEL_PREFIX}{listening};")
+                if sensor_id is not None:
+                    cursor.execute(f"listen {SENSOR_LOG_CHANNEL_PREFIX}{sensor_id};")
+                cursor.close()
+                listening = sensor_id
+            # short timeout so sensor switches and stop() are picked up
+            if select.select([conn], [], [], 0.5) == ([], [], []):
+                continue
+            conn.poll()
+            while conn.notifies:
+                notify = conn.notifies.pop(0)
+                if notify.channel == f"{SENSOR_LOG_CHANNEL_PREFIX}{listening}":
+                    self.notified.emit(listening, notify.payload)
+
+
+class sensorPollWorker(QtCore.QObject):
+    """
+    Получение новых значений sensor_logs вне GUI потока.
+    Запрос выполняется в отдельном пуле потоков, результат приходит в GUI поток
+    сигналом data_ready. Если предыдущий запрос ещё не завершён, тик пропускается
+    (тики не копятся в очереди), количество пропусков хранится в dropped_ticks.
+
+    В режиме push значения приходят уведомлениями NOTIFY, а опрос остаётся
+    резервным: он начинается, если уведомлений нет дольше fallback_after,
+    и его период растёт вдвое после каждого пустого ответа (до max_fallback)
+    """
+
+    # timestamps (epoch, float64), values (float64)
+    data_ready = QtCore.pyqtSignal(object, object)
+
+    def __init__(
+        self,
+        interval: int = 100,
+        push: bool = False,
+        fallback_after: int = 5000,
+        max_fallback: int = 30000,
+        parent=None,
+    ) -> None:
+        """
+        :param interval: период опроса, мс, defaults to 100
+        :type interval: int, optional
+        :param push: получать значения через LISTEN/NOTIFY, defaults to False
+        :type push: bool, optional
+        :param fallback_after: тишина, после которой включается опрос, мс, defaults to 5000
+        :type fallback_after: int, optional
+        :param max_fallback: максимальный период резервного опроса, мс, defaults to 30000
+        :type max_fallback: int, optional
+        """
+        super().__init__(parent)
+        self.sensor_id = None
+        self.last_log_datetime = None
+        self.ticks = 0
+        self.dropped_ticks = 0
+        self.push = push
+        self.interval = interval
+        self.fallback_after = fallback_after
+        self.max_fallback = max_fallback
+        self._busy = False
+        # fetch requested while another one was running
+        self._refetch = False
+        # newest delivered timestamp, filters rows seen both in NOTIFY and a poll
+        self._last_time = -np.inf
+        # changes on every sensor switch, results of older requests are ignored
+        self._generation = 0
+        self.thread_pool = QtCore.QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(1)
+        self.signals = sensorFetchSignals(self)
+        self.signals.fetched.connect(self._on_fetched)
+        self.signals.failed.connect(self._on_failed)
+        self.timer = QtCore.QTimer(self)
+        self.timer.setInterval(fallback_after if push else interval)
+        self.timer.timeout.connect(self.tick)
+        self.listener = None
+        if push:
+            self.listener = sensorNotifyListener(parent=self)
+            self.listener.notified.connect(self._on_notify)
+            self.listener.connection_changed.connect(self._on_listener_state)
+
+    def set_sensor(self, sensor_id: int) -> None:
+        """Сменить датчик, накопленное состояние сбрасывается"""
+        self.sensor_id = int(sensor_id)
+        self.last_log_datetime = None
+        self._last_time = -np.inf
+        self._generation += 1
+        if self.listener is not None:
+            self.listener.listen_sensor(self.sensor_id)
+            if self.timer.isActive():
+                # the last minute is loaded once, further rows arrive by NOTIFY
+                self.request_fetch()
+
+    def start(self) -> None:
+        self.timer.start()
+        if self.listener is not None:
+            self.listener.start()
+            self.request_fetch()
+
+    def stop(self) -> None:
+        self.timer.stop()
+        if self.listener is not None:
+            self.listener.stop()
+        self.thread_pool.waitForDone()
+        logging.info(
+            f"Live polling stopped: {self.ticks} ticks, "
+            f"{self.dropped_ticks} dropped while DB was busy"
+        )
+
+    def tick(self) -> None:
+        self.ticks += 1
+        if self.sensor_id is None:
+            return
+        if self._busy:
+            self.dropped_ticks += 1
+            return
+        self._start_fetch()
+
+    def request_fetch(self) -> None:
+        """Запросить новые значения вне расписания, не теряя запрос при занятости"""
+        if self.sensor_id is None:
+            return
+        if self._busy:
+            self._refetch = True
+            return
+        self._start_fetch()
+
+    def _start_fetch(self) -> None:
+        self._busy = True
+        self._refetch = False
+        self.thread_pool.start(
+            sensorFetchTask(
+                self.signals,
+                self._generation,
+                self.sensor_id,
+                self.last_log_datetime,
+            )
+        )
+
+    def _deliver(self, timestamps: np.ndarray, values: np.ndarray) -> None:
+        new = timestamps > self._last_time
+        if not new.all():
+            timestamps = timestamps[new]
+            values = values[new]
+        if len(timestamps):
+            self._last_time = timestamps[-1]
+        self.data_ready.emit(timestamps, values)
+
+    def _on_fetched(self, generation, timestamps, values, last_log_datetime):
+        self._busy = False
+        if generation == self._generation:
+            self.last_log_datetime = last_log_datetime
+            if self.push and self.timer.isActive():
+                # adaptive fallback: back off while polls return nothing
+                step = (
+                    self.timer.interval() * 2
+                    if len(timestamps) == 0
+                    else self.timer.interval() // 2
+                )
+                self.timer.setInterval(max(self.interval, min(step, self.max_fallback)))
+            if len(timestamps) or not self.push:
+                self._deliver(timestamps, values)
+        if self._refetch:
+            self._start_fetch()
+
+    def _on_failed(self, generation, message):
+        self._busy = False
+        logging.warning(f"Live polling error: {message}")
+        if self._refetch:
+            self._start_fetch()
+
+    def _on_notify(self, sensor_id, payload):
+        if sensor_id != self.sensor_id:
+            return
+        # notifications work again, polling goes back to standby
+        self.timer.start(self.fallback_after)
+        if not payload or self.last_log_datetime is None:
+            # too many rows for one NOTIFY, or the initial load is not done yet
+            self.request_fetch()
+            return
+        timestamps, values = decode_notify_payload(payload)
+        # same bound as the poll (log_datetime <= now()): rows ahead of the clock
+        # would move _last_time forward and hide the real rows until then.
+        # log_datetime is a naive local time, epoch seconds treat it as UTC
+        current_time = (
+            datetime.datetime.now().replace(tzinfo=datetime.timezone.utc).timestamp()
+        )
+        accepted = timestamps <= current_time
+        if not accepted.all():
+            timestamps = timestamps[accepted]
+            values = values[accepted]
+        if not len(timestamps):
+            return
+        self._deliver(timestamps, values)
+        if np.isfinite(self._last_time):
+            self.last_log_datetime = datetime.datetime.fromtimestamp(
+                self._last_time, datetime.timezone.utc
+            ).replace(tzinfo=None)
+
+    def _on_listener_state(self, listening):
+        if listening:
+            self.timer.setInterval(self.fallback_after)
+            # rows inserted while the listener was down
+            self.request_fetch()
+        else:
+            self.timer.setInterval(self.interval)
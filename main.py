@@ -6,18 +6,21 @@
 # run again.  Do not edit this file unless you know what you are doing.
 import sys
 
+# first import: times the imports below when started with --profile-startup
+from startup_profiler import PROFILER
+
 import logging
-import matplotlib
 import datetime
 import time
-
-matplotlib.use("QtAgg")
+import numpy as np
 
 from PyQt6 import QtCore, QtGui, QtWidgets
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
-from matplotlib.figure import Figure
 
-from db_operation_functions import queryComposer
+from db_operation_functions import (
+    queryComposer,
+    SCHEMA_REGISTRY,
+    ensure_sensor_logs_partitions,
+)
 from addSensorUIForm import addSensorUIDIalog
 from addEquipFormUI import addEquipUIDIalog
 from editSensorUIForm import editSensorUIDIalog
@@ -26,12 +29,31 @@ from newEditRiskUIForm import editRiskUIDialog
 from newAddRiskUIForm import addRiskUIDialog
 from newEditPMUIForm import editMeasureUIDialog
 from newAddPMUIForm import addMeasureUIDialog
-from plot_opt import risk_matrix_, last_sensor_plot
-from risk_map_FORM import risk_map_report_UIDialog
+from live_update import sensorPollWorker
+from repository import REPOSITORY
+from table_models import columnTableModel, dict_columns
+from startup_loader import startupLoader
 
-csfont = {"fontname": "Calibri"}
-matplotlib.rcParams["font.family"] = "Calibri"
 logging.basicConfig(filename="example.log", level=logging.INFO)
+# live plot window, seconds
+LIVE_WINDOW_SECONDS = 60
+# live plot gets rows by LISTEN/NOTIFY (trigger from db_init) instead of polling
+LIVE_PUSH_MODE = False
+# target time from process start to the first paint of the main window, ms
+STARTUP_BUDGET_MS = 1500
+
+
+def lazy_plot_opt():
+    """
+    Модуль графиков plot_opt (matplotlib, mplcursors) загружается при первом
+    построении графика, а не при запуске окна
+
+    :return: модуль plot_opt
+    """
+    import live_canvas  # noqa: F401, sets the QtAgg backend before pyplot
+    import plot_opt
+
+    return plot_opt
 
 
 def value_to_interval_prob(value):
@@ -84,44 +106,6 @@ def value_to_interval_dmg(value):
         return "Очень высокий"
 
 
-class MplCanvas(FigureCanvasQTAgg):
-    def __init__(
-        self, parent=None, width=5, height=4, dpi=100, current_sensor_data=None
-    ):
-        fig = Figure(figsize=(width, height), dpi=dpi)
-        self.axes = fig.add_subplot(111, autoscale_on=False)
-        self.axes.grid()
-        self.axes.set_xticks([0, 5, 10, 15, 20, 25, 30, 35, 40, 45, 50, 55, 60])
-        self.axes.set_xticklabels(
-            [0, 5, 10, 15, 20, 25, 30, 35, 40, 45, 50, 55, 60],
-        )
-        self.axes.axhline(
-            y=0.8 * current_sensor_data["limit_mode_value"],
-            linestyle="--",
-            color="red",
-            dashes=(5, 5),
-        )
-        self.axes.set_title(current_sensor_data["sensor_name"], fontdict=csfont)
-
-        self.axes.set_ylabel(
-            f"Значение, {current_sensor_data['unit_name']}",
-        )
-
-        self.axes.set_xlim(0, 60)
-        self.axes.set_ylim(0, current_sensor_data["limit_mode_value"])
-
-        (self.line,) = self.axes.plot([], [], "b", alpha=0.4)
-        self.fill = self.axes.fill_between([], [], facecolor="blue", alpha=0.2)
-        self.axes.grid(animated=True)
-        super(MplCanvas, self).__init__(fig)
-
-    def update_plot(self, x_data, y_data):
-        self.line.set_data(x_data, y_data)
-        self.fill.remove()
-        self.fill = self.axes.fill_between(x_data, y_data, facecolor="blue", alpha=0.2)
-        self.draw()
-
-
 class deleteConfirmWindow(QtWidgets.QMessageBox):
     def __init__(self):
         super().__init__()
@@ -203,7 +187,7 @@ class Ui_MainWindow(object):
         self.risk_matrix_button = QtWidgets.QPushButton(parent=self.h_layout_widget_1)
         self.risk_matrix_button.setObjectName("risk_matrix_button")
         self.risk_matrix_button.setText("Матрица рисков")
-        self.risk_matrix_button.clicked.connect(risk_matrix_)
+        self.risk_matrix_button.clicked.connect(self.risk_matrix_button_slot)
         self.h_layout_widget_2.addWidget(self.risk_matrix_button)
 
         self.risk_map_report_button = QtWidgets.QPushButton(
@@ -214,33 +198,29 @@ class Ui_MainWindow(object):
         self.risk_map_report_button.clicked.connect(self.risk_map_report_button_slot)
         self.h_layout_widget_2.addWidget(self.risk_map_report_button)
 
-        self.risk_register_table_widget = QtWidgets.QTableWidget(
+        self.risk_register_model = columnTableModel(
+            [""] * 8,
+            [
+                None,
+                None,
+                lambda class_id: self.risk_class_id_ref[class_id],
+                None,
+                value_to_interval_prob,
+                value_to_interval_dmg,
+                None,
+                None,
+            ],
+        )
+        self.risk_register_table_widget = QtWidgets.QTableView(
             parent=self.risk_register_groupbox
         )
+        self.risk_register_table_widget.setModel(self.risk_register_model)
         self.risk_register_table_widget.setEditTriggers(
             QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers
         )
         # risk register table
         self.risk_register_table_widget.setGeometry(QtCore.QRect(5, 50, 1170, 390))
         self.risk_register_table_widget.setObjectName("risk_register_table_widget")
-        self.risk_register_table_widget.setColumnCount(8)
-        self.risk_register_table_widget.setRowCount(0)
-        item = QtWidgets.QTableWidgetItem()
-        self.risk_register_table_widget.setHorizontalHeaderItem(0, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.risk_register_table_widget.setHorizontalHeaderItem(1, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.risk_register_table_widget.setHorizontalHeaderItem(2, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.risk_register_table_widget.setHorizontalHeaderItem(3, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.risk_register_table_widget.setHorizontalHeaderItem(4, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.risk_register_table_widget.setHorizontalHeaderItem(5, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.risk_register_table_widget.setHorizontalHeaderItem(6, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.risk_register_table_widget.setHorizontalHeaderItem(7, item)
         self.risk_register_table_widget.setColumnWidth(0, 40)
         self.risk_register_table_widget.setColumnWidth(1, 285)
         self.risk_register_table_widget.setColumnWidth(2, 150)
@@ -249,7 +229,7 @@ class Ui_MainWindow(object):
         self.risk_register_table_widget.setColumnWidth(5, 100)
         self.risk_register_table_widget.setColumnWidth(6, 100)
         self.risk_register_table_widget.setColumnWidth(7, 150)
-        self.risk_register_table_widget.cellClicked.connect(self.risk_row_selector)
+        self.risk_register_table_widget.clicked.connect(self.risk_row_selector)
 
         # prevention measures table
         self.pm_groupbox = QtWidgets.QGroupBox(parent=self.risk_register_tab)
@@ -282,33 +262,31 @@ class Ui_MainWindow(object):
         self.pm_refresh_button.clicked.connect(self.pm_refresh_button_slot)
         self.button_field.addWidget(self.pm_refresh_button)
         # pm table itself
-        self.pm_table_widget = QtWidgets.QTableWidget(parent=self.pm_groupbox)
+        self.pm_model = columnTableModel(
+            [""] * 6,
+            [
+                None,
+                None,
+                None,
+                None,
+                lambda status: "Принята" if status else "Не принята",
+                None,
+            ],
+        )
+        self.pm_table_widget = QtWidgets.QTableView(parent=self.pm_groupbox)
+        self.pm_table_widget.setModel(self.pm_model)
         self.pm_table_widget.setEditTriggers(
             QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers
         )
         self.pm_table_widget.setGeometry(QtCore.QRect(5, 50, 1170, 220))
         self.pm_table_widget.setObjectName("pm_table_widget")
-        self.pm_table_widget.setColumnCount(6)
-        self.pm_table_widget.setRowCount(1)
-        item = QtWidgets.QTableWidgetItem()
-        self.pm_table_widget.setHorizontalHeaderItem(0, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.pm_table_widget.setHorizontalHeaderItem(1, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.pm_table_widget.setHorizontalHeaderItem(2, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.pm_table_widget.setHorizontalHeaderItem(3, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.pm_table_widget.setHorizontalHeaderItem(4, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.pm_table_widget.setHorizontalHeaderItem(5, item)
         self.pm_table_widget.setColumnWidth(0, 40)
         self.pm_table_widget.setColumnWidth(1, 80)
         self.pm_table_widget.setColumnWidth(2, 300)
         self.pm_table_widget.setColumnWidth(3, 300)
         self.pm_table_widget.setColumnWidth(4, 100)
         self.pm_table_widget.setColumnWidth(5, 100)
-        self.pm_table_widget.cellClicked.connect(self.pm_row_selector)
+        self.pm_table_widget.clicked.connect(self.pm_row_selector)
 
         self.tab_widget.addTab(self.risk_register_tab, "")
         # equipment tab
@@ -322,24 +300,18 @@ class Ui_MainWindow(object):
         self.graphical_view_frame.setObjectName("graphical_view_frame")
         self.graphical_view_layout = QtWidgets.QHBoxLayout(self.graphical_view_frame)
         # sensor table
-        self.sensor_table_widget = QtWidgets.QTableWidget(parent=self.equipment_tab)
+        self.sensor_model = columnTableModel([""] * 3)
+        self.sensor_table_widget = QtWidgets.QTableView(parent=self.equipment_tab)
+        self.sensor_table_widget.setModel(self.sensor_model)
         self.sensor_table_widget.setEditTriggers(
             QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers
         )
         self.sensor_table_widget.setGeometry(QtCore.QRect(10, 260, 400, 200))
         self.sensor_table_widget.setObjectName("sensor_table_widget")
-        self.sensor_table_widget.setColumnCount(3)
-        self.sensor_table_widget.setRowCount(0)
-        item = QtWidgets.QTableWidgetItem()
-        self.sensor_table_widget.setHorizontalHeaderItem(0, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.sensor_table_widget.setHorizontalHeaderItem(1, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.sensor_table_widget.setHorizontalHeaderItem(2, item)
         self.sensor_table_widget.setColumnWidth(0, 40)
         self.sensor_table_widget.setColumnWidth(1, 200)
         self.sensor_table_widget.setColumnWidth(2, 120)
-        self.sensor_table_widget.cellClicked.connect(self.sensor_row_selector)
+        self.sensor_table_widget.clicked.connect(self.sensor_row_selector)
 
         # sensor managment buttons
 
@@ -458,25 +430,22 @@ class Ui_MainWindow(object):
         self.h_layout_widget_3_2.addWidget(self.additional_button_3)
 
         # equip table
-        self.equip_table_widget = QtWidgets.QTableWidget(parent=self.equipment_tab)
+        self.equip_model = columnTableModel(
+            [""] * 3,
+            [None, None, lambda status: "Активен" if status else "Не активен"],
+        )
+        self.equip_table_widget = QtWidgets.QTableView(parent=self.equipment_tab)
+        self.equip_table_widget.setModel(self.equip_model)
         self.equip_table_widget.setEditTriggers(
             QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers
         )
         self.equip_table_widget.setGeometry(QtCore.QRect(10, 10, 400, 250))
         self.equip_table_widget.setWordWrap(True)
         self.equip_table_widget.setObjectName("equip_table_widget")
-        self.equip_table_widget.setColumnCount(3)
-        self.equip_table_widget.setRowCount(0)
-        item = QtWidgets.QTableWidgetItem()
-        self.equip_table_widget.setHorizontalHeaderItem(0, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.equip_table_widget.setHorizontalHeaderItem(1, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.equip_table_widget.setHorizontalHeaderItem(2, item)
         self.equip_table_widget.setColumnWidth(0, 40)
         self.equip_table_widget.setColumnWidth(1, 235)
         self.equip_table_widget.setColumnWidth(2, 80)
-        self.equip_table_widget.cellClicked.connect(self.equipment_row_selector)
+        self.equip_table_widget.clicked.connect(self.equipment_row_selector)
 
         # equip additional info gb
         self.equip_info_groupbox = QtWidgets.QGroupBox(parent=self.equipment_tab)
@@ -700,38 +669,31 @@ class Ui_MainWindow(object):
         self.tab_widget.addTab(self.equipment_tab, "")
         MainWindow.setCentralWidget(self.central_widget)
 
-        # data setup
-        self.risk_refresh_button_slot()
-        self.pm_refresh_button_slot()
-        self.equip_refresh_button_slot()
-        self.sensor_refresh_button_slot()
-
-        # graphical view
-        current_sensor_data = self.sensor_data_id_ref[int(self.current_sensor_id)]
-        current_sensor_data["unit_name"] = self.sensor_unit_id_ref[
-            current_sensor_data["unit_id"]
-        ]
-        self.canvas = MplCanvas(
-            parent=self.equipment_tab,
-            width=5,
-            height=4,
-            dpi=100,
-            current_sensor_data=current_sensor_data,
-        )
-        self.graphical_view_layout.addWidget(self.canvas)
-        self.timer = QtCore.QTimer()
-        self.timer.setInterval(100)
-        self.timer.timeout.connect(self.update_plot)
-        self.timer.start()
+        # sensor_logs are fetched in a worker thread, the GUI thread only draws,
+        # the worker starts when the canvas for the first sensor is created
+        self.live_worker = sensorPollWorker(interval=100, push=LIVE_PUSH_MODE)
+        self.live_worker.data_ready.connect(self.update_plot)
+        self.canvas = None
+
+        # data setup: loaders run on the thread pool, tabs are filled as data arrives
+        self.risk_register_tab.setEnabled(False)
+        self.equipment_tab.setEnabled(False)
+        self.startup_loader = startupLoader(parent=MainWindow)
+        self.startup_loader.add("risk", self.risk_data_loader)
+        self.startup_loader.add("pm", self.pm_data_loader)
+        self.startup_loader.add("equip", self.equip_data_loader)
+        self.startup_loader.add("sensor", self.sensor_data_loader)
+        self.startup_loader.loaded.connect(self.startup_data_slot)
+        self.startup_loader.failed.connect(self.startup_failed_slot)
+        self.startup_loader.watch_first_paint(MainWindow)
+        self.startup_loader.start()
 
         self.retranslateUi(MainWindow)
         self.tab_widget.setCurrentIndex(0)
-        self.risk_register_table_widget.cellDoubleClicked.connect(
-            self.risk_register_show_full_info
-        )
-        self.pm_table_widget.cellDoubleClicked.connect(self.pm_show_full_info)
-        self.sensor_table_widget.cellDoubleClicked.connect(self.sensor_show_full_info)
-        self.equip_table_widget.cellDoubleClicked.connect(self.equip_show_full_info)
+        self.risk_register_table_widget.doubleClicked.connect(self.show_full_info)
+        self.pm_table_widget.doubleClicked.connect(self.show_full_info)
+        self.sensor_table_widget.doubleClicked.connect(self.show_full_info)
+        self.equip_table_widget.doubleClicked.connect(self.show_full_info)
         QtCore.QMetaObject.connectSlotsByName(MainWindow)
 
     def retranslateUi(self, MainWindow):
@@ -742,39 +704,33 @@ class Ui_MainWindow(object):
         self.risk_edit_button.setText(_translate("MainWindow", "Изменить"))
         self.risk_delete_button.setText(_translate("MainWindow", "Удалить"))
         self.risk_refresh_button.setText(_translate("MainWindow", "Обновить"))
-        item = self.risk_register_table_widget.horizontalHeaderItem(0)
-        item.setText(_translate("MainWindow", "Код"))
-        item = self.risk_register_table_widget.horizontalHeaderItem(1)
-        item.setText(_translate("MainWindow", "Фактор риска"))
-        item = self.risk_register_table_widget.horizontalHeaderItem(2)
-        item.setText(_translate("MainWindow", "Класс"))
-        item = self.risk_register_table_widget.horizontalHeaderItem(3)
-        item.setText(_translate("MainWindow", "Описание"))
-        item = self.risk_register_table_widget.horizontalHeaderItem(4)
-        item.setText(_translate("MainWindow", "Вероятность"))
-        item = self.risk_register_table_widget.horizontalHeaderItem(5)
-        item.setText(_translate("MainWindow", "Ущерб"))
-        item = self.risk_register_table_widget.horizontalHeaderItem(6)
-        item.setText(_translate("MainWindow", "Риск"))
-        item = self.risk_register_table_widget.horizontalHeaderItem(7)
-        item.setText(_translate("MainWindow", "Отвественный"))
+        self.risk_register_model.set_headers(
+            [
+                _translate("MainWindow", "Код"),
+                _translate("MainWindow", "Фактор риска"),
+                _translate("MainWindow", "Класс"),
+                _translate("MainWindow", "Описание"),
+                _translate("MainWindow", "Вероятность"),
+                _translate("MainWindow", "Ущерб"),
+                _translate("MainWindow", "Риск"),
+                _translate("MainWindow", "Отвественный"),
+            ]
+        )
         self.pm_groupbox.setTitle(_translate("MainWindow", "Меры предосторожности"))
         self.pm_add_button.setText(_translate("MainWindow", "Добавить"))
         self.pm_edit_button.setText(_translate("MainWindow", "Изменить"))
         self.pm_delete_button.setText(_translate("MainWindow", "Удалить"))
         self.pm_refresh_button.setText(_translate("MainWindow", "Обновить"))
-        item = self.pm_table_widget.horizontalHeaderItem(0)
-        item.setText(_translate("MainWindow", "Код"))
-        item = self.pm_table_widget.horizontalHeaderItem(1)
-        item.setText(_translate("MainWindow", "Код риска"))
-        item = self.pm_table_widget.horizontalHeaderItem(2)
-        item.setText(_translate("MainWindow", "Название"))
-        item = self.pm_table_widget.horizontalHeaderItem(3)
-        item.setText(_translate("MainWindow", "Описание"))
-        item = self.pm_table_widget.horizontalHeaderItem(4)
-        item.setText(_translate("MainWindow", "Статус"))
-        item = self.pm_table_widget.horizontalHeaderItem(5)
-        item.setText(_translate("MainWindow", "Дата принятия"))
+        self.pm_model.set_headers(
+            [
+                _translate("MainWindow", "Код"),
+                _translate("MainWindow", "Код риска"),
+                _translate("MainWindow", "Название"),
+                _translate("MainWindow", "Описание"),
+                _translate("MainWindow", "Статус"),
+                _translate("MainWindow", "Дата принятия"),
+            ]
+        )
         self.tab_widget.setTabText(
             self.tab_widget.indexOf(self.risk_register_tab),
             _translate("MainWindow", "Реестр рисков"),
@@ -783,12 +739,13 @@ class Ui_MainWindow(object):
             self.tab_widget.indexOf(self.equipment_tab),
             _translate("MainWindow", "Оборудование"),
         )
-        item = self.sensor_table_widget.horizontalHeaderItem(0)
-        item.setText(_translate("MainWindow", "Код"))
-        item = self.sensor_table_widget.horizontalHeaderItem(1)
-        item.setText(_translate("MainWindow", "Датчик"))
-        item = self.sensor_table_widget.horizontalHeaderItem(2)
-        item.setText(_translate("MainWindow", "Тип"))
+        self.sensor_model.set_headers(
+            [
+                _translate("MainWindow", "Код"),
+                _translate("MainWindow", "Датчик"),
+                _translate("MainWindow", "Тип"),
+            ]
+        )
         self.equip_sensor_manage_groupbox.setTitle(
             _translate("MainWindow", "Управление")
         )
@@ -802,12 +759,13 @@ class Ui_MainWindow(object):
         self.equip_edit_button.setText(_translate("MainWindow", "Изменить"))
         self.equip_delete_button.setText(_translate("MainWindow", "Удалить"))
         self.equip_refresh_button.setText(_translate("MainWindow", "Обновить"))
-        item = self.equip_table_widget.horizontalHeaderItem(0)
-        item.setText(_translate("MainWindow", "Код"))
-        item = self.equip_table_widget.horizontalHeaderItem(1)
-        item.setText(_translate("MainWindow", "Оборудование"))
-        item = self.equip_table_widget.horizontalHeaderItem(2)
-        item.setText(_translate("MainWindow", "Статус"))
+        self.equip_model.set_headers(
+            [
+                _translate("MainWindow", "Код"),
+                _translate("MainWindow", "Оборудование"),
+                _translate("MainWindow", "Статус"),
+            ]
+        )
         self.equip_info_groupbox.setTitle(
             _translate("MainWindow", "Информация об оборудовании")
         )
@@ -841,20 +799,13 @@ class Ui_MainWindow(object):
 
     # data loaders
     def risk_data_loader(self):
-        qcr = queryComposer("risk_register")
-        raw_risk_data = qcr.select_query(order_opt=["risk_id"])
         self.risk_data_id_ref = {
-            risk["risk_id"]: {key: val for key, val in risk.items() if key != "risk_id"}
-            for risk in raw_risk_data
-        }
-        qcr.close_connection()
-        qcc = queryComposer("risk_classification")
-        raw_class_data = qcc.select_query()
-        qcc.close_connection()
-        self.risk_class_id_ref = {
-            r_class["risk_class_id"]: r_class["risk_class_name"]
-            for r_class in raw_class_data
+            risk_id: {
+                key: val for key, val in risk.as_dict().items() if key != "risk_id"
+            }
+            for risk_id, risk in REPOSITORY.records("risk_register").items()
         }
+        self.risk_class_id_ref = REPOSITORY.names("risk_classification")
 
     def pm_data_loader(self, risk_id: int = None):
         qcpm = queryComposer("prevention_measures")
@@ -882,123 +833,67 @@ class Ui_MainWindow(object):
             self.risk_pm_rel[pm["risk_id"]].append(pm["prevention_measure_id"])
 
     def equip_data_loader(self):
-        qce = queryComposer("equipment")
-        raw_equip_data = qce.select_query(
-            order_opt=["equipment_status DESC", "equipment_id"]
+        # same order as "equipment_status desc, equipment_id": nulls, true, false
+        status_order = {None: 0, True: 1, False: 2}
+        raw_equip_data = sorted(
+            REPOSITORY.all("equipment"),
+            key=lambda equip: (
+                status_order[equip.equipment_status],
+                equip.equipment_id,
+            ),
         )
         self.equip_data_id_ref = {
-            equip["equipment_id"]: {
-                key: val for key, val in equip.items() if key != "equipment_id"
+            equip.equipment_id: {
+                key: val
+                for key, val in equip.as_dict().items()
+                if key != "equipment_id"
             }
             for equip in raw_equip_data
         }
-        qce.close_connection()
-        qcet = queryComposer("equipment_type")
-        raw_equip_type_data = qcet.select_query(order_opt=["equipment_type_id"])
-        qcet.close_connection()
-        self.equip_type_id_ref = {
-            e_type["equipment_type_id"]: e_type["equipment_type_name"]
-            for e_type in raw_equip_type_data
-        }
+        self.equip_type_id_ref = REPOSITORY.names("equipment_type")
 
     def sensor_data_loader(self):
-        qcs = queryComposer("sensor")
-        data_sensor = qcs.select_query(order_opt=["sensor_id"])
-        self.sensor_data_id_ref = {
-            sensor["sensor_id"]: {
-                key: val for key, val in sensor.items() if key != "sensor_id"
-            }
-            for sensor in data_sensor
-        }
-        qcs.close_connection()
-
+        # sensors with type and unit names in one query
+        with queryComposer("sensor") as qcs:
+            self.sensor_data_id_ref = qcs.select_joined(
+                joins=[
+                    {
+                        "table": "sensor_type",
+                        "on": "sensor_type_id",
+                        "columns": ["sensor_type_name"],
+                    },
+                    {"table": "sensor_unit", "on": "unit_id", "columns": ["unit_name"]},
+                ]
+            )
         self.equip_sensor_rel = {}
-        for sensor in data_sensor:
-            if sensor["equipment_id"] not in self.equip_sensor_rel:
-                self.equip_sensor_rel[sensor["equipment_id"]] = []
-            self.equip_sensor_rel[sensor["equipment_id"]].append(sensor["sensor_id"])
-
-        qsst = queryComposer("sensor_type")
-        raw_sensor_type_data = qsst.select_query(order_opt=["sensor_type_id"])
-        qsst.close_connection()
-        self.sensor_type_id_ref = {
-            s_type["sensor_type_id"]: s_type["sensor_type_name"]
-            for s_type in raw_sensor_type_data
-        }
-        qcsu = queryComposer("sensor_unit")
-        raw_sensor_unit_data = qcsu.select_query(order_opt=["unit_id"])
-        qcsu.close_connection()
-        self.sensor_unit_id_ref = {
-            unit["unit_id"]: unit["unit_name"] for unit in raw_sensor_unit_data
-        }
-        self.sensor_unit_type_rel = {}
-        for unit in raw_sensor_unit_data:
-            if unit["sensor_type_id"] not in self.sensor_unit_type_rel.keys():
-                self.sensor_unit_type_rel[unit["sensor_type_id"]] = []
-            self.sensor_unit_type_rel[unit["sensor_type_id"]].append(unit["unit_id"])
+        for sensor_id, sensor in self.sensor_data_id_ref.items():
+            self.equip_sensor_rel.setdefault(sensor["equipment_id"], []).append(
+                sensor_id
+            )
 
     # table/info placeholder
     def risk_table_placeholder(self):
         """_summary_"""
 
-        self.risk_register_table_widget.setRowCount(len(self.risk_data_id_ref))
-        for idx, (key, el) in enumerate(self.risk_data_id_ref.items()):
-            self.risk_register_table_widget.setItem(
-                idx, 0, QtWidgets.QTableWidgetItem(str(key))
+        self.risk_register_model.set_columns(
+            dict_columns(
+                self.risk_data_id_ref,
+                [
+                    "risk_name",
+                    "risk_class_id",
+                    "risk_details",
+                    "risk_prob",
+                    "risk_damage",
+                    "risk_score",
+                    "risk_holder",
+                ],
             )
-            self.risk_register_table_widget.setItem(
-                idx, 1, QtWidgets.QTableWidgetItem(el["risk_name"])
-            )
-            self.risk_register_table_widget.setItem(
-                idx,
-                2,
-                QtWidgets.QTableWidgetItem(self.risk_class_id_ref[el["risk_class_id"]]),
-            )
-            self.risk_register_table_widget.setItem(
-                idx, 3, QtWidgets.QTableWidgetItem(el["risk_details"])
-            )
-            self.risk_register_table_widget.setItem(
-                idx,
-                4,
-                QtWidgets.QTableWidgetItem(value_to_interval_prob(el["risk_prob"])),
-            )
-            self.risk_register_table_widget.setItem(
-                idx,
-                5,
-                QtWidgets.QTableWidgetItem(value_to_interval_dmg(el["risk_damage"])),
-            )
-            self.risk_register_table_widget.setItem(
-                idx, 6, QtWidgets.QTableWidgetItem(str(el["risk_score"]))
-            )
-            self.risk_register_table_widget.setItem(
-                idx, 7, QtWidgets.QTableWidgetItem(el["risk_holder"])
-            )
-        self.current_risk_id = self.risk_register_table_widget.itemAt(0, 0).text()
+        )
+        self.current_risk_id = self.risk_register_model.cell_text(0, 0)
         self.risk_register_table_widget.selectRow(0)
 
-    def risk_register_show_full_info(self, row, col):
-        cell_text = self.risk_register_table_widget.item(row, col).text()
-        popup = QtWidgets.QMessageBox()
-        popup.setText(cell_text)
-        popup.setWindowTitle("Информация ячейки")
-        popup.exec()
-
-    def pm_show_full_info(self, row, col):
-        cell_text = self.pm_table_widget.item(row, col).text()
-        popup = QtWidgets.QMessageBox()
-        popup.setText(cell_text)
-        popup.setWindowTitle("Информация ячейки")
-        popup.exec()
-
-    def equip_show_full_info(self, row, col):
-        cell_text = self.equip_table_widget.item(row, col).text()
-        popup = QtWidgets.QMessageBox()
-        popup.setText(cell_text)
-        popup.setWindowTitle("Информация ячейки")
-        popup.exec()
-
-    def sensor_show_full_info(self, row, col):
-        cell_text = self.sensor_table_widget.item(row, col).text()
+    def show_full_info(self, index: QtCore.QModelIndex):
+        cell_text = index.model().cell_text(index.row(), index.column())
         popup = QtWidgets.QMessageBox()
         popup.setText(cell_text)
         popup.setWindowTitle("Информация ячейки")
@@ -1012,102 +907,72 @@ class Ui_MainWindow(object):
         """
         if int(risk_id) not in self.risk_pm_rel.keys():
             logging.warning("No element for this risk")
-            self.pm_table_widget.setRowCount(0)
+            self.pm_model.clear()
             self.pm_edit_button.setEnabled(False)
             self.pm_delete_button.setEnabled(False)
             return
-        self.pm_table_widget.setRowCount(len(self.risk_pm_rel[int(risk_id)]))
         self.pm_edit_button.setEnabled(True)
         self.pm_delete_button.setEnabled(True)
 
-        for idx, key in enumerate(self.risk_pm_rel[int(risk_id)]):
-            el = self.pm_data_id_ref[key]
-            self.pm_table_widget.setItem(idx, 0, QtWidgets.QTableWidgetItem(str(key)))
-            self.pm_table_widget.setItem(
-                idx, 1, QtWidgets.QTableWidgetItem(str(el["risk_id"]))
-            )
-            self.pm_table_widget.setItem(
-                idx, 2, QtWidgets.QTableWidgetItem(el["prevention_measure_name"])
-            )
-            self.pm_table_widget.setItem(
-                idx, 3, QtWidgets.QTableWidgetItem(el["prevention_measure_details"])
-            )
-            self.pm_table_widget.setItem(
-                idx,
-                4,
-                QtWidgets.QTableWidgetItem(
-                    "Принята" if el["prevention_measure_status"] else "Не принята"
-                ),
-            )
-            self.pm_table_widget.setItem(
-                idx,
-                5,
-                QtWidgets.QTableWidgetItem(
+        pm_ids = self.risk_pm_rel[int(risk_id)]
+        columns = dict_columns(
+            self.pm_data_id_ref,
+            [
+                "risk_id",
+                "prevention_measure_name",
+                "prevention_measure_details",
+                "prevention_measure_status",
+            ],
+            pm_ids,
+        )
+        # the date is shown only for accepted measures
+        columns.append(
+            [
+                (
                     str(el["prevention_measure_date"])
                     if el["prevention_measure_status"]
                     else "-"
-                ),
-            )
-        self.current_pm_id = self.pm_table_widget.itemAt(0, 0).text()
+                )
+                for el in (self.pm_data_id_ref[key] for key in pm_ids)
+            ]
+        )
+        self.pm_model.set_columns(columns)
+        self.current_pm_id = self.pm_model.cell_text(0, 0)
         self.pm_table_widget.selectRow(0)
 
     def equip_table_placeholder(self):
-        self.equip_table_widget.setRowCount(len(self.equip_data_id_ref))
-        for idx, (key, el) in enumerate(self.equip_data_id_ref.items()):
-            self.equip_table_widget.setItem(
-                idx, 0, QtWidgets.QTableWidgetItem(str(key))
-            )
-            self.equip_table_widget.setItem(
-                idx, 1, QtWidgets.QTableWidgetItem(el["equipment_name"])
-            )
-            self.equip_table_widget.setItem(
-                idx,
-                2,
-                QtWidgets.QTableWidgetItem(
-                    "Активен" if el["equipment_status"] else "Не активен"
-                ),
-            )
-        self.current_equip_id = self.equip_table_widget.itemAt(0, 0).text()
+        self.equip_model.set_columns(
+            dict_columns(self.equip_data_id_ref, ["equipment_name", "equipment_status"])
+        )
+        self.current_equip_id = self.equip_model.cell_text(0, 0)
         self.equip_table_widget.selectRow(0)
 
     def sensor_table_placeholder(self, equipment_id: int):
         if int(equipment_id) not in self.equip_sensor_rel.keys():
             logging.warning("No sensor for this equip")
-            self.sensor_table_widget.setRowCount(0)
+            self.sensor_model.clear()
             self.sensor_edit_button.setEnabled(False)
             self.sensor_delete_button.setEnabled(False)
             return
-        self.sensor_table_widget.setRowCount(
-            len(self.equip_sensor_rel[int(equipment_id)])
-        )
         self.sensor_edit_button.setEnabled(True)
         self.sensor_delete_button.setEnabled(True)
 
-        for idx, key in enumerate(self.equip_sensor_rel[int(equipment_id)]):
-            tmp_sensor_inf = self.sensor_data_id_ref[key]
-            self.sensor_table_widget.setItem(
-                idx, 0, QtWidgets.QTableWidgetItem(str(key))
-            )
-
-            self.sensor_table_widget.setItem(
-                idx, 1, QtWidgets.QTableWidgetItem(tmp_sensor_inf["sensor_name"])
-            )
-            self.sensor_table_widget.setItem(
-                idx,
-                2,
-                QtWidgets.QTableWidgetItem(
-                    self.sensor_type_id_ref[tmp_sensor_inf["sensor_type_id"]]
-                ),
+        self.sensor_model.set_columns(
+            dict_columns(
+                self.sensor_data_id_ref,
+                ["sensor_name", "sensor_type_name"],
+                self.equip_sensor_rel[int(equipment_id)],
             )
-        self.current_sensor_id = self.sensor_table_widget.itemAt(0, 0).text()
+        )
+        self.current_sensor_id = self.sensor_model.cell_text(0, 0)
         self.sensor_table_widget.selectRow(0)
 
     def sensor_GB_placeholder(self):
         tmp = self.sensor_data_id_ref[int(self.current_sensor_id)]
         self.sensor_name_field.setText(tmp["sensor_name"])
         self.limit_val_field.setText(str(tmp["limit_mode_value"]))
-        self.sensor_type_field.setText(self.sensor_type_id_ref[tmp["sensor_type_id"]])
-        self.unit_field.setText(self.sensor_unit_id_ref[tmp["unit_id"]])
+        self.sensor_type_field.setText(tmp["sensor_type_name"])
+        self.unit_field.setText(tmp["unit_name"])
         self.sensor_installation_date_field.setText(
             str(tmp["sensor_installation_date"])
         )
@@ -1140,17 +1005,74 @@ class Ui_MainWindow(object):
 
     def equip_data_placeholder(self):
         self.equip_table_placeholder()
-        self.current_equip_id = self.equip_table_widget.item(0, 0).text()
+        self.current_equip_id = self.equip_model.cell_text(0, 0)
         self.equip_table_widget.selectRow(0)
         self.equip_GB_placeholder()
 
     def sensor_data_placeholder(self):
         self.sensor_table_placeholder(self.current_equip_id)
         if int(self.current_equip_id) in self.equip_sensor_rel.keys():
-            self.current_sensor_id = self.sensor_table_widget.item(0, 0).text()
+            self.current_sensor_id = self.sensor_model.cell_text(0, 0)
             self.sensor_table_widget.selectRow(0)
             self.sensor_GB_placeholder()
 
+    def startup_data_slot(self, name: str):
+        """
+        Заполнение вкладок по мере фоновой загрузки данных при запуске
+
+        :param name: название загруженной группы данных (см. setupUi)
+        :type name: str
+        """
+        loader = self.startup_loader
+        if name == "risk":
+            self.risk_table_placeholder()
+        if name in ["risk", "pm"] and loader.loaded_all("risk", "pm"):
+            self.pm_table_placeholder(self.current_risk_id)
+            self.risk_register_tab.setEnabled(True)
+            logging.info(f"Startup: risk tab ready after {loader.elapsed_ms():.0f} ms")
+        if name == "equip":
+            self.equip_data_placeholder()
+        if name in ["equip", "sensor"] and loader.loaded_all("equip", "sensor"):
+            self.sensor_data_placeholder()
+            if int(self.current_equip_id) in self.equip_sensor_rel:
+                self.canvas_placeholder()
+            # the worker idles until a sensor is set by canvas_placeholder
+            self.live_worker.start()
+            self.equipment_tab.setEnabled(True)
+            logging.info(
+                f"Startup: equipment tab ready after {loader.elapsed_ms():.0f} ms"
+            )
+
+    def startup_failed_slot(self, name: str, error: str):
+        """
+        Ошибка фоновой загрузки при запуске: повторить загрузку или открыть
+        вкладку без данных (данные можно загрузить кнопкой обновления)
+
+        :param name: название группы данных (см. setupUi)
+        :type name: str
+        :param error: текст ошибки
+        :type error: str
+        """
+        tab = self.risk_register_tab if name in ["risk", "pm"] else self.equipment_tab
+        popup = QtWidgets.QMessageBox()
+        popup.setWindowTitle("Ошибка загрузки")
+        popup.setIcon(QtWidgets.QMessageBox.Icon.Warning)
+        popup.setText(
+            f"Не удалось загрузить данные вкладки "
+            f"«{self.tab_widget.tabText(self.tab_widget.indexOf(tab))}»:\n{error}"
+        )
+        popup.setStandardButtons(
+            QtWidgets.QMessageBox.StandardButton.Retry
+            | QtWidgets.QMessageBox.StandardButton.Cancel
+        )
+        if popup.exec() == QtWidgets.QMessageBox.StandardButton.Retry:
+            self.startup_loader.retry(name)
+            return
+        tab.setEnabled(True)
+        if tab is self.equipment_tab:
+            # the live plot follows sensors loaded later by the refresh buttons
+            self.live_worker.start()
+
     # button slots
     def risk_add_button_slot(self):
         """_summary_"""
@@ -1204,6 +1126,9 @@ class Ui_MainWindow(object):
 
     def risk_map_report_button_slot(self):
         """_summary_"""
+        # report form pulls in docx and babel, loaded on first use
+        from risk_map_FORM import risk_map_report_UIDialog
+
         # app = QtWidgets.QApplication(sys.argv)
         # app.setFont(QtGui.QFont("Segoe UI", 8))
         Dialog = QtWidgets.QDialog()
@@ -1234,16 +1159,7 @@ class Ui_MainWindow(object):
         dlg = deleteConfirmWindow()
         reply = dlg.exec()
         if reply == QtWidgets.QMessageBox.StandardButton.Yes:
-            qc = queryComposer("risk_register")
-            cond = [
-                {
-                    "key_name": "risk_id",
-                    "comp_operand": "=",
-                    "key_value": self.current_risk_id,
-                }
-            ]
-            qc.delete_query(conditions=cond)
-            qc.close_connection()
+            REPOSITORY.delete("risk_register", self.current_risk_id)
             self.risk_refresh_button_slot()
 
     def pm_delete_button_slot(self):
@@ -1266,35 +1182,20 @@ class Ui_MainWindow(object):
         dlg = deleteConfirmWindow()
         reply = dlg.exec()
         if reply == QtWidgets.QMessageBox.StandardButton.Yes:
-            qc = queryComposer("equipment")
-            cond = [
-                {
-                    "key_name": "equipment_id",
-                    "comp_operand": "=",
-                    "key_value": self.current_equip_id,
-                }
-            ]
-            qc.delete_query(conditions=cond)
-            qc.close_connection()
+            REPOSITORY.delete("equipment", self.current_equip_id)
             self.equip_refresh_button_slot()
 
     def sensor_delete_button_slot(self):
         dlg = deleteConfirmWindow()
         reply = dlg.exec()
         if reply == QtWidgets.QMessageBox.StandardButton.Yes:
-            qc = queryComposer("sensor")
-            cond = [
-                {
-                    "key_name": "sensor_id",
-                    "comp_operand": "=",
-                    "key_value": self.current_sensor_id,
-                }
-            ]
-            qc.delete_query(conditions=cond)
+            REPOSITORY.delete("sensor", self.current_sensor_id)
             self.sensor_refresh_button_slot()
 
     def risk_refresh_button_slot(self):
         """_summary_"""
+        REPOSITORY.invalidate("risk_register")
+        REPOSITORY.invalidate("risk_classification")
         self.risk_data_loader()
         self.risk_table_placeholder()
 
@@ -1305,62 +1206,68 @@ class Ui_MainWindow(object):
 
     def equip_refresh_button_slot(self):
         """ """
+        REPOSITORY.invalidate("equipment")
+        REPOSITORY.invalidate("equipment_type")
         self.equip_data_loader()
         self.equip_data_placeholder()
 
     def sensor_refresh_button_slot(self):
         """ """
+        for table_name in ["sensor", "sensor_type", "sensor_unit"]:
+            REPOSITORY.invalidate(table_name)
         self.sensor_data_loader()
         self.sensor_data_placeholder()
 
     # additional button slots
+    def risk_matrix_button_slot(self):
+        lazy_plot_opt().risk_matrix_()
+
     def week_button_slot(self):
-        last_sensor_plot(self.current_sensor_id, period="week")
+        lazy_plot_opt().last_sensor_plot(self.current_sensor_id, period="week")
 
     def day_button_slot(self):
-        last_sensor_plot(self.current_sensor_id, period="day")
+        lazy_plot_opt().last_sensor_plot(self.current_sensor_id, period="day")
 
     def hour_button_slot(self):
-        last_sensor_plot(self.current_sensor_id, period="hour")
+        lazy_plot_opt().last_sensor_plot(self.current_sensor_id, period="hour")
 
     # row selectors
     def risk_row_selector(self):
         """_summary_"""
-        self.current_risk_id = self.risk_register_table_widget.item(
-            self.risk_register_table_widget.currentRow(), 0
-        ).text()
-        self.risk_register_table_widget.selectRow(
-            self.risk_register_table_widget.currentRow()
-        )
+        row = self.risk_register_table_widget.currentIndex().row()
+        self.current_risk_id = self.risk_register_model.cell_text(row, 0)
+        self.risk_register_table_widget.selectRow(row)
         self.pm_table_placeholder(self.current_risk_id)
 
     def pm_row_selector(self):
         """_summary_"""
-        self.current_pm_id = self.pm_table_widget.item(
-            self.pm_table_widget.currentRow(), 0
-        ).text()
-        self.pm_table_widget.selectRow(self.pm_table_widget.currentRow())
+        row = self.pm_table_widget.currentIndex().row()
+        self.current_pm_id = self.pm_model.cell_text(row, 0)
+        self.pm_table_widget.selectRow(row)
 
     def equipment_row_selector(self):
         """_summary_"""
-        self.current_equip_id = self.equip_table_widget.item(
-            self.equip_table_widget.currentRow(), 0
-        ).text()
-        self.equip_table_widget.selectRow(self.equip_table_widget.currentRow())
+        row = self.equip_table_widget.currentIndex().row()
+        self.current_equip_id = self.equip_model.cell_text(row, 0)
+        self.equip_table_widget.selectRow(row)
         self.equip_GB_placeholder()
         self.sensor_table_placeholder(self.current_equip_id)
 
     def sensor_row_selector(self):
         """_summary_"""
-        self.current_sensor_id = self.sensor_table_widget.item(
-            self.sensor_table_widget.currentRow(), 0
-        ).text()
-        self.sensor_table_widget.selectRow(self.sensor_table_widget.currentRow())
+        row = self.sensor_table_widget.currentIndex().row()
+        self.current_sensor_id = self.sensor_model.cell_text(row, 0)
+        self.sensor_table_widget.selectRow(row)
+        self.canvas_placeholder()
+        self.sensor_GB_placeholder()
+
+    def canvas_placeholder(self):
+        """Живой график текущего датчика"""
+        from live_canvas import MplCanvas
+
         current_sensor_data = self.sensor_data_id_ref[int(self.current_sensor_id)]
-        current_sensor_data["unit_name"] = self.sensor_unit_id_ref[
-            current_sensor_data["unit_id"]
-        ]
-        self.graphical_view_layout.removeWidget(self.canvas)
+        if self.canvas is not None:
+            self.graphical_view_layout.removeWidget(self.canvas)
         self.canvas = MplCanvas(
             parent=self.equipment_tab,
             width=5,
@@ -1369,46 +1276,48 @@ class Ui_MainWindow(object):
             current_sensor_data=current_sensor_data,
         )
         self.graphical_view_layout.addWidget(self.canvas)
-        self.sensor_GB_placeholder()
+        self.reset_live_data()
 
     # plot updater
-    def update_plot(self):
-        # Drop off the first y element, append a new one.
-        qc = queryComposer("sensor_logs")
-        cond = [
-            {
-                "key_name": "sensor_id",
-                "comp_operand": "=",
-                "key_value": self.current_sensor_id,
-            },
-            {
-                "key_name": "log_datetime",
-                "comp_operand": ">=",
-                "key_value": "now()-interval '1 minute'",
-            },
-            {
-                "key_name": "log_datetime",
-                "comp_operand": "<=",
-                "key_value": "now()",
-            },
-        ]
-        raw_data = qc.select_query(conditions=cond, order_opt=["log_datetime"])
-        qc.close_connection()
-        current_time = datetime.datetime.now().replace(microsecond=0)
-        y_data = []
-        x_data = []
-        for rec in raw_data:
-            y_data.append(rec["sensor_value"])
-            x_data.append((current_time - rec["log_datetime"]).total_seconds())
-        x_data.reverse()
-        y_data.reverse()
-        self.canvas.update_plot(x_data, y_data)
+    def reset_live_data(self):
+        """Сброс накопленных значений живого графика, например при смене датчика"""
+        self.live_worker.set_sensor(self.current_sensor_id)
+        self.canvas.buffer.clear()
+
+    def update_plot(self, timestamps: np.ndarray, values: np.ndarray):
+        """
+        Добавить полученные фоновым опросом значения и перерисовать график
+
+        :param timestamps: время новых значений в секундах (epoch)
+        :type timestamps: np.ndarray
+        :param values: новые значения датчика
+        :type values: np.ndarray
+        """
+        self.canvas.buffer.push(timestamps, values)
+        # log_datetime is a naive local time, epoch seconds treat it as UTC
+        current_time = (
+            datetime.datetime.now()
+            .replace(microsecond=0, tzinfo=datetime.timezone.utc)
+            .timestamp()
+        )
+        # drop points that aged out of the window
+        self.canvas.buffer.drop_older(current_time - LIVE_WINDOW_SECONDS)
+        self.canvas.update_plot(current_time)
 
 
 if __name__ == "__main__":
-    app = QtWidgets.QApplication(sys.argv)
-    MainWindow = QtWidgets.QMainWindow()
-    ui = Ui_MainWindow()
-    ui.setupUi(MainWindow)
-    MainWindow.show()
+    with PROFILER.stage("schema listener"):
+        SCHEMA_REGISTRY.start_listener()
+    with PROFILER.stage("sensor_logs partitions"):
+        ensure_sensor_logs_partitions()
+    with PROFILER.stage("QApplication"):
+        app = QtWidgets.QApplication(sys.argv)
+    with PROFILER.stage("setupUi"):
+        MainWindow = QtWidgets.QMainWindow()
+        ui = Ui_MainWindow()
+        ui.setupUi(MainWindow)
+    PROFILER.watch_startup(ui.startup_loader, STARTUP_BUDGET_MS)
+    app.aboutToQuit.connect(ui.live_worker.stop)
+    with PROFILER.stage("show"):
+        MainWindow.show()
     sys.exit(app.exec())
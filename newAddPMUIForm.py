@@ -9,6 +9,7 @@ import sys
 
 from PyQt6 import QtCore, QtGui, QtWidgets
 from db_operation_functions import queryComposer
+from repository import REPOSITORY
 from functools import partial
 
 
@@ -106,12 +107,7 @@ class addMeasureUIDialog(object):
         self.status_combobox.setItemText(1, _translate("Dialog", "Принята"))
 
     def risk_data_loader(self):
-        qc = queryComposer("risk_register")
-        raw_risk_data = qc.select_query(order_opt=["risk_id"])
-        qc.close_connection()
-        self.risk_data_id_ref = {
-            risk["risk_id"]: risk["risk_name"] for risk in raw_risk_data
-        }
+        self.risk_data_id_ref = REPOSITORY.names("risk_register")
 
     def risk_data_placeholder(self, risk_id):
         self.risk_combobox.addItems(self.risk_data_id_ref.values())
@@ -7,7 +7,7 @@
 
 import logging
 from PyQt6 import QtCore, QtGui, QtWidgets
-from db_operation_functions import queryComposer
+from repository import REPOSITORY
 from functools import partial
 
 logging.basicConfig(level=logging.WARNING)
@@ -290,19 +290,12 @@ class addRiskUIDialog(object):
         )
 
     def risk_class_data_loader(self):
-        qc = queryComposer("risk_classification")
-        raw_risk_class_data = qc.select_query(order_opt=["risk_class_id"])
-        qc.close_connection()
-        self.risk_class_id_ref = {
-            r_class["risk_class_id"]: r_class["risk_class_name"]
-            for r_class in raw_risk_class_data
-        }
+        self.risk_class_id_ref = REPOSITORY.names("risk_classification")
 
     def risk_class_data_placeholder(self):
         self.risk_class_combobox.addItems(self.risk_class_id_ref.values())
 
     def confirm_button_slot(self, Dialog: QtWidgets.QDialog = None) -> None:
-        qc = queryComposer("risk_register")
         current_risk_data = {}
         current_risk_data["risk_name"] = self.risk_name_field.text()
         current_risk_data["risk_class_id"] = list(self.risk_class_id_ref.keys())[
@@ -313,8 +306,7 @@ class addRiskUIDialog(object):
         current_risk_data["risk_holder"] = self.risk_holder_field.text()
         current_risk_data["risk_prob"] = self.risk_prob_slider.value()
         current_risk_data["risk_damage"] = self.risk_damage_slider.value()
-        qc.insert_query(current_risk_data)
-        qc.close_connection()
+        REPOSITORY.insert("risk_register", current_risk_data)
         Dialog.close()
 
 
@@ -9,6 +9,7 @@ import sys
 
 from PyQt6 import QtCore, QtGui, QtWidgets
 from db_operation_functions import queryComposer
+from repository import REPOSITORY
 from functools import partial
 
 
@@ -108,12 +109,7 @@ class editMeasureUIDialog(object):
         self.status_combobox.setItemText(1, _translate("Dialog", "Принята"))
 
     def risk_data_loader(self):
-        qc = queryComposer("risk_register")
-        raw_risk_data = qc.select_query(order_opt=["risk_id"])
-        qc.close_connection()
-        self.risk_data_id_ref = {
-            risk["risk_id"]: risk["risk_name"] for risk in raw_risk_data
-        }
+        self.risk_data_id_ref = REPOSITORY.names("risk_register")
 
     def pm_data_loader(self, pm_id):
         qc = queryComposer("prevention_measures")
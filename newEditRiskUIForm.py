@@ -7,7 +7,7 @@
 
 import logging
 from PyQt6 import QtCore, QtGui, QtWidgets
-from db_operation_functions import queryComposer
+from repository import REPOSITORY
 from functools import partial
 
 logging.basicConfig(level=logging.WARNING)
@@ -292,22 +292,11 @@ class editRiskUIDialog(object):
         )
 
     def risk_class_data_loader(self):
-        qc = queryComposer("risk_classification")
-        raw_risk_class_data = qc.select_query(order_opt=["risk_class_id"])
-        qc.close_connection()
-        self.risk_class_id_ref = {
-            r_class["risk_class_id"]: r_class["risk_class_name"]
-            for r_class in raw_risk_class_data
-        }
+        self.risk_class_id_ref = REPOSITORY.names("risk_classification")
 
     def risk_data_loader(self, risk_id):
-        qc = queryComposer("risk_register")
-        self.current_risk_data = qc.select_query(
-            conditions=[
-                {"key_name": "risk_id", "key_value": risk_id, "comp_operand": "="}
-            ]
-        )[0]
-        qc.close_connection()
+        # copy, the dialog edits it in place before update
+        self.current_risk_data = REPOSITORY.get("risk_register", risk_id).as_dict()
 
     def risk_class_data_placeholder(self):
         self.risk_class_combobox.addItems(self.risk_class_id_ref.values())
@@ -334,7 +323,6 @@ class editRiskUIDialog(object):
         )
 
     def confirm_button_slot(self, Dialog: QtWidgets.QDialog = None) -> None:
-        qc = queryComposer("risk_register")
         self.current_risk_data["risk_name"] = self.risk_name_field.text()
         self.current_risk_data["risk_class_id"] = list(self.risk_class_id_ref.keys())[
             self.risk_class_combobox.currentIndex()
@@ -344,8 +332,7 @@ class editRiskUIDialog(object):
         self.current_risk_data["risk_holder"] = self.risk_holder_field.text()
         self.current_risk_data["risk_prob"] = self.risk_prob_slider.value()
         self.current_risk_data["risk_damage"] = self.risk_damage_slider.value()
-        qc.update_query(self.current_risk_data)
-        qc.close_connection()
+        REPOSITORY.update("risk_register", self.current_risk_data)
         Dialog.close()
 
 
@@ -1,11 +1,26 @@
 # main_plot
+import datetime
 import matplotlib.pyplot as plt
 import numpy as np
+import psycopg2.errors
 from matplotlib.colors import LinearSegmentedColormap
-from db_operation_functions import queryComposer
+from db_operation_functions import queryComposer, sqlExpr
+from decimation import decimate, fixed_interval_chunks
 import mplcursors
 import matplotlib.dates as mdates
 
+PERIOD_SECONDS = {"minute": 60, "hour": 3600, "day": 24 * 3600, "week": 7 * 24 * 3600}
+# rollup tables (see util/data_import/sensor_logs_rollups): bucket width, seconds
+ROLLUP_TABLES = {
+    "sensor_logs_1m": 60,
+    "sensor_logs_15m": 15 * 60,
+    "sensor_logs_1h": 60 * 60,
+}
+# rollup is used only when it gives at least this many points for the period
+MIN_PLOT_POINTS = 600
+# interval of the fixed client-side decimation, seconds
+RAW_PLOT_STEP = {"minute": 0, "hour": 5, "day": 5 * 60, "week": 15 * 60}
+
 
 def wrap_string(string, max_length):
     lines = []
@@ -24,25 +39,23 @@ def risk_matrix_():
     plt.rcParams["font.family"] = "Calibri"
 
     # data setup
-    qcrr = queryComposer("risk_register")
-    raw_risk_data = qcrr.select_query(order_opt=["risk_id"])
-    risk_data_id_ref = {risk["risk_id"]: risk for risk in raw_risk_data}
-    qcrr.close_connection()
-    qcrc = queryComposer("risk_classification")
-    raw_class_data = qcrc.select_query(order_opt=["risk_class_id"])
-    qcrc.close_connection()
-    risk_class_data_id_ref = {
-        r_class["risk_class_id"]: r_class for r_class in raw_class_data
-    }
+    with queryComposer("risk_register") as qcrr:
+        risk_data_id_ref = qcrr.select_joined(
+            joins=[
+                {
+                    "table": "risk_classification",
+                    "on": "risk_class_id",
+                    "columns": ["risk_class_name"],
+                }
+            ]
+        )
     risk_data_xy_ref = {
         (risk["risk_prob"] / 5, risk["risk_damage"] / 10): {
             "risk_id": risk["risk_id"],
             "risk_name": risk["risk_name"],
-            "risk_class_name": risk_class_data_id_ref[risk["risk_class_id"]][
-                "risk_class_name"
-            ],
+            "risk_class_name": risk["risk_class_name"],
         }
-        for risk in raw_risk_data
+        for risk in risk_data_id_ref.values()
         if risk["risk_prob"] is not None
     }
     # Define the positions for the colors in the colormap
@@ -125,34 +138,99 @@ def risk_matrix_():
     plt.show()
 
 
-def last_sensor_plot(sensor_id: int, period: str = "hour"):
-    if period not in ["hour", "week", "day", "minute"]:
-        raise ValueError("Invalid period param")
+def rollup_table(period: str):
+    """Самая грубая таблица агрегатов, дающая не меньше MIN_PLOT_POINTS точек за период"""
+    for table_name, width in sorted(
+        ROLLUP_TABLES.items(), key=lambda item: item[1], reverse=True
+    ):
+        if PERIOD_SECONDS[period] / width >= MIN_PLOT_POINTS:
+            return table_name
+    return None
+
 
-    qcs = queryComposer("sensor")
+def select_rollup(table_name: str, sensor_id: int, period: str):
+    """
+    Агрегаты датчика за прошлый период в том же виде, что и queryComposer.select_buckets
+
+    :return: интервалы по возрастанию времени, None если таблицы агрегатов нет
+    :rtype: list[dict]
+    """
+    qc = queryComposer(table_name)
     cond = [
         {
             "key_name": "sensor_id",
             "comp_operand": "=",
             "key_value": sensor_id,
-        }
+        },
+        {
+            "key_name": "bucket_start",
+            "comp_operand": ">=",
+            "key_value": sqlExpr(f"now()-interval '1 {period}'"),
+        },
+        {
+            "key_name": "bucket_start",
+            "comp_operand": "<=",
+            "key_value": sqlExpr("now()"),
+        },
     ]
-    sensor_data = qcs.select_query(conditions=cond)[0]
-    qcs.close_connection()
+    try:
+        return qc.select_query(
+            columns=[
+                "bucket_start",
+                "value_min",
+                "value_max",
+                "value_sum / nullif(value_count, 0) as value_avg",
+                "value_count",
+            ],
+            conditions=cond,
+            order_opt=["bucket_start"],
+        )
+    except psycopg2.errors.UndefinedTable:
+        return None
+    finally:
+        qc.close_connection()
+
+
+def last_sensor_plot(
+    sensor_id: int,
+    period: str = "hour",
+    downsample: bool = True,
+    decimation_mode: str = "fixed",
+):
+    """
+    График значений датчика за прошлый период
+
+    :param sensor_id: код датчика
+    :type sensor_id: int
+    :param period: период, одно из hour, day, week, minute, defaults to "hour"
+    :type period: str, optional
+    :param downsample: прореживать на стороне сервера: таблицы агрегатов
+        или среднее и диапазон min/max по интервалам шириной в пиксель, defaults to True
+    :type downsample: bool, optional
+    :param decimation_mode: прореживание на клиенте при downsample=False,
+        fixed, minmax или lttb (см. decimation), defaults to "fixed"
+    :type decimation_mode: str, optional
+    """
+    if period not in ["hour", "week", "day", "minute"]:
+        raise ValueError("Invalid period param")
+
+    with queryComposer("sensor") as qcs:
+        sensor_data = qcs.select_joined(
+            joins=[{"table": "sensor_unit", "on": "unit_id", "columns": ["unit_name"]}],
+            conditions=[
+                {
+                    "key_name": "sensor.sensor_id",
+                    "comp_operand": "=",
+                    "key_value": sensor_id,
+                }
+            ],
+        )[int(sensor_id)]
     limit_val = sensor_data["limit_mode_value"]
     sensor_name = sensor_data["sensor_name"]
+    unit_name = sensor_data["unit_name"]
 
-    qcu = queryComposer("sensor_unit")
-    cond = [
-        {
-            "key_name": "unit_id",
-            "comp_operand": "=",
-            "key_value": sensor_data["unit_id"],
-        }
-    ]
-    unit_data = qcu.select_query(conditions=cond)[0]
-    qcu.close_connection()
-    unit_name = unit_data["unit_name"]
+    fig, ax = plt.subplots(figsize=(12, 5))
+    fig.canvas.manager.set_window_title("Дополнительные графики")
 
     qc = queryComposer("sensor_logs")
     cond = [
@@ -164,30 +242,65 @@ def last_sensor_plot(sensor_id: int, period: str = "hour"):
         {
             "key_name": "log_datetime",
             "comp_operand": ">=",
-            "key_value": f"now()-interval '1 {period}'",
+            "key_value": sqlExpr(f"now()-interval '1 {period}'"),
         },
         {
             "key_name": "log_datetime",
             "comp_operand": "<=",
-            "key_value": "now()",
+            "key_value": sqlExpr("now()"),
         },
     ]
-    raw_data = qc.select_query(conditions=cond, order_opt=["log_datetime"])
+    if downsample:
+        table_name = rollup_table(period)
+        raw_data = None
+        if table_name is not None:
+            raw_data = select_rollup(table_name, sensor_id, period)
+        if raw_data is None:
+            # no suitable rollup, one bucket per horizontal pixel of the axes
+            width_px = max(ax.get_window_extent().width, 1)
+            bucket_seconds = max(PERIOD_SECONDS[period] / width_px, 1)
+            raw_data = qc.select_buckets(
+                "log_datetime", "sensor_value", bucket_seconds, conditions=cond
+            )
+        n_rows = len(raw_data)
+    else:
+        chunks = (
+            (chunk["log_datetime"], chunk["sensor_value"])
+            for chunk in qc.select_stream(
+                columns=["log_datetime", "sensor_value"],
+                conditions=cond,
+                order_opt=["log_datetime"],
+                as_arrays=True,
+            )
+        )
+        if decimation_mode == "fixed":
+            # thinned chunk by chunk, memory is bounded by the plotted points
+            chunks = fixed_interval_chunks(chunks, RAW_PLOT_STEP[period])
+        chunks = list(chunks)
+        n_rows = sum(len(times) for times, _ in chunks)
     qc.close_connection()
 
-    fig, ax = plt.subplots(figsize=(12, 5))
-    fig.canvas.manager.set_window_title("Дополнительные графики")
-    if not raw_data:
+    if not n_rows:
         fig.show()
         return
-    first_rec = raw_data.pop(0)
-    x_data = [first_rec["log_datetime"]]
-    y_data = [first_rec["sensor_value"]]
+    if downsample:
+        x_data = [rec["bucket_start"] for rec in raw_data]
+        y_data = np.array([rec["value_avg"] for rec in raw_data], dtype=np.float64)
+        y_min = np.array([rec["value_min"] for rec in raw_data], dtype=np.float64)
+        y_max = np.array([rec["value_max"] for rec in raw_data], dtype=np.float64)
+        ax.fill_between(x_data, y_min, y_max, alpha=0.3, linewidth=0)
+    else:
+        times = np.concatenate([times for times, _ in chunks])
+        y_data = np.concatenate([values for _, values in chunks])
+        if decimation_mode != "fixed":
+            times, y_data = decimate(
+                times,
+                y_data,
+                mode=decimation_mode,
+                n_out=max(int(ax.get_window_extent().width), 3),
+            )
+        x_data = times.astype(datetime.datetime)
     if period == "hour":
-        for rec in raw_data:
-            if (rec["log_datetime"] - x_data[-1]).total_seconds() >= 5:
-                x_data.append(rec["log_datetime"])
-                y_data.append(rec["sensor_value"])
         minutes_10 = mdates.MinuteLocator(interval=5)
         ax.xaxis.set_major_locator(minutes_10)
         time_fmt = mdates.DateFormatter("%H:%M")
@@ -195,19 +308,11 @@ def last_sensor_plot(sensor_id: int, period: str = "hour"):
         fig.canvas.manager.set_window_title("График за прошлый час")
         ax.set_xlabel("Время")
     elif period == "week":
-        for rec in raw_data:
-            if (rec["log_datetime"] - x_data[-1]).total_seconds() >= 15 * 60:
-                x_data.append(rec["log_datetime"])
-                y_data.append(rec["sensor_value"])
         ax.set_xlabel("Дата")
         ax.set_xticks(list({date.date() for date in x_data}))
         ax.set_xticklabels(list({date.date() for date in x_data}))
         fig.canvas.manager.set_window_title("График за прошлую неделю")
     elif period == "day":
-        for rec in raw_data:
-            if (rec["log_datetime"] - x_data[-1]).total_seconds() >= 5 * 60:
-                x_data.append(rec["log_datetime"])
-                y_data.append(rec["sensor_value"])
         ax.set_xlabel("Время")
         dates = mdates.HourLocator(interval=2)
         date_fmt = mdates.DateFormatter("%H:%M")
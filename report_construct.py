@@ -1,3 +1,7 @@
+import copy
+import sys
+import time
+
 from docx.enum.text import WD_PARAGRAPH_ALIGNMENT, WD_LINE_SPACING, WD_UNDERLINE
 from docx.shared import Cm, Pt, Inches
 from docx.enum.section import WD_ORIENT
@@ -183,7 +187,54 @@ def add_table(
         Cm(11.2),
     ],
 ) -> None:
-    """add table with given data into doc
+    """add table with given data into doc.
+    Widths, zero paragraph spacing and 10pt font are set once in a template row,
+    every data row is a copy of its XML with the texts filled in ("\\n" -> line break)
+
+    :param doc: document itself
+    :type doc: Document
+    :param data: list with list for each row
+    :type data: list[list[str]]
+    :param col_widths: Optional, setting for column widths, defaults to [ Cm(1.3), Cm(2.5), Cm(2.7), Cm(5.7), Cm(1.7), Cm(1.7), Cm(11.2), ]
+    :type col_widths: list[Cm], optional
+    """
+    num_cols = len(data[0])
+    table = doc.add_table(rows=1, cols=num_cols)
+    table.style = "Table Grid"
+    set_col_widths(table, col_widths)
+    template = table.rows[0]
+    for cell in template.cells:
+        paragraph = cell.paragraphs[0]
+        paragraph.paragraph_format.space_before = Pt(0)
+        paragraph.paragraph_format.space_after = Pt(0)
+        paragraph.add_run("").font.size = Pt(10)
+    template_tr = template._tr
+    tbl = table._tbl
+    tbl.remove(template_tr)
+    for row in data:
+        tr = copy.deepcopy(template_tr)
+        for tc, text in zip(tr.tc_lst, row):
+            # same as cell.text: tabs and line breaks become w:tab / w:br
+            tc.p_lst[0].r_lst[0].text = text
+        tbl.append(tr)
+    hollow_line(doc)
+
+
+def add_table_by_cells(
+    doc: Document,
+    data: list[list[str]],
+    col_widths: list[Cm] = [
+        Cm(1.3),
+        Cm(2.5),
+        Cm(2.7),
+        Cm(5.7),
+        Cm(1.7),
+        Cm(1.7),
+        Cm(11.2),
+    ],
+) -> None:
+    """add table with given data into doc cell by cell through python-docx,
+    slow for big tables, kept to compare with add_table (see benchmark_add_table)
 
     :param doc: document itself
     :type doc: Document
@@ -223,6 +274,44 @@ def hollow_line(doc):
     run = paragraph.add_run("")
 
 
+def benchmark_add_table(num_rows: int = 200) -> None:
+    """print time of add_table and add_table_by_cells for num_rows risk rows
+
+    :param num_rows: number of data rows, defaults to 200 (add_table_by_cells
+        time grows quadratically with rows)
+    :type num_rows: int, optional
+    """
+    data = [
+        [
+            "Код риска",
+            "Источник опасности",
+            "Опасность",
+            "Возможные последствия",
+            "Вероятность риска",
+            "Ущерб",
+            "Меры по снижению риска",
+        ]
+    ]
+    for idx in range(num_rows):
+        data.append(
+            [
+                str(idx + 1),
+                f"Источник {idx}",
+                f"Опасность {idx}",
+                "Последствия " * 10,
+                "Средняя",
+                "Средний",
+                "\n".join(f"{mark}. Мера {idx}" for mark in "abcd"),
+            ]
+        )
+    for func in (add_table, add_table_by_cells):
+        doc = Document()
+        begin = time.perf_counter()
+        func(doc, data)
+        elapsed = time.perf_counter() - begin
+        print(f"{func.__name__}: {num_rows} rows in {elapsed:.2f} s")
+
+
 def risk_map_report_constructor(
     prefix_data: list[str],
     map_num: int,
@@ -429,6 +518,9 @@ def risk_map_report_constructor(
 #     doc.save(file_path)
 
 if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        benchmark_add_table()
+        sys.exit()
     data = [
         "Утверждаю",
         "Директор <<оао шляпи>>",
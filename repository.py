@@ -0,0 +1,336 @@
+"""
+Общий для процесса кэш справочных таблиц (классы рисков, типы и единицы датчиков,
+типы оборудования, оборудование, датчики, реестр рисков).
+
+Таблица загружается из базы один раз при первом обращении и хранится как
+словарь код: запись. Запись через REPOSITORY (insert/update/delete) сбрасывает
+кэш таблицы, следующее обращение загрузит её заново
+"""
+
+import threading
+
+from db_operation_functions import SCHEMA_REGISTRY, connectionPool, queryComposer
+
+
+class tableRecord:
+    """
+    Строка таблицы с атрибутами по колонкам (__slots__).
+    Доступ по ключу record["column"] оставлен для кода, работавшего со словарями
+    """
+
+    __slots__ = ()
+    table_name = None
+    id_column = None
+    name_column = None
+
+    @classmethod
+    def from_row(cls, row: dict):
+        record = cls.__new__(cls)
+        for column in cls.__slots__:
+            setattr(record, column, row.get(column))
+        return record
+
+    @property
+    def record_id(self) -> int:
+        return getattr(self, self.id_column)
+
+    @property
+    def name(self) -> str:
+        return getattr(self, self.name_column)
+
+    def as_dict(self) -> dict:
+        """
+        Словарь колонка: значение, первым идёт код записи (как ждёт update_query)
+
+        :rtype: dict
+        """
+        return {column: getattr(self, column) for column in self.__slots__}
+
+    def __getitem__(self, column: str):
+        if column not in self.__slots__:
+            raise KeyError(column)
+        return getattr(self, column)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.record_id!r}, {self.name!r})"
+
+
+class riskClassRecord(tableRecord):
+    __slots__ = ("risk_class_id", "risk_class_name", "risk_class_details")
+    table_name = "risk_classification"
+    id_column = "risk_class_id"
+    name_column = "risk_class_name"
+
+    risk_class_id: int
+    risk_class_name: str
+    risk_class_details: str
+
+
+class sensorTypeRecord(tableRecord):
+    __slots__ = ("sensor_type_id", "sensor_type_name")
+    table_name = "sensor_type"
+    id_column = "sensor_type_id"
+    name_column = "sensor_type_name"
+
+    sensor_type_id: int
+    sensor_type_name: str
+
+
+class sensorUnitRecord(tableRecord):
+    __slots__ = ("unit_id", "unit_name", "sensor_type_id")
+    table_name = "sensor_unit"
+    id_column = "unit_id"
+    name_column = "unit_name"
+
+    unit_id: int
+    unit_name: str
+    sensor_type_id: int
+
+
+class equipTypeRecord(tableRecord):
+    __slots__ = ("equipment_type_id", "equipment_type_name", "equipment_type_details")
+    table_name = "equipment_type"
+    id_column = "equipment_type_id"
+    name_column = "equipment_type_name"
+
+    equipment_type_id: int
+    equipment_type_name: str
+    equipment_type_details: str
+
+
+class equipRecord(tableRecord):
+    __slots__ = (
+        "equipment_id",
+        "equipment_name",
+        "equipment_designation",
+        "equipment_type_id",
+        "equipment_details",
+        "equipment_installation_date",
+        "equipment_average_lifetime",
+        "equipment_status",
+        "equipment_manufacturer_name",
+    )
+    table_name = "equipment"
+    id_column = "equipment_id"
+    name_column = "equipment_name"
+
+    equipment_id: int
+    equipment_name: str
+    equipment_designation: str
+    equipment_type_id: int
+    equipment_details: str
+    equipment_installation_date: object
+    equipment_average_lifetime: int
+    equipment_status: bool
+    equipment_manufacturer_name: str
+
+
+class sensorRecord(tableRecord):
+    __slots__ = (
+        "sensor_id",
+        "sensor_name",
+        "sensor_type_id",
+        "unit_id",
+        "limit_mode_value",
+        "sensor_installation_date",
+        "sensor_average_lifetime",
+        "equipment_id",
+    )
+    table_name = "sensor"
+    id_column = "sensor_id"
+    name_column = "sensor_name"
+
+    sensor_id: int
+    sensor_name: str
+    sensor_type_id: int
+    unit_id: int
+    limit_mode_value: float
+    sensor_installation_date: object
+    sensor_average_lifetime: int
+    equipment_id: int
+
+
+class riskRecord(tableRecord):
+    __slots__ = (
+        "risk_id",
+        "risk_name",
+        "risk_class_id",
+        "risk_details",
+        "risk_score",
+        "risk_holder",
+        "risk_prob",
+        "risk_damage",
+    )
+    table_name = "risk_register"
+    id_column = "risk_id"
+    name_column = "risk_name"
+
+    risk_id: int
+    risk_name: str
+    risk_class_id: int
+    risk_details: str
+    risk_score: float
+    risk_holder: str
+    risk_prob: int
+    risk_damage: int
+
+
+RECORD_TYPES = {
+    record_type.table_name: record_type
+    for record_type in (
+        riskClassRecord,
+        sensorTypeRecord,
+        sensorUnitRecord,
+        equipTypeRecord,
+        equipRecord,
+        sensorRecord,
+        riskRecord,
+    )
+}
+
+
+class dataRepository:
+    """
+    Кэш таблиц RECORD_TYPES с индексами по коду записи и по колонкам
+    """
+
+    def __init__(self, pool: connectionPool = None) -> None:
+        """
+        :param pool: пул подключений, defaults to None (get_pool())
+        :type pool: connectionPool, optional
+        """
+        self.pool = pool
+        self._records = {}
+        self._indexes = {}
+        # отдельная блокировка на таблицу, разные таблицы загружаются параллельно
+        self._locks = {table_name: threading.Lock() for table_name in RECORD_TYPES}
+        self._generations = dict.fromkeys(RECORD_TYPES, 0)
+        self.stats = {"loads": 0, "hits": 0}
+
+    def _load(self, table_name: str) -> dict:
+        record_type = RECORD_TYPES[table_name]
+        qc = queryComposer(table_name, pool=self.pool)
+        try:
+            rows = qc.select_query(order_opt=[record_type.id_column])
+        finally:
+            qc.close_connection()
+        return {row[record_type.id_column]: record_type.from_row(row) for row in rows}
+
+    def records(self, table_name: str) -> dict:
+        """
+        Все записи таблицы по возрастанию кода, при пустом кэше загружаются из базы
+
+        :param table_name: название таблицы из RECORD_TYPES
+        :type table_name: str
+        :return: словарь код: запись
+        :rtype: dict of int: tableRecord
+        """
+        if table_name not in RECORD_TYPES:
+            raise ValueError("Invalid table_name param")
+        records = self._records.get(table_name)
+        if records is not None:
+            self.stats["hits"] += 1
+            return records
+        with self._locks[table_name]:
+            records = self._records.get(table_name)
+            if records is None:
+                generation = self._generations[table_name]
+                records = self._load(table_name)
+                self.stats["loads"] += 1
+                # a write during the load makes the result stale, do not cache it
+                if generation == self._generations[table_name]:
+                    self._records[table_name] = records
+        return records
+
+    def all(self, table_name: str) -> list:
+        """Записи таблицы списком по возрастанию кода"""
+        return list(self.records(table_name).values())
+
+    def get(self, table_name: str, record_id: int):
+        """
+        Запись по коду
+
+        :param record_id: код записи (строка из таблиц интерфейса тоже подходит)
+        :type record_id: int | str
+        :return: запись или None
+        :rtype: tableRecord
+        """
+        return self.records(table_name).get(int(record_id))
+
+    def names(self, table_name: str) -> dict:
+        """
+        Код: название записи, например для заполнения выпадающих списков
+
+        :rtype: dict of int: str
+        """
+        return {
+            record_id: record.name
+            for record_id, record in self.records(table_name).items()
+        }
+
+    def index(self, table_name: str, column: str) -> dict:
+        """
+        Коды записей, сгруппированные по значению колонки
+        (например единицы измерения по sensor_type_id)
+
+        :param column: колонка группировки
+        :type column: str
+        :return: словарь значение колонки: список кодов по возрастанию
+        :rtype: dict of object: list[int]
+        """
+        records = self.records(table_name)
+        key = (table_name, column)
+        index = self._indexes.get(key)
+        if index is not None and index[0] is records:
+            return index[1]
+        groups = {}
+        for record_id, record in records.items():
+            groups.setdefault(getattr(record, column), []).append(record_id)
+        self._indexes[key] = (records, groups)
+        return groups
+
+    def invalidate(self, table_name: str = None) -> None:
+        """
+        Сбросить кэш таблицы, либо всех таблиц если table_name не задан
+
+        :param table_name: название таблицы, defaults to None
+        :type table_name: str, optional
+        """
+        tables = RECORD_TYPES if table_name is None else [table_name]
+        for name in tables:
+            if name not in RECORD_TYPES:
+                continue
+            self._generations[name] += 1
+            self._records.pop(name, None)
+
+    def insert(self, table_name: str, values: dict) -> None:
+        """Вставка записи (insert_query) со сбросом кэша таблицы"""
+        self._write(table_name, "insert_query", values)
+
+    def update(self, table_name: str, values: dict) -> None:
+        """Обновление записи (update_query, первый ключ - код) со сбросом кэша таблицы"""
+        self._write(table_name, "update_query", values)
+
+    def delete(self, table_name: str, record_id: int) -> None:
+        """Удаление записи по коду со сбросом кэша таблицы"""
+        cond = [
+            {
+                "key_name": RECORD_TYPES[table_name].id_column,
+                "comp_operand": "=",
+                "key_value": int(record_id),
+            }
+        ]
+        self._write(table_name, "delete_query", cond)
+
+    def _write(self, table_name: str, method: str, arg) -> None:
+        qc = queryComposer(table_name, pool=self.pool)
+        try:
+            getattr(qc, method)(arg)
+        finally:
+            qc.close_connection()
+            self.invalidate(table_name)
+
+
+REPOSITORY = dataRepository()
+# изменение DDL может поменять колонки, кэш строк сбрасывается вместе со схемой
+SCHEMA_REGISTRY.add_refresh_callback(REPOSITORY.invalidate)
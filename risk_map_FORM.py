@@ -8,6 +8,7 @@
 
 from PyQt6 import QtCore, QtGui, QtWidgets
 from db_operation_functions import queryComposer
+from repository import REPOSITORY
 from report_construct import risk_map_report_constructor
 from functools import partial
 
@@ -389,13 +390,7 @@ class risk_map_report_UIDialog(object):
         self.cancel_button.setText(_translate("Dialog", "Отмена"))
 
     def load_data(self):
-        qc = queryComposer("risk_register")
-        raw_risk_data = qc.select_query()
-        qc.close_connection()
-        self.risk_data_id_ref = {
-            risk["risk_id"]: {key: val for key, val in risk.items() if key != "risk_id"}
-            for risk in raw_risk_data
-        }
+        self.risk_data_id_ref = REPOSITORY.records("risk_register")
 
     def risk_data_placeholder(self):
         self.load_data()
@@ -444,19 +439,16 @@ class risk_map_report_UIDialog(object):
                 "Меры по снижению риска",
             ]
         ]
+        # measures of all selected risks in one query
+        with queryComposer("prevention_measures") as qc:
+            risk_pm_desc = qc.select_grouped(
+                "risk_id",
+                "prevention_measure_name",
+                [risk_id for risk_id, _ in rep_risk_list],
+                order_column="prevention_measure_id",
+            )
         for idx, (risk_id, risk_dang) in enumerate(rep_risk_list):
             risk_data_tmp = self.risk_data_id_ref[risk_id]
-            conditions = [
-                {
-                    "key_name": "risk_id",
-                    "key_value": risk_id,
-                    "comp_operand": "=",
-                }
-            ]
-            qc = queryComposer("prevention_measures")
-            raw_pm_data = qc.select_query(conditions=conditions)
-            qc.close_connection()
-            pm_desc = [run["prevention_measure_name"] for run in raw_pm_data]
             tmp_data = [
                 str(risk_id),
                 risk_dang,
@@ -464,7 +456,7 @@ class risk_map_report_UIDialog(object):
                 risk_data_tmp["risk_details"],
                 value_to_interval_prob(risk_data_tmp["risk_prob"]),
                 value_to_interval_dmg(risk_data_tmp["risk_damage"]),
-                "\n".join(pm_desc),
+                risk_pm_desc.get(risk_id, ""),
             ]
             table_data.append(tmp_data)
 
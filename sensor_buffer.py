@@ -0,0 +1,87 @@
+import numpy as np
+
+
+class sensorRingBuffer:
+    """
+    Кольцевой буфер фиксированного размера для значений датчика (время, значение).
+    Данные хранятся в массивах float64 двойной длины: каждая запись пишется
+    по индексам i и i + capacity, поэтому последние значения всегда доступны
+    непрерывным срезом без копирования
+    """
+
+    def __init__(self, capacity: int = 4096) -> None:
+        """
+        :param capacity: максимальное количество хранимых значений, defaults to 4096
+        :type capacity: int, optional
+        """
+        if capacity < 1:
+            raise ValueError("Invalid capacity param")
+        self.capacity = capacity
+        self._time = np.zeros(2 * capacity, dtype=np.float64)
+        self._value = np.zeros(2 * capacity, dtype=np.float64)
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _write(self, target: np.ndarray, pos: int, data: np.ndarray) -> None:
+        first = min(len(data), self.capacity - pos)
+        target[pos : pos + first] = data[:first]
+        target[pos + self.capacity : pos + self.capacity + first] = data[:first]
+        rest = len(data) - first
+        if rest:
+            target[:rest] = data[first:]
+            target[self.capacity : self.capacity + rest] = data[first:]
+
+    def push(self, timestamps: np.ndarray, values: np.ndarray) -> None:
+        """
+        Добавить значения, при переполнении вытесняются самые старые
+
+        :param timestamps: время значений в секундах (epoch), по возрастанию
+        :type timestamps: np.ndarray
+        :param values: значения датчика
+        :type values: np.ndarray
+        """
+        n_new = len(timestamps)
+        if n_new == 0:
+            return
+        if n_new > self.capacity:
+            timestamps = timestamps[-self.capacity :]
+            values = values[-self.capacity :]
+            n_new = self.capacity
+        pos = (self._start + self._size) % self.capacity
+        self._write(self._time, pos, timestamps)
+        self._write(self._value, pos, values)
+        self._size += n_new
+        if self._size > self.capacity:
+            self._start = (self._start + self._size - self.capacity) % self.capacity
+            self._size = self.capacity
+
+    def drop_older(self, min_time: float) -> int:
+        """
+        Удалить значения старше min_time
+
+        :param min_time: граница времени в секундах (epoch)
+        :type min_time: float
+        :return: количество удалённых значений
+        :rtype: int
+        """
+        n_old = int(np.searchsorted(self.times, min_time, side="left"))
+        self._start = (self._start + n_old) % self.capacity
+        self._size -= n_old
+        return n_old
+
+    def clear(self) -> None:
+        self._start = 0
+        self._size = 0
+
+    @property
+    def times(self) -> np.ndarray:
+        """Время значений от старых к новым, срез без копирования"""
+        return self._time[self._start : self._start + self._size]
+
+    @property
+    def values(self) -> np.ndarray:
+        """Значения от старых к новым, срез без копирования"""
+        return self._value[self._start : self._start + self._size]
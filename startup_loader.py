@@ -0,0 +1,129 @@
+"""
+Фоновая загрузка данных при запуске главного окна.
+Загрузчики выполняются параллельно в пуле потоков, окно показывается сразу,
+а вкладки заполняются по мере поступления данных. Время до первой отрисовки
+окна и до загрузки каждой группы данных пишется в лог
+"""
+
+import logging
+import time
+
+from PyQt6 import QtCore
+
+
+class startupLoadSignals(QtCore.QObject):
+    # name, seconds spent in the loader
+    loaded = QtCore.pyqtSignal(str, float)
+    failed = QtCore.pyqtSignal(str, str)
+
+
+class startupLoadTask(QtCore.QRunnable):
+    """Вызов одного загрузчика, выполняется в пуле потоков"""
+
+    def __init__(self, signals, name: str, loader) -> None:
+        super().__init__()
+        self.signals = signals
+        self.name = name
+        self.loader = loader
+
+    def run(self):
+        begin = time.perf_counter()
+        try:
+            self.loader()
+        except Exception as e:
+            self.signals.failed.emit(self.name, str(e))
+            return
+        self.signals.loaded.emit(self.name, time.perf_counter() - begin)
+
+
+class startupLoader(QtCore.QObject):
+    """
+    Параллельный запуск загрузчиков данных окна.
+    Сигнал loaded приходит в потоке интерфейса, когда загрузчик завершился,
+    failed - при ошибке загрузчика, finished - когда завершились все загрузчики,
+    painted - при первой отрисовке окна из watch_first_paint
+    """
+
+    loaded = QtCore.pyqtSignal(str)
+    failed = QtCore.pyqtSignal(str, str)
+    finished = QtCore.pyqtSignal()
+    painted = QtCore.pyqtSignal(float)
+
+    def __init__(self, pool: QtCore.QThreadPool = None, parent=None) -> None:
+        """
+        :param pool: пул потоков, defaults to QThreadPool.globalInstance()
+        :type pool: QtCore.QThreadPool, optional
+        """
+        super().__init__(parent)
+        self.pool = QtCore.QThreadPool.globalInstance() if pool is None else pool
+        self.started_at = time.perf_counter()
+        self.loaders = {}
+        self.done = set()
+        self.errors = {}
+        # name: (ms since start when loaded, ms spent in the loader)
+        self.timings = {}
+        self.first_paint = None
+        # the signals object lives in the GUI thread, emits from tasks are queued
+        self._signals = startupLoadSignals()
+        self._signals.loaded.connect(self._on_loaded)
+        self._signals.failed.connect(self._on_failed)
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started_at) * 1000
+
+    def add(self, name: str, loader) -> None:
+        """
+        Добавить загрузчик
+
+        :param name: название группы данных
+        :type name: str
+        :param loader: функция без аргументов, выполняется вне потока интерфейса
+        :type loader: callable
+        """
+        self.loaders[name] = loader
+
+    def start(self) -> None:
+        for name, loader in self.loaders.items():
+            self.pool.start(startupLoadTask(self._signals, name, loader))
+
+    def retry(self, name: str) -> None:
+        """Повторно запустить загрузчик, завершившийся с ошибкой"""
+        self.errors.pop(name, None)
+        self.pool.start(startupLoadTask(self._signals, name, self.loaders[name]))
+
+    def loaded_all(self, *names: str) -> bool:
+        """Все ли указанные группы уже загружены"""
+        return all(name in self.done for name in names)
+
+    def watch_first_paint(self, widget: QtCore.QObject) -> None:
+        """Записать в лог время до первой отрисовки widget"""
+        widget.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QtCore.QEvent.Type.Paint and self.first_paint is None:
+            self.first_paint = self.elapsed_ms()
+            logging.info(f"Startup: first paint after {self.first_paint:.0f} ms")
+            obj.removeEventFilter(self)
+            self.painted.emit(self.first_paint)
+        return False
+
+    def _on_loaded(self, name: str, seconds: float) -> None:
+        self.done.add(name)
+        self.timings[name] = (self.elapsed_ms(), seconds * 1000)
+        logging.info(
+            f"Startup: {name} loaded after {self.elapsed_ms():.0f} ms"
+            f" ({seconds * 1000:.0f} ms in loader)"
+        )
+        self.loaded.emit(name)
+        self._check_finished()
+
+    def _on_failed(self, name: str, error: str) -> None:
+        self.errors[name] = error
+        logging.warning(f"Startup: {name} loading failed: {error}")
+        self.failed.emit(name, error)
+        self._check_finished()
+
+    def _check_finished(self) -> None:
+        if len(self.done) + len(self.errors) == len(self.loaders):
+            logging.info(f"Startup: all data loaded after {self.elapsed_ms():.0f} ms")
+            self.finished.emit()
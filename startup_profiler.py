@@ -0,0 +1,133 @@
+"""
+Профилирование запуска главного окна: время импорта модулей и этапов
+инициализации до первой отрисовки и загрузки данных.
+
+Включается ключом командной строки --profile-startup или переменной окружения
+STARTUP_PROFILE=1. Модуль должен импортироваться в main.py первым, иначе
+время импорта остальных модулей не попадёт в отчёт
+"""
+
+import builtins
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+class startupProfiler:
+    """
+    Сбор времени импорта (перехват __import__ в основном потоке) и этапов
+    запуска. Учитываются только внешние импорты: время вложенных импортов
+    входит во время импорта модуля, который их вызвал
+    """
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.started_at = time.perf_counter()
+        self.enabled = False
+        self.imports = {}
+        self.stages = []
+        self._depth = 0
+        self._reported = False
+        self._original_import = builtins.__import__
+        if enabled:
+            self.enable()
+
+    def elapsed_ms(self, moment: float = None) -> float:
+        if moment is None:
+            moment = time.perf_counter()
+        return (moment - self.started_at) * 1000
+
+    def enable(self) -> None:
+        if self.enabled:
+            return
+        self.enabled = True
+        builtins.__import__ = self._import
+
+    def disable(self) -> None:
+        if self.enabled:
+            builtins.__import__ = self._original_import
+            self.enabled = False
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if self._depth or threading.current_thread() is not threading.main_thread():
+            return self._original_import(name, globals, locals, fromlist, level)
+        self._depth += 1
+        begin = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            self._depth -= 1
+            elapsed = (time.perf_counter() - begin) * 1000
+            # already imported modules cost nothing, keep the report short
+            if elapsed >= 0.5:
+                self.imports[name] = self.imports.get(name, 0) + elapsed
+                if self._reported:
+                    print(f"[startup] lazy import {name}: {elapsed:.0f} ms")
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Замер этапа инициализации
+
+        :param name: название этапа в отчёте
+        :type name: str
+        """
+        if not self.enabled:
+            yield
+            return
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((name, (time.perf_counter() - begin) * 1000))
+
+    def watch_startup(self, loader, budget_ms: float = None) -> None:
+        """
+        Напечатать отчёт, когда окно отрисовано и все данные загружены
+
+        :param loader: загрузчик данных главного окна
+        :type loader: startup_loader.startupLoader
+        :param budget_ms: допустимое время до первой отрисовки, defaults to None
+        :type budget_ms: float, optional
+        """
+        if not self.enabled:
+            return
+
+        def try_report():
+            finished = len(loader.done) + len(loader.errors) == len(loader.loaders)
+            if loader.first_paint is not None and finished and not self._reported:
+                self.report(loader, budget_ms)
+
+        loader.finished.connect(try_report)
+        loader.painted.connect(try_report)
+
+    def report(self, loader=None, budget_ms: float = None) -> None:
+        """Печать отчёта о запуске в stdout"""
+        self._reported = True
+        lines = ["[startup] imports:"]
+        for name, elapsed in sorted(self.imports.items(), key=lambda el: -el[1]):
+            lines.append(f"[startup]   {name:<32} {elapsed:8.1f} ms")
+        lines.append(f"[startup]   {'total':<32} {sum(self.imports.values()):8.1f} ms")
+        lines.append("[startup] init:")
+        for name, elapsed in self.stages:
+            lines.append(f"[startup]   {name:<32} {elapsed:8.1f} ms")
+        if loader is not None:
+            lines.append("[startup] data (since process start / in loader):")
+            for name, (done_at, in_loader) in loader.timings.items():
+                done_at = self.elapsed_ms(loader.started_at) + done_at
+                lines.append(
+                    f"[startup]   {name:<32} {done_at:8.1f} ms {in_loader:8.1f} ms"
+                )
+            first_paint = self.elapsed_ms(loader.started_at) + loader.first_paint
+            lines.append(f"[startup] first paint after {first_paint:.0f} ms")
+            if budget_ms is not None:
+                verdict = "OK" if first_paint <= budget_ms else "OVER BUDGET"
+                lines.append(f"[startup] budget {budget_ms:.0f} ms: {verdict}")
+        print("\n".join(lines))
+
+
+PROFILER = startupProfiler(
+    enabled="--profile-startup" in sys.argv
+    or os.environ.get("STARTUP_PROFILE", "") not in ("", "0")
+)
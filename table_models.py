@@ -0,0 +1,131 @@
+"""
+Модели таблиц главного окна (model/view вместо QTableWidget).
+Данные хранятся по колонкам, текст ячейки формируется только когда
+представление запрашивает видимую ячейку
+"""
+
+from PyQt6 import QtCore
+
+
+class dictColumn:
+    """
+    Колонка поверх списка строк-словарей: значение берётся из строки только
+    при обращении, поэтому построение колонки не копирует данные
+    """
+
+    __slots__ = ("_rows", "_key")
+
+    def __init__(self, rows: list, key: str) -> None:
+        self._rows = rows
+        self._key = key
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getitem__(self, row: int):
+        return self._rows[row][self._key]
+
+
+def dict_columns(id_ref: dict, keys: list[str], ids: list = None) -> list:
+    """
+    Колонки из словаря код: строка, первая колонка - коды
+
+    :param id_ref: словарь код записи: словарь значений
+    :type id_ref: dict
+    :param keys: названия колонок в порядке таблицы
+    :type keys: list[str]
+    :param ids: коды строк, defaults to None (все записи id_ref)
+    :type ids: list, optional
+    :return: список колонок
+    :rtype: list
+    """
+    if ids is None:
+        ids = list(id_ref)
+        rows = list(id_ref.values())
+    else:
+        ids = list(ids)
+        rows = [id_ref[key] for key in ids]
+    return [ids] + [dictColumn(rows, key) for key in keys]
+
+
+class columnTableModel(QtCore.QAbstractTableModel):
+    """
+    Таблица только для чтения поверх списка колонок.
+    Для каждой колонки можно задать функцию форматирования значения в текст
+    """
+
+    def __init__(
+        self, headers: list[str], formatters: list = None, parent=None
+    ) -> None:
+        """
+        :param headers: заголовки колонок
+        :type headers: list[str]
+        :param formatters: функции значение -> текст по колонкам, None - str(value),
+            defaults to None
+        :type formatters: list[callable], optional
+        """
+        super().__init__(parent)
+        self._headers = list(headers)
+        self._formatters = (
+            [None] * len(headers) if formatters is None else list(formatters)
+        )
+        self._columns = [[] for _ in headers]
+        self._row_count = 0
+
+    def set_headers(self, headers: list[str]) -> None:
+        self._headers = list(headers)
+        self.headerDataChanged.emit(
+            QtCore.Qt.Orientation.Horizontal, 0, len(self._headers) - 1
+        )
+
+    def set_columns(self, columns: list) -> None:
+        """
+        Заменить данные таблицы
+
+        :param columns: колонки одинаковой длины (списки или массивы)
+        :type columns: list
+        """
+        if len(columns) != len(self._headers):
+            raise ValueError("Invalid columns param")
+        row_count = len(columns[0]) if columns else 0
+        if any(len(column) != row_count for column in columns):
+            raise ValueError("Columns have different length")
+        self.beginResetModel()
+        self._columns = list(columns)
+        self._row_count = row_count
+        self.endResetModel()
+
+    def clear(self) -> None:
+        self.set_columns([[] for _ in self._headers])
+
+    def value(self, row: int, column: int):
+        """Исходное значение ячейки"""
+        return self._columns[column][row]
+
+    def cell_text(self, row: int, column: int) -> str:
+        """Текст ячейки, как он показывается в таблице"""
+        value = self._columns[column][row]
+        formatter = self._formatters[column]
+        if formatter is not None:
+            return formatter(value)
+        return "" if value is None else str(value)
+
+    def rowCount(self, parent=QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._row_count
+
+    def columnCount(self, parent=QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._headers)
+
+    def data(self, index, role=QtCore.Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != QtCore.Qt.ItemDataRole.DisplayRole:
+            return None
+        return self.cell_text(index.row(), index.column())
+
+    def headerData(
+        self, section: int, orientation, role=QtCore.Qt.ItemDataRole.DisplayRole
+    ):
+        if role != QtCore.Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == QtCore.Qt.Orientation.Horizontal:
+            return self._headers[section]
+        return str(section + 1)
@@ -1,5 +1,7 @@
 import psycopg2
 from db_operation_functions import queryComposer
+import sensor_logs_partitions
+import sensor_logs_rollups
 import pandas as pd
 import numpy as np
 
@@ -40,6 +42,84 @@ conn.commit()
 cur.close()
 conn.close()
 
+# sensor_logs as a time-partitioned table with rollups
+conn = psycopg2.connect(
+    host="localhost", database=db_name, user=username, password=password_n, port=5432
+)
+sensor_logs_partitions.install(conn)
+# 1 min / 15 min / 1 h aggregates kept up to date by triggers
+sensor_logs_rollups.install(conn)
+conn.close()
+
+# event trigger for schema cache invalidation (requires superuser)
+conn = psycopg2.connect(
+    host="localhost", database=db_name, user="postgres", password=password, port=5432
+)
+conn.set_session(autocommit=True)
+cur = conn.cursor()
+query = """
+create or replace function public.notify_schema_changed() returns event_trigger
+language plpgsql as $$
+declare
+    obj record;
+begin
+    for obj in select * from pg_event_trigger_ddl_commands()
+        where object_type = 'table'
+    loop
+        perform pg_notify('schema_changed', obj.object_identity);
+    end loop;
+end;
+$$;
+create event trigger schema_changed_trigger on ddl_command_end
+    execute function public.notify_schema_changed();
+"""
+cur.execute(query)
+cur.close()
+conn.close()
+
+# live plot push mode: per sensor NOTIFY on sensor_log_<sensor_id>
+conn = psycopg2.connect(
+    host="localhost", database=db_name, user=username, password=password_n, port=5432
+)
+conn.set_session(autocommit=True)
+cur = conn.cursor()
+query = """
+create or replace function public.notify_sensor_logs() returns trigger
+language plpgsql as $$
+declare
+    rec record;
+    payload text;
+begin
+    for rec in select sensor_id, count(*) as n from new_rows group by sensor_id
+    loop
+        payload := '';
+        -- NOTIFY payload is limited to 8000 bytes, big batches are fetched by clients
+        if rec.n <= 150 then
+            select json_build_object(
+                't', json_agg(extract(epoch from log_datetime) order by log_datetime),
+                'v', json_agg(sensor_value order by log_datetime)
+            )::text
+            into payload
+            from new_rows
+            where sensor_id = rec.sensor_id;
+            if octet_length(payload) > 7900 then
+                payload := '';
+            end if;
+        end if;
+        perform pg_notify('sensor_log_' || rec.sensor_id, payload);
+    end loop;
+    return null;
+end;
+$$;
+create trigger sensor_logs_notify_trigger
+    after insert on sensor_logs
+    referencing new table as new_rows
+    for each statement execute function public.notify_sensor_logs();
+"""
+cur.execute(query)
+cur.close()
+conn.close()
+
 # import data new
 
 df = pd.read_csv("risk_register_final.csv")
@@ -76,22 +156,30 @@ conn_params = {
 }
 
 qc = queryComposer("risk_register", conn_params=conn_params)
-for idx, rec in df.iterrows():
-    tmp = dict(rec)
-    qc.insert_query(tmp)
+qc.bulk_insert(df)
+risk_ids = {risk["risk_id"] for risk in qc.select_query()}
 qc.close_connection()
 
 pm_df = pd.read_csv("pm_df_data.csv")
 pm_df.drop(columns=["Unnamed: 0"], inplace=True)
 pm_df.columns = ["risk_id", "prevention_measure_name"]
+# one bad row rolls back the whole COPY, measures of unknown risks are dropped first
+known_risk = pm_df["risk_id"].isin(risk_ids)
+if not known_risk.all():
+    print(
+        f"Skipped {(~known_risk).sum()} prevention measures with unknown risk_id: "
+        f"{sorted(pm_df.loc[~known_risk, 'risk_id'].unique().tolist())}"
+    )
+pm_df = pm_df[known_risk]
 
 
 qc = queryComposer("prevention_measures", conn_params=conn_params)
-for _, rec in pm_df.iterrows():
-    try:
+try:
+    qc.bulk_insert(pm_df)
+except psycopg2.Error:
+    # fall back to row by row insert, bad rows are reported and skipped
+    for _, rec in pm_df.iterrows():
         qc.insert_query(dict(rec))
-    except:
-        print("oshibqa")
 qc.close_connection()
 
 
@@ -1,4 +1,8 @@
+import io
+import logging
 import psycopg2
+import psycopg2.extras
+import time
 from string import Template
 
 DEFAULT_CONNECTION_PARAMS = {
@@ -12,6 +16,64 @@ DEFAULT_CONNECTION_PARAMS = {
 # )
 
 
+def adapt_value(value):
+    """
+    Приводит значения numpy/pandas к встроенным типам python для передачи в psycopg2
+
+    :param value: значение
+    :return: значение понятное psycopg2
+    """
+    if hasattr(value, "item") and not isinstance(value, (str, bytes)):
+        return value.item()
+    return value
+
+
+def copy_field(value) -> str:
+    """
+    Значение в текстовом формате COPY, None и NaN передаются как NULL
+
+    :param value: значение
+    :return: строка для COPY FROM STDIN
+    :rtype: str
+    """
+    if value is None:
+        return "\\N"
+    if isinstance(value, float):
+        if value != value:
+            return "\\N"
+        # ndarray.tolist() отдаёт целые колонки как float
+        if value.is_integer():
+            return str(int(value))
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def iter_rows(rows, columns: list[str] = None) -> tuple[list[str], object]:
+    """
+    Приводит строки к итератору кортежей
+
+    :param rows: список словарей или последовательностей, двумерный numpy.ndarray или pandas.DataFrame
+    :param columns: названия колонок, для словарей и DataFrame берутся из данных
+    :type columns: list[str], optional
+    :return: названия колонок и итератор кортежей значений
+    :rtype: tuple(list[str], iterator)
+    """
+    if hasattr(rows, "itertuples"):
+        columns = list(rows.columns) if columns is None else columns
+        return columns, rows[columns].itertuples(index=False, name=None)
+    if hasattr(rows, "ndim"):
+        return columns, (tuple(row) for row in rows.tolist())
+    if rows and isinstance(rows[0], dict):
+        columns = list(rows[0]) if columns is None else columns
+        return columns, (tuple(row.get(col) for col in columns) for row in rows)
+    return columns, (tuple(row) for row in rows)
+
+
 class autoQuotePlacer:
     def __init__(self, schema_info: dict) -> None:
         self.schema = schema_info
@@ -100,6 +162,79 @@ class queryComposer:
         finally:
             cursor.close()
 
+    def bulk_insert(
+        self,
+        rows,
+        columns: list[str] = None,
+        batch_size: int = 10000,
+        method: str = "copy",
+    ) -> dict:
+        """
+        Массовая вставка в одной транзакции через COPY FROM STDIN или execute_values
+
+        :param rows: список словарей или последовательностей, двумерный numpy.ndarray или pandas.DataFrame
+        :param columns: названия колонок, обязательны для последовательностей и ndarray
+        :type columns: list[str], optional
+        :param batch_size: количество строк в одной пачке, defaults to 10000
+        :type batch_size: int, optional
+        :param method: "copy" или "values", defaults to "copy"
+        :type method: str, optional
+        :raises ValueError: неизвестный method или не заданы колонки
+        :return: количество строк, время и скорость вставки
+        :rtype: dict
+        """
+        if method not in ["copy", "values"]:
+            raise ValueError("Invalid method param")
+        columns, row_iter = iter_rows(rows, columns)
+        if not columns:
+            raise ValueError("Columns are not specified")
+        start_time = time.perf_counter()
+        n_rows = 0
+        cursor = self.conn.cursor()
+        copy_query = f"copy {self.table_name} ({', '.join(columns)}) from stdin;"
+        values_query = (
+            f"insert into {self.table_name} ({', '.join(columns)}) values %s;"
+        )
+        try:
+            while True:
+                batch = [row for _, row in zip(range(batch_size), row_iter)]
+                if not batch:
+                    break
+                if method == "copy":
+                    buffer = io.StringIO()
+                    for row in batch:
+                        buffer.write("\t".join(map(copy_field, row)))
+                        buffer.write("\n")
+                    buffer.seek(0)
+                    cursor.copy_expert(copy_query, buffer)
+                else:
+                    psycopg2.extras.execute_values(
+                        cursor,
+                        values_query,
+                        [tuple(map(adapt_value, row)) for row in batch],
+                        page_size=batch_size,
+                    )
+                n_rows += len(batch)
+            self.conn.commit()
+        except Exception as e:
+            # логирование ошибки
+            print(f"Ошибка в запросе на массовую вставку: {e}")
+            self.conn.rollback()
+            raise
+        finally:
+            cursor.close()
+        elapsed = time.perf_counter() - start_time
+        stats = {
+            "rows": n_rows,
+            "seconds": elapsed,
+            "rows_per_sec": n_rows / elapsed if elapsed else 0.0,
+        }
+        logging.info(
+            f"Bulk insert into {self.table_name}: {n_rows} rows, "
+            f"{stats['rows_per_sec']:.0f} rows/s"
+        )
+        return stats
+
     def delete_query(self, key, value):
         """
         Запрос на удаление
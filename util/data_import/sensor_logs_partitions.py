@@ -0,0 +1,242 @@
+"""
+Секционирование sensor_logs по времени (declarative range partitioning).
+
+install() переводит sensor_logs в секционированную таблицу (с переносом
+существующих строк) и создаёт функции обслуживания на сервере:
+    ensure_sensor_logs_partitions - создание секций на будущее,
+    drop_sensor_logs_partitions - хранение: отсоединение и удаление старых секций.
+Запуск модуля создаёт секции на неделю вперёд, его можно ставить в планировщик
+"""
+
+import logging
+import psycopg2
+
+from db_operation_functions import DEFAULT_CONNECTION_PARAMS
+
+# day или week, для уже созданной таблицы шаг менять нельзя (секции пересекутся)
+PARTITION_STEP = "day"
+PARTITION_AHEAD_DAYS = 7
+
+PARTITIONED_TABLE_QUERY = """
+create table public.sensor_logs (
+    sensor_log_id serial,
+    sensor_id integer references public.sensor(sensor_id),
+    log_datetime timestamp without time zone not null,
+    sensor_value double precision,
+    raw_log varchar(255),
+    primary key (sensor_log_id, log_datetime)
+) partition by range (log_datetime);
+create index sensor_logs_sensor_id_log_datetime_idx
+    on public.sensor_logs (sensor_id, log_datetime);
+create index sensor_logs_log_datetime_brin_idx
+    on public.sensor_logs using brin (log_datetime);
+create table public.sensor_logs_default partition of public.sensor_logs default;
+"""
+
+FUNCTIONS_QUERY = """
+create or replace function public.ensure_sensor_logs_partitions(
+    from_time timestamp default now()::timestamp,
+    ahead interval default interval '7 days',
+    step text default 'day'
+) returns integer
+language plpgsql as $$
+declare
+    part_start timestamp := date_trunc(step, from_time);
+    part_end timestamp;
+    part_name text;
+    created integer := 0;
+begin
+    while part_start < from_time + ahead loop
+        part_end := part_start + ('1 ' || step)::interval;
+        part_name := 'sensor_logs_p' || to_char(part_start, 'YYYYMMDD');
+        if to_regclass('public.' || part_name) is null then
+            if exists (
+                select 1 from public.sensor_logs_default
+                where log_datetime >= part_start and log_datetime < part_end
+            ) then
+                -- rows of this range are in the default partition, move them first
+                execute format(
+                    'create table public.%I (like public.sensor_logs including defaults)',
+                    part_name
+                );
+                execute format(
+                    'with moved as (delete from public.sensor_logs_default '
+                    'where log_datetime >= %L and log_datetime < %L returning *) '
+                    'insert into public.%I select * from moved',
+                    part_start, part_end, part_name
+                );
+                execute format(
+                    'alter table public.sensor_logs attach partition public.%I '
+                    'for values from (%L) to (%L)',
+                    part_name, part_start, part_end
+                );
+            else
+                execute format(
+                    'create table public.%I partition of public.sensor_logs '
+                    'for values from (%L) to (%L)',
+                    part_name, part_start, part_end
+                );
+            end if;
+            created := created + 1;
+        end if;
+        part_start := part_end;
+    end loop;
+    return created;
+end;
+$$;
+
+create or replace function public.drop_sensor_logs_partitions(
+    keep interval,
+    detach_only boolean default false
+) returns integer
+language plpgsql as $$
+declare
+    part record;
+    part_end timestamp;
+    dropped integer := 0;
+begin
+    for part in
+        select c.relname, pg_get_expr(c.relpartbound, c.oid) as bound
+        from pg_inherits i
+        join pg_class c on c.oid = i.inhrelid
+        where i.inhparent = 'public.sensor_logs'::regclass
+    loop
+        -- FOR VALUES FROM ('...') TO ('...'), the default partition has no bounds
+        part_end := substring(part.bound from 'TO \\(''([^'']+)''\\)')::timestamp;
+        if part_end is not null and part_end <= now()::timestamp - keep then
+            execute format(
+                'alter table public.sensor_logs detach partition public.%I', part.relname
+            );
+            if not detach_only then
+                execute format('drop table public.%I', part.relname);
+            end if;
+            dropped := dropped + 1;
+        end if;
+    end loop;
+    return dropped;
+end;
+$$;
+"""
+
+
+def is_partitioned(conn) -> bool:
+    cur = conn.cursor()
+    cur.execute(
+        "select relkind from pg_class where oid = to_regclass('public.sensor_logs');"
+    )
+    row = cur.fetchone()
+    cur.close()
+    return row is not None and row[0] == "p"
+
+
+def install(
+    conn, step: str = PARTITION_STEP, ahead_days: int = PARTITION_AHEAD_DAYS
+) -> None:
+    """
+    Перевод sensor_logs в секционированную таблицу и установка функций обслуживания.
+    Существующие строки переносятся (строки без log_datetime отбрасываются),
+    повторный вызов только обновляет функции и создаёт недостающие секции
+
+    :param conn: подключение владельца таблицы
+    :type conn: psycopg2.extensions.connection
+    :param step: шаг секций, day или week, defaults to PARTITION_STEP
+    :type step: str, optional
+    :param ahead_days: на сколько дней вперёд создавать секции, defaults to PARTITION_AHEAD_DAYS
+    :type ahead_days: int, optional
+    """
+    if step not in ["day", "week"]:
+        raise ValueError("Invalid step param")
+    cur = conn.cursor()
+    try:
+        cur.execute(FUNCTIONS_QUERY)
+        if not is_partitioned(conn):
+            cur.execute("""
+                alter table public.sensor_logs rename to sensor_logs_unpartitioned;
+                alter index public.sensor_logs_pkey
+                    rename to sensor_logs_unpartitioned_pkey;
+                alter sequence public.sensor_logs_sensor_log_id_seq
+                    rename to sensor_logs_unpartitioned_sensor_log_id_seq;
+                """)
+            cur.execute(PARTITIONED_TABLE_QUERY)
+            # partitions for the whole range of the old rows
+            cur.execute(
+                """
+                select public.ensure_sensor_logs_partitions(
+                    min(log_datetime), now()::timestamp - min(log_datetime), %s
+                )
+                from public.sensor_logs_unpartitioned;
+                """,
+                (step,),
+            )
+            cur.execute("""
+                insert into public.sensor_logs
+                select * from public.sensor_logs_unpartitioned
+                where log_datetime is not null;
+                select setval(
+                    pg_get_serial_sequence('public.sensor_logs', 'sensor_log_id'),
+                    coalesce(max(sensor_log_id), 0) + 1,
+                    false
+                )
+                from public.sensor_logs;
+                drop table public.sensor_logs_unpartitioned;
+                """)
+        cur.execute(
+            "select public.ensure_sensor_logs_partitions(now()::timestamp, %s, %s);",
+            (f"{ahead_days} days", step),
+        )
+        conn.commit()
+    except psycopg2.Error as e:
+        print(f"Ошибка секционирования sensor_logs: {e}")
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+
+def ensure_partitions(
+    conn, step: str = PARTITION_STEP, ahead_days: int = PARTITION_AHEAD_DAYS
+) -> int:
+    """
+    Создать недостающие секции от текущего времени на ahead_days вперёд
+
+    :return: количество созданных секций
+    :rtype: int
+    """
+    cur = conn.cursor()
+    cur.execute(
+        "select public.ensure_sensor_logs_partitions(now()::timestamp, %s, %s);",
+        (f"{ahead_days} days", step),
+    )
+    created = cur.fetchone()[0]
+    cur.close()
+    conn.commit()
+    return created
+
+
+def apply_retention(conn, keep_days: int, detach_only: bool = False) -> int:
+    """
+    Отсоединить (и удалить) секции старше keep_days вместо построчного DELETE
+
+    :param keep_days: сколько дней хранить
+    :type keep_days: int
+    :param detach_only: только отсоединить, например для архивации, defaults to False
+    :type detach_only: bool, optional
+    :return: количество отсоединённых секций
+    :rtype: int
+    """
+    cur = conn.cursor()
+    cur.execute(
+        "select public.drop_sensor_logs_partitions(%s, %s);",
+        (f"{keep_days} days", detach_only),
+    )
+    dropped = cur.fetchone()[0]
+    cur.close()
+    conn.commit()
+    return dropped
+
+
+if __name__ == "__main__":
+    conn = psycopg2.connect(**DEFAULT_CONNECTION_PARAMS)
+    created = ensure_partitions(conn)
+    logging.warning(f"sensor_logs partitions created: {created}")
+    conn.close()
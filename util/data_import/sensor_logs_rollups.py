@@ -0,0 +1,185 @@
+"""
+Агрегаты sensor_logs по интервалам 1 минута, 15 минут и 1 час
+(таблицы sensor_logs_1m, sensor_logs_15m, sensor_logs_1h: min, max, sum, count).
+
+Агрегаты обновляются триггерами на sensor_logs: вставка добавляет новые строки
+в агрегаты (upsert), удаление пересчитывает затронутые интервалы.
+rebuild_sensor_logs_rollups пересчитывает агрегаты за произвольный диапазон.
+Запуск модуля пересчитывает все агрегаты
+"""
+
+import psycopg2
+
+from db_operation_functions import DEFAULT_CONNECTION_PARAMS
+
+# table name: bucket width in seconds
+ROLLUP_TABLES = {
+    "sensor_logs_1m": 60,
+    "sensor_logs_15m": 15 * 60,
+    "sensor_logs_1h": 60 * 60,
+}
+
+ROLLUP_TABLE_TEMPLATE = """
+create table if not exists public.{table_name} (
+    sensor_id integer not null,
+    bucket_start timestamp without time zone not null,
+    value_min double precision,
+    value_max double precision,
+    value_sum double precision,
+    value_count bigint not null,
+    primary key (sensor_id, bucket_start)
+);
+"""
+
+FUNCTIONS_QUERY = """
+create or replace function public.sensor_logs_bucket(ts timestamp, width integer)
+returns timestamp
+language sql immutable as $$
+    select 'epoch'::timestamp
+        + floor(extract(epoch from ts) / width) * width * interval '1 second';
+$$;
+
+create or replace function public.rebuild_sensor_logs_rollups(
+    target_sensor integer default null,
+    from_time timestamp default '-infinity',
+    to_time timestamp default 'infinity'
+) returns void
+language plpgsql as $$
+declare
+    tables text[] := array['sensor_logs_1m', 'sensor_logs_15m', 'sensor_logs_1h'];
+    widths integer[] := array[60, 900, 3600];
+    lo timestamp;
+    hi timestamp;
+begin
+    for i in 1 .. array_length(tables, 1) loop
+        -- whole buckets around the range
+        lo := case when isfinite(from_time)
+            then public.sensor_logs_bucket(from_time, widths[i]) else from_time end;
+        hi := case when isfinite(to_time)
+            then public.sensor_logs_bucket(to_time, widths[i])
+                + widths[i] * interval '1 second'
+            else to_time end;
+        execute format(
+            'delete from public.%I where ($1 is null or sensor_id = $1) '
+            'and bucket_start >= $2 and bucket_start < $3',
+            tables[i]
+        ) using target_sensor, lo, hi;
+        execute format(
+            'insert into public.%I '
+            '(sensor_id, bucket_start, value_min, value_max, value_sum, value_count) '
+            'select sensor_id, public.sensor_logs_bucket(log_datetime, $4), '
+            'min(sensor_value), max(sensor_value), sum(sensor_value), count(sensor_value) '
+            'from public.sensor_logs where ($1 is null or sensor_id = $1) '
+            'and log_datetime >= $2 and log_datetime < $3 group by 1, 2',
+            tables[i]
+        ) using target_sensor, lo, hi, widths[i];
+    end loop;
+end;
+$$;
+
+create or replace function public.rollup_sensor_logs_insert() returns trigger
+language plpgsql as $$
+declare
+    tables text[] := array['sensor_logs_1m', 'sensor_logs_15m', 'sensor_logs_1h'];
+    widths integer[] := array[60, 900, 3600];
+begin
+    for i in 1 .. array_length(tables, 1) loop
+        execute format(
+            'insert into public.%I as r '
+            '(sensor_id, bucket_start, value_min, value_max, value_sum, value_count) '
+            'select sensor_id, public.sensor_logs_bucket(log_datetime, %s), '
+            'min(sensor_value), max(sensor_value), sum(sensor_value), count(sensor_value) '
+            'from new_rows group by 1, 2 '
+            'on conflict (sensor_id, bucket_start) do update set '
+            'value_min = least(r.value_min, excluded.value_min), '
+            'value_max = greatest(r.value_max, excluded.value_max), '
+            'value_sum = coalesce(r.value_sum, 0) + coalesce(excluded.value_sum, 0), '
+            'value_count = r.value_count + excluded.value_count',
+            tables[i], widths[i]
+        );
+    end loop;
+    return null;
+end;
+$$;
+
+create or replace function public.rollup_sensor_logs_delete() returns trigger
+language plpgsql as $$
+declare
+    rec record;
+begin
+    -- min/max can not be decremented, the touched buckets are recomputed
+    for rec in
+        select sensor_id, min(log_datetime) as lo, max(log_datetime) as hi
+        from old_rows group by sensor_id
+    loop
+        perform public.rebuild_sensor_logs_rollups(rec.sensor_id, rec.lo, rec.hi);
+    end loop;
+    return null;
+end;
+$$;
+"""
+
+TRIGGERS_QUERY = """
+drop trigger if exists sensor_logs_rollup_insert_trigger on public.sensor_logs;
+create trigger sensor_logs_rollup_insert_trigger
+    after insert on public.sensor_logs
+    referencing new table as new_rows
+    for each statement execute function public.rollup_sensor_logs_insert();
+drop trigger if exists sensor_logs_rollup_delete_trigger on public.sensor_logs;
+create trigger sensor_logs_rollup_delete_trigger
+    after delete on public.sensor_logs
+    referencing old table as old_rows
+    for each statement execute function public.rollup_sensor_logs_delete();
+"""
+
+
+def install(conn) -> None:
+    """
+    Создание таблиц агрегатов, функций и триггеров, заполнение агрегатов
+    по уже записанным значениям
+
+    :param conn: подключение владельца sensor_logs
+    :type conn: psycopg2.extensions.connection
+    """
+    cur = conn.cursor()
+    try:
+        for table_name in ROLLUP_TABLES:
+            cur.execute(ROLLUP_TABLE_TEMPLATE.format(table_name=table_name))
+        cur.execute(FUNCTIONS_QUERY)
+        cur.execute(TRIGGERS_QUERY)
+        cur.execute("select public.rebuild_sensor_logs_rollups();")
+        conn.commit()
+    except psycopg2.Error as e:
+        print(f"Ошибка создания агрегатов sensor_logs: {e}")
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+
+def rebuild(conn, sensor_id: int = None, from_time=None, to_time=None) -> None:
+    """
+    Пересчёт агрегатов, например после изменения sensor_logs в обход триггеров
+    (UPDATE, отсоединение секций)
+
+    :param sensor_id: код датчика, defaults to None (все датчики)
+    :type sensor_id: int, optional
+    :param from_time: начало диапазона, defaults to None (без ограничения)
+    :type from_time: datetime.datetime, optional
+    :param to_time: конец диапазона, defaults to None (без ограничения)
+    :type to_time: datetime.datetime, optional
+    """
+    cur = conn.cursor()
+    cur.execute(
+        "select public.rebuild_sensor_logs_rollups("
+        "%s, coalesce(%s, '-infinity'::timestamp), coalesce(%s, 'infinity'::timestamp));",
+        (sensor_id, from_time, to_time),
+    )
+    cur.close()
+    conn.commit()
+
+
+if __name__ == "__main__":
+    conn = psycopg2.connect(**DEFAULT_CONNECTION_PARAMS)
+    rebuild(conn)
+    conn.close()
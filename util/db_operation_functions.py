@@ -1,7 +1,18 @@
+import io
+import itertools
+import numpy as np
 import psycopg2
+import psycopg2.errors
+import psycopg2.extras
+import select
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+from psycopg2.pool import PoolError
 from string import Template
+import atexit
 import logging
+import threading
 import time
+import weakref
 
 logging.basicConfig(level=logging.WARNING)
 DEFAULT_CONNECTION_PARAMS = {
@@ -10,6 +21,16 @@ DEFAULT_CONNECTION_PARAMS = {
     "password": "0000",
     "host": "localhost",
 }
+DEFAULT_POOL_PARAMS = {
+    "min_size": 1,
+    "max_size": 8,
+    "idle_timeout": 300.0,
+    "health_check_interval": 30.0,
+    "borrow_timeout": 10.0,
+}
+SCHEMA_CHANGED_CHANNEL = "schema_changed"
+# NOTIFY channel of a sensor is SENSOR_LOG_CHANNEL_PREFIX + sensor_id
+SENSOR_LOG_CHANNEL_PREFIX = "sensor_log_"
 
 
 # def timer(func):
@@ -23,6 +44,687 @@ DEFAULT_CONNECTION_PARAMS = {
 #     return wrapper
 
 
+class connectionPool:
+    """
+    Потокобезопасный пул подключений к базе данных.
+    Подключения выдаются по принципу LIFO, чтобы чаще использовались "тёплые",
+    а простаивающие дольше idle_timeout закрываются (но не ниже min_size)
+    """
+
+    def __init__(
+        self,
+        conn_params: dict = None,
+        min_size: int = 1,
+        max_size: int = 8,
+        idle_timeout: float = 300.0,
+        health_check_interval: float = 30.0,
+        borrow_timeout: float = 10.0,
+    ) -> None:
+        """
+        :param conn_params: параметры psycopg2.connect, defaults to DEFAULT_CONNECTION_PARAMS
+        :type conn_params: dict, optional
+        :param min_size: минимальное количество удерживаемых подключений, defaults to 1
+        :type min_size: int, optional
+        :param max_size: максимальное количество подключений, defaults to 8
+        :type max_size: int, optional
+        :param idle_timeout: время простоя (с), после которого подключение закрывается, defaults to 300.0
+        :type idle_timeout: float, optional
+        :param health_check_interval: время простоя (с), после которого подключение
+            проверяется запросом перед выдачей, defaults to 30.0
+        :type health_check_interval: float, optional
+        :param borrow_timeout: максимальное время ожидания свободного подключения (с), defaults to 10.0
+        :type borrow_timeout: float, optional
+        """
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Invalid pool size params")
+        self.conn_params = (
+            DEFAULT_CONNECTION_PARAMS if conn_params is None else conn_params
+        )
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.borrow_timeout = borrow_timeout
+        self._cond = threading.Condition()
+        # свободные подключения: (conn, время возврата)
+        self._idle = []
+        self._size = 0
+        self._closed = False
+        self.stats = {
+            "borrowed": 0,
+            "created": 0,
+            "evicted": 0,
+            "failed_checks": 0,
+            "wait_total": 0.0,
+            "wait_max": 0.0,
+        }
+
+    def _connect(self):
+        conn = psycopg2.connect(**self.conn_params)
+        with self._cond:
+            self.stats["created"] += 1
+        return conn
+
+    def _is_healthy(self, conn, last_used: float) -> bool:
+        if conn.closed:
+            return False
+        if time.monotonic() - last_used < self.health_check_interval:
+            return True
+        try:
+            cursor = conn.cursor()
+            cursor.execute("select 1;")
+            cursor.close()
+            conn.rollback()
+        except psycopg2.Error:
+            return False
+        return True
+
+    def _evict_idle(self) -> list:
+        """Убирает из пула простаивающие подключения, вызывается под блокировкой
+
+        :return: подключения, которые нужно закрыть
+        :rtype: list
+        """
+        now = time.monotonic()
+        evicted = []
+        # самые старые подключения лежат в начале списка
+        while (
+            self._idle
+            and self._size > self.min_size
+            and now - self._idle[0][1] > self.idle_timeout
+        ):
+            conn, _ = self._idle.pop(0)
+            evicted.append(conn)
+            self._size -= 1
+        self.stats["evicted"] += len(evicted)
+        return evicted
+
+    @staticmethod
+    def _close_quietly(conn) -> None:
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+    def getconn(self, timeout: float = None):
+        """
+        Взять подключение из пула. Если свободных нет и пул заполнен,
+        ожидает возврата подключения не дольше timeout секунд
+
+        :param timeout: время ожидания, defaults to borrow_timeout
+        :type timeout: float, optional
+        :raises PoolError: пул закрыт или время ожидания истекло
+        :return: подключение
+        :rtype: psycopg2.extensions.connection
+        """
+        timeout = self.borrow_timeout if timeout is None else timeout
+        start_time = time.perf_counter()
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            evicted = self._evict_idle()
+            while True:
+                if self._closed:
+                    raise PoolError("connection pool is closed")
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    conn, last_used = None, None
+                    self._size += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolError(
+                        f"no free connection in pool after {timeout:.1f} seconds"
+                    )
+                self._cond.wait(remaining)
+        for old_conn in evicted:
+            self._close_quietly(old_conn)
+
+        if conn is not None and not self._is_healthy(conn, last_used):
+            with self._cond:
+                self.stats["failed_checks"] += 1
+            self._close_quietly(conn)
+            conn = None
+        if conn is None:
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+
+        wait_time = time.perf_counter() - start_time
+        with self._cond:
+            self.stats["borrowed"] += 1
+            self.stats["wait_total"] += wait_time
+            self.stats["wait_max"] = max(self.stats["wait_max"], wait_time)
+        return conn
+
+    def putconn(self, conn, discard: bool = False) -> None:
+        """
+        Вернуть подключение в пул
+
+        :param conn: подключение полученное через getconn
+        :type conn: psycopg2.extensions.connection
+        :param discard: закрыть подключение вместо возврата, defaults to False
+        :type discard: bool, optional
+        """
+        if not discard and not conn.closed:
+            try:
+                if conn.info.transaction_status != TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                discard = True
+        with self._cond:
+            if discard or conn.closed or self._closed:
+                self._size -= 1
+                to_close = conn
+            else:
+                self._idle.append((conn, time.monotonic()))
+                to_close = None
+            self._cond.notify()
+        if to_close is not None:
+            self._close_quietly(to_close)
+
+    def closeall(self) -> None:
+        """Закрыть все свободные подключения и запретить выдачу новых"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn, _ in idle:
+            self._close_quietly(conn)
+
+    def get_stats(self) -> dict:
+        """
+        Статистика пула
+
+        :return: словарь со счётчиками и средним временем ожидания подключения
+        :rtype: dict
+        """
+        with self._cond:
+            stats = dict(self.stats)
+            stats["size"] = self._size
+            stats["idle"] = len(self._idle)
+        stats["wait_avg"] = (
+            stats["wait_total"] / stats["borrowed"] if stats["borrowed"] else 0.0
+        )
+        return stats
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_pool() -> connectionPool:
+    """
+    Общий для процесса пул подключений с параметрами по умолчанию
+
+    :return: пул подключений
+    :rtype: connectionPool
+    """
+    global _default_pool
+    if _default_pool is None:
+        with _default_pool_lock:
+            if _default_pool is None:
+                _default_pool = connectionPool(
+                    DEFAULT_CONNECTION_PARAMS, **DEFAULT_POOL_PARAMS
+                )
+                atexit.register(_close_default_pool)
+    return _default_pool
+
+
+def _close_default_pool() -> None:
+    if _default_pool is not None:
+        logging.info(f"Connection pool stats: {_default_pool.get_stats()}")
+        _default_pool.closeall()
+
+
+def ensure_sensor_logs_partitions(
+    from_time=None, ahead_days: float = 7, step: str = "day"
+) -> int:
+    """
+    Создать недостающие секции sensor_logs (см. util/data_import/sensor_logs_partitions),
+    для несекционированной таблицы ничего не делает
+
+    :param from_time: начало диапазона, defaults to None (текущее время)
+    :type from_time: datetime.datetime, optional
+    :param ahead_days: длина диапазона в днях, defaults to 7
+    :type ahead_days: float, optional
+    :param step: шаг секций, day или week, defaults to "day"
+    :type step: str, optional
+    :return: количество созданных секций
+    :rtype: int
+    """
+    pool = get_pool()
+    conn = pool.getconn()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            "select public.ensure_sensor_logs_partitions("
+            "coalesce(%s, now()::timestamp), %s * interval '1 day', %s);",
+            (from_time, ahead_days, step),
+        )
+        created = cursor.fetchone()[0]
+        conn.commit()
+        return created
+    except psycopg2.errors.UndefinedFunction:
+        # sensor_logs is not partitioned in this database
+        conn.rollback()
+        return 0
+    finally:
+        cursor.close()
+        pool.putconn(conn)
+
+
+class schemaRegistry:
+    """
+    Общий для процесса кэш схем таблиц (название колонки: тип данных).
+    Каждая таблица интроспектируется один раз, кэш сбрасывается через refresh
+    или по уведомлению об изменении DDL (канал SCHEMA_CHANGED_CHANNEL)
+    """
+
+    def __init__(self) -> None:
+        self._schemas = {}
+        self._lock = threading.Lock()
+        self._listener = None
+        self._refresh_callbacks = []
+
+    @staticmethod
+    def _introspect(table_name: str, conn) -> dict:
+        info_query = (
+            "select column_name, data_type "
+            "from information_schema.columns "
+            "where table_schema='public' and table_name = %s "
+            "order by ordinal_position;"
+        )
+        cursor = conn.cursor()
+        try:
+            cursor.execute(info_query, (table_name,))
+            return {key: val for key, val in cursor.fetchall()}
+        finally:
+            cursor.close()
+
+    def get(self, table_name: str, conn) -> dict:
+        """
+        Схема таблицы, при отсутствии в кэше запрашивается через conn
+
+        :param table_name: название таблицы
+        :type table_name: str
+        :param conn: подключение для интроспекции
+        :type conn: psycopg2.extensions.connection
+        :return: словарь название колонки: тип данных
+        :rtype: dict of str: str
+        """
+        schema = self._schemas.get(table_name)
+        if schema is not None:
+            return schema
+        with self._lock:
+            schema = self._schemas.get(table_name)
+            if schema is None:
+                schema = self._introspect(table_name, conn)
+                # несуществующие таблицы не кэшируем
+                if schema:
+                    self._schemas[table_name] = schema
+        return schema
+
+    def refresh(self, table_name: str = None) -> None:
+        """
+        Сбросить кэш таблицы, либо всех таблиц если table_name не задан
+
+        :param table_name: название таблицы, defaults to None
+        :type table_name: str, optional
+        """
+        with self._lock:
+            if table_name is None:
+                self._schemas.clear()
+            else:
+                self._schemas.pop(table_name, None)
+        for callback in self._refresh_callbacks:
+            callback(table_name)
+
+    def add_refresh_callback(self, callback) -> None:
+        """
+        Зарегистрировать функцию, вызываемую при сбросе кэша с названием таблицы
+        (None - все таблицы)
+
+        :param callback: функция вида callback(table_name)
+        :type callback: callable
+        """
+        self._refresh_callbacks.append(callback)
+
+    def handle_notify(self, payload: str) -> None:
+        """
+        Обработка уведомления об изменении DDL.
+        payload - идентификатор таблицы вида schema.table, пустой сбрасывает весь кэш
+
+        :param payload: содержимое уведомления
+        :type payload: str
+        """
+        table_name = payload.split(".")[-1].strip('"') if payload else None
+        logging.info(f"Schema change notify: {payload or 'all tables'}")
+        self.refresh(table_name)
+
+    def start_listener(
+        self, conn_params: dict = None, reconnect_delay: float = 5.0
+    ) -> threading.Thread:
+        """
+        Запуск фонового потока, который слушает SCHEMA_CHANGED_CHANNEL
+        на отдельном подключении и сбрасывает кэш при изменении DDL
+
+        :param conn_params: параметры подключения, defaults to DEFAULT_CONNECTION_PARAMS
+        :type conn_params: dict, optional
+        :param reconnect_delay: пауза перед переподключением (с), defaults to 5.0
+        :type reconnect_delay: float, optional
+        :return: поток слушателя
+        :rtype: threading.Thread
+        """
+        if self._listener is not None and self._listener.is_alive():
+            return self._listener
+        conn_params = DEFAULT_CONNECTION_PARAMS if conn_params is None else conn_params
+        self._listener = threading.Thread(
+            target=self._listen,
+            args=(conn_params, reconnect_delay),
+            name="schema-listener",
+            daemon=True,
+        )
+        self._listener.start()
+        return self._listener
+
+    def _listen(self, conn_params: dict, reconnect_delay: float) -> None:
+        while True:
+            try:
+                conn = psycopg2.connect(**conn_params)
+                conn.set_session(autocommit=True)
+                cursor = conn.cursor()
+                cursor.execute(f"listen {SCHEMA_CHANGED_CHANNEL};")
+                cursor.close()
+                # пока слушатель не работал, схема могла поменяться
+                self.refresh()
+                while True:
+                    if select.select([conn], [], [], 60) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        self.handle_notify(conn.notifies.pop(0).payload)
+            except psycopg2.Error as e:
+                logging.warning(f"Schema listener error: {e}")
+                time.sleep(reconnect_delay)
+
+
+SCHEMA_REGISTRY = schemaRegistry()
+
+
+class sqlExpr(str):
+    """
+    SQL выражение, которое подставляется в запрос как есть, а не передаётся параметром.
+    Например sqlExpr("now()-interval '1 minute'")
+    """
+
+
+# OID типа PostgreSQL -> dtype колонки в select_columns, остальные типы -> object
+ARRAY_DTYPES = {
+    16: "bool",
+    20: "int64",
+    21: "int64",
+    23: "int64",
+    700: "float64",
+    701: "float64",
+    1700: "float64",
+    1082: "datetime64[D]",
+    1114: "datetime64[us]",
+}
+
+
+def column_array(values: tuple, type_code: int) -> np.ndarray:
+    """
+    Колонка результата запроса в виде массива numpy
+
+    :param values: значения колонки
+    :type values: tuple
+    :param type_code: OID типа из cursor.description
+    :type type_code: int
+    :return: массив, NULL -> nan/NaT (целые с NULL становятся float64)
+    :rtype: np.ndarray
+    """
+    dtype = ARRAY_DTYPES.get(type_code)
+    if dtype is None or (dtype == "bool" and None in values):
+        return np.array(values, dtype=object)
+    if dtype == "int64":
+        try:
+            return np.array(values, dtype=np.int64)
+        except TypeError:
+            return np.array(values, dtype=np.float64)
+    return np.array(values, dtype=dtype)
+
+
+# in-list operands of conditions: the list is sent as one array parameter
+IN_LIST_OPERANDS = {"in": "= any", "not in": "<> all"}
+
+# уникальные имена серверных курсоров select_stream
+_STREAM_IDS = itertools.count()
+
+
+def adapt_value(value):
+    """
+    Приводит значения numpy/pandas к встроенным типам python для передачи в psycopg2
+
+    :param value: значение
+    :return: значение понятное psycopg2
+    """
+    if hasattr(value, "item") and not isinstance(value, (str, bytes)):
+        return value.item()
+    return value
+
+
+class statementCache:
+    """
+    Кэш форм параметризованных запросов. Форма запроса задаётся списком частей,
+    где None - место параметра. Формы, использованные prepare_threshold раз,
+    подготавливаются на сервере (PREPARE) отдельно для каждого подключения
+    и далее выполняются через EXECUTE с повторным использованием плана.
+    Подготовленные запросы сброшенных форм (drop_table) удаляются (DEALLOCATE)
+    на каждом подключении при его следующем использовании
+    """
+
+    def __init__(self, prepare_threshold: int = 5) -> None:
+        self.prepare_threshold = prepare_threshold
+        self._lock = threading.Lock()
+        # (table_name, parts): [имя, запрос с %s, запрос с $n, число параметров, счётчик]
+        self._shapes = {}
+        self._counter = 0
+        # подключение: множество подготовленных на нём имён
+        self._prepared = weakref.WeakKeyDictionary()
+        # имена сброшенных форм, имена не повторяются, поэтому множество не чистится
+        self._dropped = set()
+
+    @staticmethod
+    def render(parts: tuple, numbered: bool) -> str:
+        res = []
+        n_param = 0
+        for part in parts:
+            if part is None:
+                n_param += 1
+                res.append(f"${n_param}" if numbered else "%s")
+            else:
+                res.append(part if numbered else part.replace("%", "%%"))
+        return "".join(res)
+
+    def _entry(self, table_name: str, parts: tuple) -> list:
+        key = (table_name, parts)
+        with self._lock:
+            entry = self._shapes.get(key)
+            if entry is None:
+                self._counter += 1
+                entry = [
+                    f"qc_{table_name}_{self._counter}",
+                    self.render(parts, numbered=False),
+                    self.render(parts, numbered=True),
+                    parts.count(None),
+                    0,
+                ]
+                self._shapes[key] = entry
+            entry[4] += 1
+        return entry
+
+    def execute(self, cursor, table_name: str, parts: tuple, params: list) -> None:
+        """
+        Выполнить запрос заданной формы
+
+        :param cursor: курсор
+        :type cursor: psycopg2.extensions.cursor
+        :param table_name: название таблицы, для сброса форм при изменении схемы
+        :type table_name: str
+        :param parts: части запроса, None на месте параметров
+        :type parts: tuple
+        :param params: значения параметров
+        :type params: list
+        """
+        name, plain_sql, numbered_sql, n_params, uses = self._entry(table_name, parts)
+        if self._dropped:
+            self._deallocate_dropped(cursor)
+        if uses < self.prepare_threshold:
+            cursor.execute(plain_sql, params)
+            return
+        conn = cursor.connection
+        with self._lock:
+            prepared = self._prepared.setdefault(conn, set())
+            is_prepared = name in prepared
+        if not is_prepared:
+            cursor.execute(f"prepare {name} as {numbered_sql}")
+            with self._lock:
+                prepared.add(name)
+        try:
+            if n_params:
+                cursor.execute(
+                    f"execute {name} ({', '.join(['%s'] * n_params)})", params
+                )
+            else:
+                cursor.execute(f"execute {name}")
+        except psycopg2.errors.InvalidSqlStatementName:
+            # подготовленные запросы живут в сессии и переживают rollback, значит
+            # сессия была сброшена (DISCARD ALL / DEALLOCATE ALL, например пулером
+            # в режиме транзакций) или сервер за подключением сменился
+            with self._lock:
+                prepared.discard(name)
+            raise
+
+    def _deallocate_dropped(self, cursor) -> None:
+        """Удалить на подключении курсора подготовленные запросы сброшенных форм"""
+        conn = cursor.connection
+        with self._lock:
+            prepared = self._prepared.get(conn)
+            stale = prepared & self._dropped if prepared else set()
+        # only outside a transaction: a failed deallocate is rolled back safely,
+        # otherwise the names wait for the next use of the connection
+        if not stale or conn.info.transaction_status != TRANSACTION_STATUS_IDLE:
+            return
+        for name in stale:
+            try:
+                cursor.execute(f"deallocate {name}")
+            except psycopg2.errors.InvalidSqlStatementName:
+                # already gone with a reset session
+                conn.rollback()
+            with self._lock:
+                prepared.discard(name)
+
+    def forget_connection(self, conn) -> None:
+        """Забыть подготовленные на подключении запросы"""
+        with self._lock:
+            self._prepared.pop(conn, None)
+
+    def drop_table(self, table_name: str = None) -> None:
+        """
+        Сбросить формы запросов таблицы (None - всех таблиц).
+        Следующие запросы будут подготовлены под новыми именами
+
+        :param table_name: название таблицы, defaults to None
+        :type table_name: str, optional
+        """
+        with self._lock:
+            for key in list(self._shapes):
+                if table_name is None or key[0] == table_name:
+                    self._dropped.add(self._shapes.pop(key)[0])
+
+
+STATEMENT_CACHE = statementCache()
+SCHEMA_REGISTRY.add_refresh_callback(STATEMENT_CACHE.drop_table)
+
+
+def copy_field(value) -> str:
+    """
+    Значение в текстовом формате COPY, None и NaN передаются как NULL
+
+    :param value: значение
+    :return: строка для COPY FROM STDIN
+    :rtype: str
+    """
+    if value is None:
+        return "\\N"
+    if isinstance(value, float):
+        if value != value:
+            return "\\N"
+        # ndarray.tolist() отдаёт целые колонки как float
+        if value.is_integer():
+            return str(int(value))
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def copy_column(values: np.ndarray) -> list[str]:
+    """
+    Колонка-массив в текстовом формате COPY, NaN и NaT передаются как NULL.
+    Числа и datetime64 форматируются векторно, остальное через copy_field
+
+    :param values: значения колонки
+    :type values: np.ndarray
+    :return: строки для COPY FROM STDIN
+    :rtype: list[str]
+    """
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        null = np.isnat(values)
+        res = np.datetime_as_string(values).astype(object)
+    elif np.issubdtype(values.dtype, np.floating):
+        null = np.isnan(values)
+        res = values.astype(str).astype(object)
+    elif np.issubdtype(values.dtype, np.integer) or values.dtype == bool:
+        return values.astype(str).tolist()
+    else:
+        return [copy_field(value) for value in values.tolist()]
+    res[null] = "\\N"
+    return res.tolist()
+
+
+def iter_rows(rows, columns: list[str] = None) -> tuple[list[str], object]:
+    """
+    Приводит строки к итератору кортежей
+
+    :param rows: список словарей или последовательностей, двумерный numpy.ndarray или pandas.DataFrame
+    :param columns: названия колонок, для словарей и DataFrame берутся из данных
+    :type columns: list[str], optional
+    :return: названия колонок и итератор кортежей значений
+    :rtype: tuple(list[str], iterator)
+    """
+    if hasattr(rows, "itertuples"):
+        columns = list(rows.columns) if columns is None else columns
+        return columns, rows[columns].itertuples(index=False, name=None)
+    if hasattr(rows, "ndim"):
+        return columns, (tuple(row) for row in rows.tolist())
+    if rows and isinstance(rows[0], dict):
+        columns = list(rows[0]) if columns is None else columns
+        return columns, (tuple(row.get(col) for col in columns) for row in rows)
+    return columns, (tuple(row) for row in rows)
+
+
 class autoQuotePlacer:
     def __init__(self, schema_info: dict) -> None:
         self.schema = schema_info
@@ -49,24 +751,38 @@ class queryComposer:
     Дополнительный класс инициализирующий подключение к базе данных и упрощающий запросы
     """
 
-    def __init__(self, table_name: str, conn: psycopg2.connect = None) -> None:
+    def __init__(
+        self,
+        table_name: str,
+        conn: psycopg2.connect = None,
+        pool: connectionPool = None,
+        parametrized: bool = True,
+    ) -> None:
+        """
+        :param table_name: название таблицы
+        :type table_name: str
+        :param conn: внешнее подключение, если не задано - берётся из пула
+        :type conn: psycopg2.connect, optional
+        :param pool: пул подключений, defaults to get_pool()
+        :type pool: connectionPool, optional
+        :param parametrized: передавать значения параметрами запроса через кэш форм
+            запросов (STATEMENT_CACHE), иначе значения подставляются в текст запроса.
+            SQL выражения в условиях в этом режиме оборачиваются в sqlExpr, defaults to True
+        :type parametrized: bool, optional
+        """
+        self.parametrized = parametrized
+        self.pool = None
         if conn is None:
-            conn = psycopg2.connect(**DEFAULT_CONNECTION_PARAMS)
+            self.pool = get_pool() if pool is None else pool
+            conn = self.pool.getconn()
         self.conn = conn
         self.table_name = table_name
         try:
-            info_query = (
-                "select column_name, data_type "
-                "from information_schema.columns "
-                f"where table_schema='public' and table_name = '{table_name}'"
-            )
-            cursor = conn.cursor()
-            cursor.execute(info_query)
-            self.schema = {key: val for key, val in cursor.fetchall()}
-            cursor.close()
+            self.schema = SCHEMA_REGISTRY.get(table_name, conn)
             self.data_prep = autoQuotePlacer(self.schema)
         except (psycopg2.OperationalError, psycopg2.ProgrammingError) as e:
             print(f"Error: {str(e)}")
+            self.close_connection()
             raise
 
     @staticmethod
@@ -87,12 +803,99 @@ class queryComposer:
         insert_string = insert_string[:-2] + ")"
         return insert_string, value_string
 
+    @staticmethod
+    def placeholders(amount: int) -> tuple:
+        """
+        Части формы запроса с amount параметрами через запятую
+
+        :param amount: количество параметров
+        :type amount: int
+        :return: части запроса, None на месте параметра
+        :rtype: tuple
+        """
+        parts = []
+        for idx in range(amount):
+            if idx:
+                parts.append(", ")
+            parts.append(None)
+        return tuple(parts)
+
+    @staticmethod
+    def condition_parts(conditions: list[dict]) -> tuple[tuple, list]:
+        """
+        Форма where части запроса и значения параметров для неё.
+        Значения типа sqlExpr входят в форму запроса как есть.
+        Операнды in и not in принимают список значений, он передаётся одним
+        параметром-массивом (= any / <> all), форма не зависит от длины списка
+
+        :param conditions: список словарей с условиями
+        :type conditions: list[dict]
+        :return: части запроса и список параметров
+        :rtype: tuple(tuple, list)
+        """
+        if not conditions:
+            return (), []
+        parts = ["where "]
+        params = []
+        for idx, cond in enumerate(conditions):
+            if idx:
+                parts.append(" and ")
+            operand = cond["comp_operand"].strip().lower()
+            if operand in IN_LIST_OPERANDS:
+                parts.append(f"{cond['key_name']} {IN_LIST_OPERANDS[operand]}(")
+                parts.append(None)
+                parts.append(")")
+                params.append([adapt_value(value) for value in cond["key_value"]])
+                continue
+            parts.append(f"{cond['key_name']} {cond['comp_operand']} ")
+            if isinstance(cond["key_value"], sqlExpr):
+                parts.append(str(cond["key_value"]))
+            else:
+                parts.append(None)
+                params.append(adapt_value(cond["key_value"]))
+        return tuple(parts), params
+
+    def execute_shape(self, cursor, parts: tuple, params: list) -> None:
+        """
+        Выполнить параметризованный запрос через STATEMENT_CACHE
+
+        :param cursor: курсор
+        :type cursor: psycopg2.extensions.cursor
+        :param parts: части запроса, None на месте параметров
+        :type parts: tuple
+        :param params: значения параметров
+        :type params: list
+        """
+        STATEMENT_CACHE.execute(cursor, self.table_name, parts, params)
+
+    def _write_shape(self, parts: tuple, params: list, error_msg: str) -> None:
+        cursor = self.conn.cursor()
+        try:
+            self.execute_shape(cursor, parts, params)
+            self.conn.commit()
+        except Exception as e:
+            # логирование ошибки
+            print(f"{error_msg}: {e}")
+            self.conn.rollback()
+        finally:
+            cursor.close()
+
     def insert_query(self, kwargs):
         """Запрос вставки
 
         :param kwargs: Словарь с параметрами запроса
         :type kwargs: dict of str: str
         """
+        if self.parametrized:
+            values = {key: val for key, val in kwargs.items() if val is not None}
+            parts = (
+                f"insert into {self.table_name}({', '.join(values)}) values (",
+                *self.placeholders(len(values)),
+                ");",
+            )
+            params = [adapt_value(val) for val in values.values()]
+            self._write_shape(parts, params, "Ошибка в запросе на вставку")
+            return
         processed_data = self.data_prep.factor(kwargs)
         cursor = self.conn.cursor()
         insert_string, value_string = self.table_fields(processed_data.keys())
@@ -111,6 +914,128 @@ class queryComposer:
         finally:
             cursor.close()
 
+    def bulk_insert(
+        self,
+        rows,
+        columns: list[str] = None,
+        batch_size: int = 10000,
+        method: str = "copy",
+    ) -> dict:
+        """
+        Массовая вставка в одной транзакции через COPY FROM STDIN или execute_values
+
+        :param rows: список словарей или последовательностей, двумерный numpy.ndarray или pandas.DataFrame
+        :param columns: названия колонок, обязательны для последовательностей и ndarray
+        :type columns: list[str], optional
+        :param batch_size: количество строк в одной пачке, defaults to 10000
+        :type batch_size: int, optional
+        :param method: "copy" или "values", defaults to "copy"
+        :type method: str, optional
+        :raises ValueError: неизвестный method или не заданы колонки
+        :return: количество строк, время и скорость вставки
+        :rtype: dict
+        """
+        if method not in ["copy", "values"]:
+            raise ValueError("Invalid method param")
+        columns, row_iter = iter_rows(rows, columns)
+        if not columns:
+            raise ValueError("Columns are not specified")
+        start_time = time.perf_counter()
+        n_rows = 0
+        cursor = self.conn.cursor()
+        copy_query = f"copy {self.table_name} ({', '.join(columns)}) from stdin;"
+        values_query = (
+            f"insert into {self.table_name} ({', '.join(columns)}) values %s;"
+        )
+        try:
+            while True:
+                batch = [row for _, row in zip(range(batch_size), row_iter)]
+                if not batch:
+                    break
+                if method == "copy":
+                    buffer = io.StringIO()
+                    for row in batch:
+                        buffer.write("\t".join(map(copy_field, row)))
+                        buffer.write("\n")
+                    buffer.seek(0)
+                    cursor.copy_expert(copy_query, buffer)
+                else:
+                    psycopg2.extras.execute_values(
+                        cursor,
+                        values_query,
+                        [tuple(map(adapt_value, row)) for row in batch],
+                        page_size=batch_size,
+                    )
+                n_rows += len(batch)
+            self.conn.commit()
+        except Exception as e:
+            # логирование ошибки
+            print(f"Ошибка в запросе на массовую вставку: {e}")
+            self.conn.rollback()
+            raise
+        finally:
+            cursor.close()
+        elapsed = time.perf_counter() - start_time
+        stats = {
+            "rows": n_rows,
+            "seconds": elapsed,
+            "rows_per_sec": n_rows / elapsed if elapsed else 0.0,
+        }
+        logging.info(
+            f"Bulk insert into {self.table_name}: {n_rows} rows, "
+            f"{stats['rows_per_sec']:.0f} rows/s"
+        )
+        return stats
+
+    def bulk_insert_columns(self, data: dict, batch_size: int = 100000) -> dict:
+        """
+        Массовая вставка колонок-массивов (как результат select_columns) через COPY
+        в одной транзакции, без построчного преобразования значений
+
+        :param data: словарь название колонки: массив значений одинаковой длины
+        :type data: dict of str: np.ndarray
+        :param batch_size: количество строк в одной пачке, defaults to 100000
+        :type batch_size: int, optional
+        :return: количество строк, время и скорость вставки
+        :rtype: dict
+        """
+        columns = list(data)
+        if not columns:
+            raise ValueError("Columns are not specified")
+        n_total = len(data[columns[0]])
+        start_time = time.perf_counter()
+        cursor = self.conn.cursor()
+        copy_query = f"copy {self.table_name} ({', '.join(columns)}) from stdin;"
+        try:
+            for start in range(0, n_total, batch_size):
+                fields = [
+                    copy_column(data[col][start : start + batch_size])
+                    for col in columns
+                ]
+                buffer = io.StringIO()
+                buffer.writelines("\t".join(row) + "\n" for row in zip(*fields))
+                buffer.seek(0)
+                cursor.copy_expert(copy_query, buffer)
+            self.conn.commit()
+        except Exception as e:
+            # логирование ошибки
+            print(f"Ошибка в запросе на массовую вставку: {e}")
+            self.conn.rollback()
+            raise
+        finally:
+            cursor.close()
+        elapsed = time.perf_counter() - start_time
+        stats = {
+            "rows": n_total,
+            "seconds": elapsed,
+            "rows_per_sec": n_total / elapsed if elapsed else 0.0,
+        }
+        logging.info(
+            f"Bulk insert into {self.table_name}: {n_total} rows, "
+            f"{stats['rows_per_sec']:.0f} rows/s"
+        )
+        return stats
+
     def delete_query(self, conditions):
         """
         Запрос на удаление
@@ -120,6 +1045,11 @@ class queryComposer:
         :param value: Значение ключа
         :type value: int
         """
+        if self.parametrized:
+            cond_parts, params = self.condition_parts(conditions)
+            parts = (f"delete from {self.table_name} ", *cond_parts, ";")
+            self._write_shape(parts, params, "Ошибка в запросе на удаление")
+            return
         cursor = self.conn.cursor()
         query = f"delete from {self.table_name} "
         if conditions is not None:
@@ -147,9 +1077,20 @@ class queryComposer:
         """
         Запрос на обновление
 
-        :param kwargs: Словарь с параметрами запроса
+        :param kwargs: Словарь с параметрами запроса, первый ключ - условие обновления
         :type kwargs: dict of str: str
         """
+        if self.parametrized:
+            items = [(key, val) for key, val in kwargs.items() if val is not None]
+            (key_name, key_value), set_items = items[0], items[1:]
+            parts = [f"update {self.table_name} set "]
+            for idx, (key, _) in enumerate(set_items):
+                parts.extend([", " if idx else "", f"{key}=", None])
+            parts.extend([f" where {key_name}=", None, ";"])
+            params = [adapt_value(val) for _, val in set_items]
+            params.append(adapt_value(key_value))
+            self._write_shape(tuple(parts), params, "Ошибка в запросе на обновление")
+            return
         processed_data = self.data_prep.factor(kwargs)
         cursor = self.conn.cursor()
         query = f"update {self.table_name} set "
@@ -184,6 +1125,11 @@ class queryComposer:
         :rtype: dict of str:str
         """
         cursor = self.conn.cursor()
+        if self.parametrized:
+            self.execute_shape(
+                cursor, *self._select_shape(columns, conditions, order_opt)
+            )
+            return self._rows_to_dicts(cursor)
         if columns is None:
             qcolumn = "*"
         else:
@@ -208,25 +1154,345 @@ class queryComposer:
                 query += f"{opt}, "
             query = query[:-2] + ";"
         cursor.execute(query)
+        return self._rows_to_dicts(cursor)
+
+    def _select_shape(
+        self, columns: list[str], conditions: list[dict], order_opt: list[str]
+    ) -> tuple[tuple, list]:
+        qcolumn = "*" if columns is None else ", ".join(columns)
+        cond_parts, params = self.condition_parts(conditions)
+        order = "1" if order_opt is None else ", ".join(order_opt)
+        parts = (
+            f"select {qcolumn} from {self.table_name} ",
+            *cond_parts,
+            f" order by {order};",
+        )
+        return parts, params
+
+    def select_columns(
+        self,
+        columns: list[str] = None,
+        conditions: list[dict] = None,
+        order_opt: list[str] = None,
+        batch_size: int = 10000,
+    ) -> dict:
+        """
+        Запрос на выборку с результатом по колонкам: массивы numpy вместо
+        словаря на каждую строку. timestamp -> datetime64[us], числа -> float64/int64
+
+        :param columns: список колонок, defaults to None
+        :type columns: list[str], optional
+        :param conditions: список словарей с условиями, defaults to None
+        :type conditions: list[dict], optional
+        :param order_opt: сортировка, defaults to None
+        :type order_opt: list[str], optional
+        :param batch_size: количество строк, обрабатываемых за раз, defaults to 10000
+        :type batch_size: int, optional
+        :return: словарь название колонки: массив значений
+        :rtype: dict of str: np.ndarray
+        """
+        cursor = self.conn.cursor()
+        self.execute_shape(cursor, *self._select_shape(columns, conditions, order_opt))
+        return self._rows_to_arrays(cursor, batch_size)
+
+    def select_stream(
+        self,
+        columns: list[str] = None,
+        conditions: list[dict] = None,
+        order_opt: list[str] = None,
+        itersize: int = 10000,
+        as_arrays: bool = False,
+    ):
+        """
+        Потоковая выборка через именованный (серверный) курсор: строки
+        передаются порциями по itersize, весь результат в памяти не держится.
+        Порцию нужно обработать до следующей итерации, подключение занято
+        до конца перебора
+
+        :param columns: список колонок, defaults to None
+        :type columns: list[str], optional
+        :param conditions: список словарей с условиями, defaults to None
+        :type conditions: list[dict], optional
+        :param order_opt: сортировка, defaults to None
+        :type order_opt: list[str], optional
+        :param itersize: количество строк в порции, defaults to 10000
+        :type itersize: int, optional
+        :param as_arrays: порции как в select_columns (массивы numpy), а не списки словарей, defaults to False
+        :type as_arrays: bool, optional
+        :yield: порция строк
+        :rtype: Iterator[list[dict]] или Iterator[dict of str: np.ndarray]
+        """
+        parts, params = self._select_shape(columns, conditions, order_opt)
+        cursor = self.conn.cursor(name=f"{self.table_name}_stream_{next(_STREAM_IDS)}")
+        cursor.itersize = itersize
+        try:
+            # серверный курсор нельзя открыть на подготовленный запрос (EXECUTE)
+            cursor.execute(STATEMENT_CACHE.render(parts, numbered=False), params)
+            while True:
+                rows = cursor.fetchmany(itersize)
+                if not rows:
+                    break
+                if as_arrays:
+                    yield self._array_batch(cursor.description, rows)
+                else:
+                    yield self._dict_batch(cursor.description, rows)
+        finally:
+            cursor.close()
+            # курсор живёт внутри транзакции, завершаем её, чтобы подключение освободилось
+            self.conn.rollback()
+
+    def select_buckets(
+        self,
+        time_column: str,
+        value_column: str,
+        bucket_seconds: float,
+        conditions: list[dict] = None,
+    ) -> list[dict]:
+        """
+        Выборка с прореживанием на стороне сервера: строки группируются
+        по интервалам времени длиной bucket_seconds, для каждого интервала
+        возвращаются bucket_start, value_min, value_avg, value_max, value_count
+
+        :param time_column: колонка времени (timestamp)
+        :type time_column: str
+        :param value_column: колонка значений
+        :type value_column: str
+        :param bucket_seconds: длина интервала в секундах
+        :type bucket_seconds: float
+        :param conditions: список словарей с условиями, defaults to None
+        :type conditions: list[dict], optional
+        :return: интервалы по возрастанию времени
+        :rtype: list[dict]
+        """
+        if bucket_seconds <= 0:
+            raise ValueError("Invalid bucket_seconds param")
+        cursor = self.conn.cursor()
+        cond_parts, params = self.condition_parts(conditions)
+        # bucket width is a parameter, so every width shares one prepared statement
+        parts = (
+            f"select 'epoch'::timestamp + floor(extract(epoch from {time_column}) / ",
+            None,
+            ") * ",
+            None,
+            f" * interval '1 second' as bucket_start, min({value_column}) as value_min, "
+            f"avg({value_column}) as value_avg, max({value_column}) as value_max, "
+            f"count({value_column}) as value_count from {self.table_name} ",
+            *cond_parts,
+            " group by 1 order by 1;",
+        )
+        self.execute_shape(
+            cursor, parts, [float(bucket_seconds), float(bucket_seconds), *params]
+        )
+        return self._rows_to_dicts(cursor)
+
+    def select_grouped(
+        self,
+        key_column: str,
+        value_column: str,
+        keys: list,
+        separator: str = "\n",
+        order_column: str = None,
+    ) -> dict:
+        """
+        Значения value_column, склеенные через separator (string_agg) для каждого
+        значения key_column из keys, одним запросом вместо запроса на каждый ключ.
+        Список ключей передаётся одним параметром-массивом (key_column = any(...)),
+        поэтому форма запроса не зависит от количества ключей
+
+        :param key_column: колонка группировки
+        :type key_column: str
+        :param value_column: колонка склеиваемых значений
+        :type value_column: str
+        :param keys: значения key_column
+        :type keys: list
+        :param separator: разделитель значений, defaults to "\\n"
+        :type separator: str, optional
+        :param order_column: порядок значений внутри группы, defaults to None (value_column)
+        :type order_column: str, optional
+        :return: словарь ключ: склеенная строка, ключей без значений в нём нет
+        :rtype: dict
+        """
+        order = value_column if order_column is None else order_column
+        cursor = self.conn.cursor()
+        parts = (
+            f"select {key_column}, string_agg(btrim({value_column}::text), ",
+            None,
+            f" order by {order}) as grouped from {self.table_name} "
+            f"where {key_column} = any(",
+            None,
+            f") group by {key_column};",
+        )
+        try:
+            self.execute_shape(
+                cursor, parts, [separator, [adapt_value(key) for key in keys]]
+            )
+            return {key: grouped for key, grouped in cursor.fetchall()}
+        finally:
+            cursor.close()
+
+    def select_joined(
+        self,
+        joins: list[dict] = None,
+        columns: list[str] = None,
+        conditions: list[dict] = None,
+        order_opt: list[str] = None,
+        key_column: str = None,
+    ) -> dict:
+        """
+        Выборка из таблицы вместе со связанными таблицами одним запросом,
+        результат индексирован по ключу.
+
+        Связь задаётся словарём: table - связанная таблица, on - колонка связи
+        (одинаковая в обеих таблицах) или пара (колонка слева, колонка table),
+        columns - колонки table в результате (по умолчанию все, кроме уже
+        выбранных), how - тип join, defaults to "left". Колонки без названия
+        таблицы в columns и on относятся к основной таблице, в условиях
+        одноимённые колонки нужно указывать с названием таблицы
+
+        :param joins: список связей, defaults to None
+        :type joins: list[dict], optional
+        :param columns: колонки основной таблицы, defaults to None (все)
+        :type columns: list[str], optional
+        :param conditions: список словарей с условиями, defaults to None
+        :type conditions: list[dict], optional
+        :param order_opt: сортировка, defaults to None (по ключу)
+        :type order_opt: list[str], optional
+        :param key_column: колонка ключа результата, defaults to None (первая
+            колонка основной таблицы)
+        :type key_column: str, optional
+        :return: словарь ключ: строка результата
+        :rtype: dict of object: dict
+        """
+        base_columns = list(self.schema) if columns is None else columns
+        key_column = list(self.schema)[0] if key_column is None else key_column
+        if key_column not in base_columns:
+            raise ValueError("Invalid key_column param")
+        schema = dict(self.schema)
+        names = set(base_columns)
+        select_list = [self._qualified(column) for column in base_columns]
+        join_parts = []
+        for join in joins or []:
+            table = join["table"]
+            join_schema = SCHEMA_REGISTRY.get(table, self.conn)
+            left, right = (
+                (join["on"], join["on"]) if isinstance(join["on"], str) else join["on"]
+            )
+            join_columns = join.get("columns")
+            if join_columns is None:
+                join_columns = [name for name in join_schema if name not in names]
+            for column in join_columns:
+                schema[column] = join_schema.get(column)
+                names.add(column)
+                select_list.append(f"{table}.{column}")
+            join_parts.append(
+                f" {join.get('how', 'left')} join {table} "
+                f"on {self._qualified(left)} = {table}.{right}"
+            )
+        cond_parts, params = self.condition_parts(conditions)
+        order = (
+            self._qualified(key_column) if order_opt is None else ", ".join(order_opt)
+        )
+        parts = (
+            f"select {', '.join(select_list)} from {self.table_name}"
+            + "".join(join_parts)
+            + " ",
+            *cond_parts,
+            f" order by {order};",
+        )
+        cursor = self.conn.cursor()
+        try:
+            self.execute_shape(cursor, parts, params)
+            rows = self._dict_batch(cursor.description, cursor.fetchall(), schema)
+        finally:
+            cursor.close()
+        return {row[key_column]: row for row in rows}
+
+    def _qualified(self, column: str) -> str:
+        # column of the base table unless already qualified
+        return column if "." in column else f"{self.table_name}.{column}"
+
+    def _rows_to_dicts(self, cursor) -> list[dict]:
         raw_data = cursor.fetchall()
+        data = self._dict_batch(cursor.description, raw_data)
         cursor.close()
+        return data
+
+    def _dict_batch(self, description, rows: list, schema: dict = None) -> list[dict]:
+        # названия колонок берутся из результата, чтобы работал выбор части колонок
+        names = [column[0] for column in description]
+        schema = self.schema if schema is None else schema
+        strip_columns = [schema.get(name) in ["text", "character"] for name in names]
         data = []
-        for elem in raw_data:
+        for elem in rows:
             tmp_data = {}
-            for idx, (key, instance) in enumerate(self.schema.items()):
+            for idx, key in enumerate(names):
                 if elem[idx] is None:
                     tmp_data[key] = None
                     continue
-                if instance in ["text", "character"]:
+                if strip_columns[idx]:
                     tmp_data[key] = elem[idx].strip()
                     continue
                 tmp_data[key] = elem[idx]
             data.append(tmp_data)
         return data
 
+    def _array_batch(self, description, rows: list) -> dict:
+        data = {}
+        for column, values in zip(description, zip(*rows)):
+            name, type_code = column[0], column[1]
+            array = column_array(values, type_code)
+            if array.dtype == object and self.schema.get(name) in ["text", "character"]:
+                array = np.array(
+                    [None if val is None else val.strip() for val in array],
+                    dtype=object,
+                )
+            data[name] = array
+        return data
+
+    def _rows_to_arrays(self, cursor, batch_size: int) -> dict:
+        chunks = []
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            chunks.append(self._array_batch(cursor.description, rows))
+        data = {}
+        for column in cursor.description:
+            name, type_code = column[0], column[1]
+            if not chunks:
+                data[name] = np.empty(0, dtype=ARRAY_DTYPES.get(type_code, object))
+            elif len(chunks) == 1:
+                data[name] = chunks[0][name]
+            else:
+                data[name] = np.concatenate([chunk[name] for chunk in chunks])
+        cursor.close()
+        return data
+
     def close_connection(self):
-        """_summary_"""
-        self.conn.close()
+        """
+        Закрыть подключение, либо вернуть его в пул, если оно было взято из пула
+        """
+        if self.conn is None:
+            return
+        conn, self.conn = self.conn, None
+        if self.pool is not None:
+            self.pool.putconn(conn)
+        else:
+            conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close_connection()
+
+    def __del__(self):
+        # страховка от утечки подключений пула, если close_connection не вызван
+        if getattr(self, "pool", None) is not None and getattr(self, "conn", None):
+            try:
+                self.close_connection()
+            except Exception:
+                pass
 
 
 if __name__ == "__main__":
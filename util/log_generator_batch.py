@@ -0,0 +1,473 @@
+"""
+Пакетная генерация значений датчиков без интерфейса.
+Ряды строятся в пуле процессов, каждый процесс пишет их через COPY
+на собственном подключении. Примеры:
+
+    python log_generator_batch.py --sensors 1-2000 --days 7 --scenario normal
+
+С одинаковым --seed повторный запуск даёт те же ряды.
+
+Режим --live непрерывно пишет текущие значения с заданной общей скоростью
+и выводит достигнутую скорость, задержку записи и отставание:
+
+    python log_generator_batch.py --live --rate 50000 --duration 300 --workers 4
+"""
+
+import argparse
+import concurrent.futures
+import datetime
+import itertools
+import multiprocessing
+import queue
+import time
+
+import numpy as np
+import psycopg2
+
+from db_operation_functions import (
+    DEFAULT_CONNECTION_PARAMS,
+    queryComposer,
+    ensure_sensor_logs_partitions,
+)
+from signal_synth import SCENARIOS, build_sensor_series
+
+# connection of the worker process, opened once in init_worker
+_worker_conn = None
+
+
+def parse_sensor_ids(text: str) -> list[int]:
+    """
+    Разбор списка датчиков вида "1,2,10-20"
+
+    :param text: номера и диапазоны через запятую
+    :type text: str
+    :return: коды датчиков по возрастанию
+    :rtype: list[int]
+    """
+    sensor_ids = set()
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            first, last = part.split("-", 1)
+            sensor_ids.update(range(int(first), int(last) + 1))
+        else:
+            sensor_ids.add(int(part))
+    return sorted(sensor_ids)
+
+
+def new_seed() -> int:
+    """Случайный seed запуска, печатается в итогах для повторения запуска"""
+    return int(np.random.SeedSequence().entropy % 2**63)
+
+
+def init_worker(conn_params: dict) -> None:
+    global _worker_conn
+    _worker_conn = psycopg2.connect(**conn_params)
+
+
+def generate_sensor(
+    sensor_id: int,
+    limit_value: float,
+    c_time: datetime.datetime,
+    interval: int,
+    scenario: str,
+    days: int,
+    clear: bool,
+    seed: int,
+) -> dict:
+    """
+    Построить и записать ряд одного датчика, выполняется в процессе пула
+
+    :return: статистика bulk_insert и код датчика
+    :rtype: dict
+    """
+    # the series depends only on the run seed and the sensor, not on the worker
+    rng = np.random.default_rng([seed, sensor_id])
+    times, values = build_sensor_series(
+        limit_value, c_time, interval, scenario, days, rng
+    )
+    qc = queryComposer("sensor_logs", conn=_worker_conn)
+    if clear:
+        cond = [
+            {
+                "key_name": "sensor_id",
+                "comp_operand": "=",
+                "key_value": sensor_id,
+            },
+            {
+                "key_name": "log_datetime",
+                "comp_operand": ">=",
+                "key_value": times[0].astype(datetime.datetime),
+            },
+        ]
+        qc.delete_query(conditions=cond)
+    rows = list(
+        zip(itertools.repeat(sensor_id), times.astype(datetime.datetime), values)
+    )
+    stats = qc.bulk_insert(rows, columns=["sensor_id", "log_datetime", "sensor_value"])
+    stats["sensor_id"] = sensor_id
+    return stats
+
+
+def run_batch(
+    sensor_ids: list[int],
+    days: int = 7,
+    interval: int = 5,
+    scenario: str = "normal",
+    workers: int = None,
+    clear: bool = False,
+    conn_params: dict = None,
+    seed: int = None,
+) -> dict:
+    """
+    Генерация значений для набора датчиков в пуле процессов
+
+    :param sensor_ids: коды датчиков, None - все датчики
+    :type sensor_ids: list[int]
+    :param days: глубина истории в днях, defaults to 7
+    :type days: int, optional
+    :param interval: шаг значений на 2 часа вперёд, с, defaults to 5
+    :type interval: int, optional
+    :param scenario: режим работы из SCENARIOS, defaults to "normal"
+    :type scenario: str, optional
+    :param workers: количество процессов, defaults to None (по числу ядер)
+    :type workers: int, optional
+    :param clear: удалить значения датчиков за генерируемый период, defaults to False
+    :type clear: bool, optional
+    :param conn_params: параметры подключения процессов, defaults to DEFAULT_CONNECTION_PARAMS
+    :type conn_params: dict, optional
+    :param seed: seed генерации, ряд датчика зависит только от seed и кода
+        датчика, defaults to None (случайный)
+    :type seed: int, optional
+    :return: итоговая статистика: датчики, строки, время, строк в секунду, seed
+    :rtype: dict
+    """
+    if scenario not in SCENARIOS:
+        raise ValueError("Invalid scenario param")
+    if seed is None:
+        seed = new_seed()
+    conn_params = DEFAULT_CONNECTION_PARAMS if conn_params is None else conn_params
+    qc = queryComposer("sensor")
+    sensors = qc.select_query(columns=["sensor_id", "limit_mode_value"])
+    qc.close_connection()
+    limits = {sensor["sensor_id"]: sensor["limit_mode_value"] for sensor in sensors}
+    if sensor_ids is None:
+        sensor_ids = sorted(limits)
+    missing = [sensor_id for sensor_id in sensor_ids if sensor_id not in limits]
+    if missing:
+        raise ValueError(f"Unknown sensor_id: {missing}")
+
+    c_time = datetime.datetime.now().replace(microsecond=0)
+    ensure_sensor_logs_partitions(
+        from_time=c_time - datetime.timedelta(days=days), ahead_days=days + 1
+    )
+    start_time = time.perf_counter()
+    n_rows = 0
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers, initializer=init_worker, initargs=(conn_params,)
+    ) as executor:
+        futures = [
+            executor.submit(
+                generate_sensor,
+                sensor_id,
+                limits[sensor_id],
+                c_time,
+                interval,
+                scenario,
+                days,
+                clear,
+                seed,
+            )
+            for sensor_id in sensor_ids
+        ]
+        for done, future in enumerate(concurrent.futures.as_completed(futures), 1):
+            stats = future.result()
+            n_rows += stats["rows"]
+            elapsed = time.perf_counter() - start_time
+            print(
+                f"[{done}/{len(futures)}] sensor {stats['sensor_id']}: "
+                f"{stats['rows']} rows, {stats['rows_per_sec']:.0f} rows/s in worker; "
+                f"total {n_rows} rows, {n_rows / elapsed:.0f} rows/s",
+                flush=True,
+            )
+    elapsed = time.perf_counter() - start_time
+    return {
+        "sensors": len(sensor_ids),
+        "rows": n_rows,
+        "seconds": elapsed,
+        "rows_per_sec": n_rows / elapsed if elapsed else 0.0,
+        "seed": seed,
+    }
+
+
+def simulate_worker(
+    worker_idx: int,
+    sensor_ids: list[int],
+    limits: list[float],
+    rate: float,
+    flush_interval: float,
+    duration: float,
+    report_interval: float,
+    report_queue,
+    seed: int,
+) -> None:
+    """
+    Непрерывная запись текущих значений датчиков с заданной скоростью,
+    выполняется в процессе пула. Значения копятся и пишутся раз в flush_interval,
+    статистика отправляется в report_queue раз в report_interval:
+    (worker_idx, записано строк, задержки записи за интервал, отставание, завершён)
+    """
+    rng = np.random.default_rng([seed, worker_idx])
+    sensor_ids = np.asarray(sensor_ids, dtype=np.int64)
+    limits = np.asarray(limits, dtype=np.float64)
+    level = rng.uniform(0.2, 0.6, len(sensor_ids)) * limits
+    # one flush never writes more than 10 flush intervals of rows, the rest is backlog
+    max_batch = max(int(rate * flush_interval * 10), 1)
+    qc = queryComposer("sensor_logs", conn=_worker_conn)
+    start = time.perf_counter()
+    prev_wall = np.datetime64(datetime.datetime.now(), "us")
+    next_flush = start + flush_interval
+    last_report = start
+    written = 0
+    position = 0
+    latencies = []
+    while True:
+        now = time.perf_counter()
+        if now - start >= duration:
+            break
+        if next_flush > now:
+            time.sleep(next_flush - now)
+            now = time.perf_counter()
+        next_flush = max(next_flush + flush_interval, now)
+        n_rows = min(int(rate * (now - start)) - written, max_batch)
+        if n_rows > 0:
+            # samples are spread over the time since the previous flush
+            wall = np.datetime64(datetime.datetime.now(), "us")
+            step = (wall - prev_wall) / n_rows
+            times = prev_wall + (np.arange(1, n_rows + 1) * step).astype(
+                "timedelta64[us]"
+            )
+            prev_wall = wall
+            idx = (position + np.arange(n_rows)) % len(sensor_ids)
+            position = (position + n_rows) % len(sensor_ids)
+            level = np.clip(level + rng.normal(0, 0.01, len(level)) * limits, 0, limits)
+            values = level[idx] + rng.normal(0, 0.002, n_rows) * limits[idx]
+            flush_start = time.perf_counter()
+            qc.bulk_insert_columns(
+                {
+                    "sensor_id": sensor_ids[idx],
+                    "log_datetime": times,
+                    "sensor_value": values,
+                }
+            )
+            latencies.append(time.perf_counter() - flush_start)
+            written += n_rows
+        if now - last_report >= report_interval:
+            backlog = int(rate * (time.perf_counter() - start)) - written
+            report_queue.put((worker_idx, written, latencies, backlog, False))
+            latencies = []
+            last_report = now
+    backlog = int(rate * (time.perf_counter() - start)) - written
+    report_queue.put((worker_idx, written, latencies, backlog, True))
+
+
+def run_simulation(
+    sensor_ids: list[int],
+    rate: float = 1000,
+    duration: float = 60,
+    flush_interval: float = 0.5,
+    report_interval: float = 5,
+    workers: int = 1,
+    conn_params: dict = None,
+    seed: int = None,
+) -> dict:
+    """
+    Нагрузочная запись текущих значений датчиков с общей скоростью rate строк/с
+
+    :param sensor_ids: коды датчиков, None - все датчики
+    :type sensor_ids: list[int]
+    :param rate: общая скорость записи, строк/с, defaults to 1000
+    :type rate: float, optional
+    :param duration: длительность, с, defaults to 60
+    :type duration: float, optional
+    :param flush_interval: период записи пачки, с, defaults to 0.5
+    :type flush_interval: float, optional
+    :param report_interval: период отчёта, с, defaults to 5
+    :type report_interval: float, optional
+    :param workers: количество пишущих процессов, defaults to 1
+    :type workers: int, optional
+    :param conn_params: параметры подключения процессов, defaults to DEFAULT_CONNECTION_PARAMS
+    :type conn_params: dict, optional
+    :param seed: seed генерации значений, defaults to None (случайный)
+    :type seed: int, optional
+    :return: итоговая статистика: строки, скорость, задержки записи (с), отставание
+    :rtype: dict
+    """
+    if seed is None:
+        seed = new_seed()
+    conn_params = DEFAULT_CONNECTION_PARAMS if conn_params is None else conn_params
+    qc = queryComposer("sensor")
+    sensors = qc.select_query(columns=["sensor_id", "limit_mode_value"])
+    qc.close_connection()
+    limits = {sensor["sensor_id"]: sensor["limit_mode_value"] for sensor in sensors}
+    if sensor_ids is None:
+        sensor_ids = sorted(limits)
+    missing = [sensor_id for sensor_id in sensor_ids if sensor_id not in limits]
+    if missing:
+        raise ValueError(f"Unknown sensor_id: {missing}")
+    workers = max(min(workers, len(sensor_ids)), 1)
+    ensure_sensor_logs_partitions(ahead_days=duration / 86400 + 1)
+
+    manager = multiprocessing.Manager()
+    report_queue = manager.Queue()
+    written = [0] * workers
+    backlog = [0] * workers
+    all_latencies = []
+    finished = 0
+    start_time = time.perf_counter()
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers, initializer=init_worker, initargs=(conn_params,)
+    ) as executor:
+        futures = [
+            executor.submit(
+                simulate_worker,
+                worker_idx,
+                part.tolist(),
+                [limits[sensor_id] for sensor_id in part.tolist()],
+                rate / workers,
+                flush_interval,
+                duration,
+                report_interval,
+                report_queue,
+                seed,
+            )
+            for worker_idx, part in enumerate(np.array_split(sensor_ids, workers))
+        ]
+        window_start = start_time
+        window_rows = 0
+        window_latencies = []
+        while finished < workers:
+            try:
+                worker_idx, rows, latencies, lag, done = report_queue.get(timeout=1)
+            except queue.Empty:
+                # a worker that failed never reports completion
+                failed = [f for f in futures if f.done() and f.exception()]
+                if failed:
+                    raise failed[0].exception()
+                continue
+            window_rows += rows - written[worker_idx]
+            written[worker_idx] = rows
+            backlog[worker_idx] = lag
+            window_latencies.extend(latencies)
+            all_latencies.extend(latencies)
+            finished += done
+            now = time.perf_counter()
+            if now - window_start >= report_interval or finished == workers:
+                p50, p95, p99 = (
+                    np.percentile(window_latencies, [50, 95, 99]) * 1000
+                    if window_latencies
+                    else (0, 0, 0)
+                )
+                print(
+                    f"[{now - start_time:6.1f} s] {sum(written)} rows, "
+                    f"{window_rows / (now - window_start):.0f} rows/s "
+                    f"(target {rate:.0f}); flush p50/p95/p99 "
+                    f"{p50:.1f}/{p95:.1f}/{p99:.1f} ms; backlog {sum(backlog)} rows",
+                    flush=True,
+                )
+                window_start = now
+                window_rows = 0
+                window_latencies = []
+    elapsed = time.perf_counter() - start_time
+    manager.shutdown()
+    n_rows = sum(written)
+    return {
+        "rows": n_rows,
+        "seconds": elapsed,
+        "rows_per_sec": n_rows / elapsed if elapsed else 0.0,
+        "latency": dict(
+            zip(
+                ["p50", "p95", "p99"],
+                (
+                    np.percentile(all_latencies, [50, 95, 99]).tolist()
+                    if all_latencies
+                    else [0.0, 0.0, 0.0]
+                ),
+            )
+        ),
+        "backlog": sum(backlog),
+        "seed": seed,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Генерация значений датчиков для нагрузочной базы"
+    )
+    parser.add_argument(
+        "--sensors",
+        default=None,
+        help='коды датчиков, например "1,2,10-20" (по умолчанию все)',
+    )
+    parser.add_argument("--days", type=int, default=7, help="глубина истории, дней")
+    parser.add_argument(
+        "--interval", type=int, default=5, help="шаг значений на 2 часа вперёд, с"
+    )
+    parser.add_argument("--scenario", choices=SCENARIOS, default="normal")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--clear",
+        action="store_true",
+        help="удалить значения датчиков за генерируемый период",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="seed генерации, одинаковый seed даёт одинаковые ряды",
+    )
+    parser.add_argument(
+        "--live", action="store_true", help="непрерывная запись текущих значений"
+    )
+    parser.add_argument(
+        "--rate", type=float, default=1000, help="общая скорость записи, строк/с"
+    )
+    parser.add_argument("--duration", type=float, default=60, help="длительность, с")
+    parser.add_argument(
+        "--flush", type=float, default=0.5, help="период записи пачки, с"
+    )
+    args = parser.parse_args()
+    sensor_ids = None if args.sensors is None else parse_sensor_ids(args.sensors)
+    if args.live:
+        result = run_simulation(
+            sensor_ids,
+            rate=args.rate,
+            duration=args.duration,
+            flush_interval=args.flush,
+            workers=args.workers or 1,
+            seed=args.seed,
+        )
+        print(
+            f"Done: {result['rows']} rows in {result['seconds']:.1f} s "
+            f"({result['rows_per_sec']:.0f} rows/s), flush p50/p95/p99 "
+            f"{result['latency']['p50'] * 1000:.1f}/{result['latency']['p95'] * 1000:.1f}"
+            f"/{result['latency']['p99'] * 1000:.1f} ms, backlog {result['backlog']} rows, "
+            f"seed {result['seed']}"
+        )
+        raise SystemExit
+    result = run_batch(
+        sensor_ids,
+        days=args.days,
+        interval=args.interval,
+        scenario=args.scenario,
+        workers=args.workers,
+        clear=args.clear,
+        seed=args.seed,
+    )
+    print(
+        f"Done: {result['sensors']} sensors, {result['rows']} rows in "
+        f"{result['seconds']:.1f} s ({result['rows_per_sec']:.0f} rows/s), "
+        f"seed {result['seed']}"
+    )
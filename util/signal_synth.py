@@ -0,0 +1,366 @@
+"""
+Синтез значений датчиков для генератора логов.
+Все функции работают с массивами целиком: одномерный ряд или пачка рядов
+формы (количество датчиков, количество точек). Случайные значения берутся
+из numpy.random.Generator, поэтому результат воспроизводим при заданном seed
+"""
+
+import datetime
+import time
+
+import numpy as np
+
+
+def make_rng(rng=None) -> np.random.Generator:
+    """
+    Генератор случайных чисел: готовый Generator, seed или None (случайный seed)
+
+    :param rng: Generator или seed, defaults to None
+    :type rng: np.random.Generator | int, optional
+    :rtype: np.random.Generator
+    """
+    if isinstance(rng, np.random.Generator):
+        return rng
+    return np.random.default_rng(rng)
+
+
+def moving_average(series: np.ndarray, window_size: int) -> np.ndarray:
+    """
+    Скользящее среднее по последней оси с продолжением краёв,
+    длина результата len + window_size - 1
+
+    :param series: ряд или пачка рядов
+    :type series: np.ndarray
+    :param window_size: ширина окна
+    :type window_size: int
+    :rtype: np.ndarray
+    """
+    pad = [(0, 0)] * (series.ndim - 1) + [(window_size - 1, window_size - 1)]
+    padded = np.pad(series, pad, mode="edge")
+    csum = np.cumsum(padded, axis=-1)
+    csum = np.concatenate([np.zeros(csum.shape[:-1] + (1,)), csum], axis=-1)
+    return (csum[..., window_size:] - csum[..., :-window_size]) / window_size
+
+
+def resample(series: np.ndarray, num_points: int) -> np.ndarray:
+    """
+    Линейная интерполяция рядов по последней оси до num_points точек
+
+    :param series: ряд или пачка рядов
+    :type series: np.ndarray
+    :param num_points: количество точек результата
+    :type num_points: int
+    :rtype: np.ndarray
+    """
+    n_src = series.shape[-1]
+    pos = np.linspace(0, n_src - 1, num_points)
+    left = (
+        np.minimum(pos.astype(np.int64), n_src - 2)
+        if n_src > 1
+        else np.zeros(num_points, dtype=np.int64)
+    )
+    right = np.minimum(left + 1, n_src - 1)
+    frac = pos - left
+    return series[..., left] * (1 - frac) + series[..., right] * frac
+
+
+def generate_smooth_curve(
+    start, end, num_points: int, window_size: int = 10, n_series: int = None, rng=None
+) -> np.ndarray:
+    """
+    Сглаженный случайный ряд со значениями между start и end
+
+    :param start: нижняя граница значений (число или массив на каждый ряд)
+    :param end: верхняя граница значений (число или массив на каждый ряд)
+    :param num_points: количество точек
+    :type num_points: int
+    :param window_size: окно сглаживания, defaults to 10
+    :type window_size: int, optional
+    :param n_series: количество рядов, defaults to None (один ряд)
+    :type n_series: int, optional
+    :param rng: Generator или seed, defaults to None
+    :return: ряд (num_points,) или пачка (n_series, num_points)
+    :rtype: np.ndarray
+    """
+    rng = make_rng(rng)
+    if n_series is None:
+        y = rng.uniform(start, end, num_points)
+    else:
+        start = np.asarray(start, dtype=np.float64).reshape(-1, 1)
+        end = np.asarray(end, dtype=np.float64).reshape(-1, 1)
+        y = start + (end - start) * rng.random((n_series, num_points))
+    return resample(moving_average(y, window_size), num_points)
+
+
+def gradient_walk(
+    time_step: float,
+    arr_size: int,
+    max_value: float,
+    st_pos: float = None,
+    grad_adjustment: float = 1,
+    n_series: int = None,
+    rng=None,
+) -> np.ndarray:
+    """
+    Кусочно-линейное случайное блуждание: наклон постоянен на участках
+    случайной длины (до 5% ряда). На границах 0 и max_value ряд отражается
+
+    :param time_step: шаг по времени
+    :type time_step: float
+    :param arr_size: количество точек
+    :type arr_size: int
+    :param max_value: верхняя граница значений
+    :type max_value: float
+    :param st_pos: начальное значение, defaults to None (случайное)
+    :type st_pos: float, optional
+    :param grad_adjustment: множитель наклона, defaults to 1
+    :type grad_adjustment: float, optional
+    :param n_series: количество рядов, defaults to None (один ряд)
+    :type n_series: int, optional
+    :param rng: Generator или seed, defaults to None
+    :return: ряд (arr_size,) или пачка (n_series, arr_size)
+    :rtype: np.ndarray
+    """
+    rng = make_rng(rng)
+    shape = (1 if n_series is None else n_series, arr_size)
+    max_len = max(int(0.05 * arr_size / grad_adjustment), 2)
+    # upper bound of segments needed, every segment is at least 1 step long
+    n_segments = arr_size
+    lengths = rng.integers(1, max_len, (shape[0], n_segments))
+    slopes = (
+        grad_adjustment
+        * (rng.random((shape[0], n_segments)) - 0.5)
+        * 0.01
+        * max_value
+        / time_step
+    )
+    # segment index of every step: number of segment ends passed so far
+    ends = np.cumsum(lengths, axis=1)
+    rows, cols = np.nonzero(ends < arr_size)
+    boundary = np.zeros(shape, dtype=np.int64)
+    boundary[rows, ends[rows, cols]] = 1
+    seg_idx = np.cumsum(boundary, axis=1)
+    increments = time_step * np.take_along_axis(slopes, seg_idx, axis=1)
+    if st_pos is None:
+        st_pos = rng.uniform(0, max_value, (shape[0], 1))
+    increments[:, 0] = 0
+    walk = st_pos + np.cumsum(increments, axis=1)
+    # reflection at 0 and max_value (triangle wave folding)
+    period = 2 * max_value
+    walk = np.mod(walk, period)
+    walk = np.where(walk > max_value, period - walk, walk)
+    return walk[0] if n_series is None else walk
+
+
+def add_drift(series: np.ndarray, total_drift, rng=None) -> np.ndarray:
+    """
+    Линейный дрейф показаний: к концу ряда смещение достигает total_drift.
+    Если rng задан, дрейф каждого ряда случайный в пределах ±total_drift
+
+    :param series: ряд или пачка рядов
+    :type series: np.ndarray
+    :param total_drift: смещение в конце ряда (число или массив на каждый ряд)
+    :param rng: Generator или seed, defaults to None
+    :rtype: np.ndarray
+    """
+    total_drift = np.asarray(total_drift, dtype=np.float64)
+    if series.ndim > 1:
+        total_drift = total_drift.reshape(-1, 1)
+    if rng is not None:
+        total_drift = total_drift * make_rng(rng).uniform(
+            -1, 1, series.shape[:-1] + (1,) if series.ndim > 1 else None
+        )
+    return series + total_drift * np.linspace(0, 1, series.shape[-1])
+
+
+def inject_drop(
+    smooth_curve: np.ndarray,
+    break_value,
+    rise_part: float = 5,
+    drop_part: float = 5,
+    rng=None,
+) -> None:
+    """
+    Отказ датчика (изменяет ряд на месте): с 20-40% длины значение растёт
+    до break_value за 1/rise_part ряда, затем падает в 0 на 1/drop_part ряда.
+    Большой rise_part даёт внезапный отказ, малый - плавный
+
+    :param smooth_curve: ряд или пачка рядов
+    :type smooth_curve: np.ndarray
+    :param break_value: значение перед отказом (число или массив на каждый ряд)
+    :param rise_part: доля ряда на рост, defaults to 5
+    :type rise_part: float, optional
+    :param drop_part: доля ряда на нулевые значения, defaults to 5
+    :type drop_part: float, optional
+    :param rng: Generator или seed, defaults to None
+    """
+    rng = make_rng(rng)
+    curves = smooth_curve.reshape(-1, smooth_curve.shape[-1])
+    n_rows, n_arr = curves.shape
+    break_value = np.broadcast_to(
+        np.asarray(break_value, dtype=np.float64).reshape(-1), (n_rows,)
+    )
+    # calculate point where thing start getting weird
+    break_point = rng.random(n_rows) / 5 + 0.2
+    rise_pos = (n_arr * break_point).astype(np.int64)
+    drop_pos = (rise_pos + n_arr / rise_part).astype(np.int64)
+    up_pos = (drop_pos + n_arr / drop_part).astype(np.int64)
+    avg_val = curves.mean(axis=1)
+    pos = np.arange(n_arr)
+    # gradual rise, same as np.linspace(0, break_value - avg_val, drop_pos - rise_pos)
+    rise_len = np.maximum(drop_pos - rise_pos - 1, 1)
+    in_rise = (pos >= rise_pos[:, None]) & (pos < drop_pos[:, None])
+    ramp = (pos - rise_pos[:, None]) / rise_len[:, None]
+    ramp = ramp * (break_value - avg_val)[:, None]
+    curves += np.where(in_rise, ramp, 0)
+    # zero section
+    curves[(pos >= drop_pos[:, None]) & (pos < up_pos[:, None])] = 0
+
+
+def sigmoid_rejection(arr_size: int, max_value: float) -> np.ndarray:
+    """Плавный выход к 0.9 max_value по логистической кривой"""
+    x = np.linspace(0, 100, arr_size)
+    return max_value * 0.9 / (1 + np.exp(-0.1 * x))
+
+
+def sharp_rejection(
+    arr_size: int, max_value: float, pos: float = 0.2, rng=None
+) -> np.ndarray:
+    """Скачок: до pos блуждание ниже 0.5 max_value, после - около 0.8..1.0 max_value"""
+    rng = make_rng(rng)
+    bf_br_n = int(pos * arr_size)
+    af_br_n = arr_size - bf_br_n
+    before = gradient_walk(100 / bf_br_n, bf_br_n, max_value * 0.5, rng=rng)
+    after = max_value * 0.8 + gradient_walk(
+        100 / af_br_n, af_br_n, max_value * 0.2, rng=rng
+    )
+    return np.concatenate([before, after])
+
+
+def sensor_batch(
+    limit_values,
+    num_points: int,
+    scenario: str = "normal",
+    window_size: int = 10,
+    rng=None,
+) -> np.ndarray:
+    """
+    Пачка рядов для нескольких датчиков: сглаженный сигнал 20-60% предела,
+    для сценариев smooth_drop и sudden_drop с отказом
+
+    :param limit_values: предельные значения датчиков
+    :param num_points: количество точек каждого ряда
+    :type num_points: int
+    :param scenario: normal, smooth_drop или sudden_drop, defaults to "normal"
+    :type scenario: str, optional
+    :param rng: Generator или seed, defaults to None
+    :return: пачка (количество датчиков, num_points)
+    :rtype: np.ndarray
+    """
+    rng = make_rng(rng)
+    limits = np.asarray(limit_values, dtype=np.float64)
+    batch = generate_smooth_curve(
+        0.2 * limits, 0.6 * limits, num_points, window_size, len(limits), rng
+    )
+    if scenario == "smooth_drop":
+        inject_drop(batch, 0.85 * limits, 2, 10, rng)
+    elif scenario == "sudden_drop":
+        inject_drop(batch, 0.85 * limits, 20, 10, rng)
+    elif scenario != "normal":
+        raise ValueError("Invalid scenario param")
+    return batch
+
+
+# work modes of build_sensor_series
+SCENARIOS = ("normal", "smooth_drop", "sudden_drop")
+
+
+def build_sensor_series(
+    limit_value: float,
+    c_time: datetime.datetime,
+    interval: int,
+    scenario: str = "normal",
+    days: int = 7,
+    rng=None,
+):
+    """
+    Значения датчика за прошлые days дней и на 2 часа вперёд от c_time:
+    первые days - 1 дней с шагом 10 минут, последние сутки без часа с шагом
+    2 минуты, последний час с шагом 5 секунд, 2 часа вперёд с шагом interval
+
+    :param limit_value: предельное значение датчика
+    :type limit_value: float
+    :param c_time: текущее время
+    :type c_time: datetime.datetime
+    :param interval: шаг значений на 2 часа вперёд, с
+    :type interval: int
+    :param scenario: режим работы из SCENARIOS, defaults to "normal"
+    :type scenario: str, optional
+    :param days: глубина истории в днях, defaults to 7
+    :type days: int, optional
+    :param rng: numpy.random.Generator или seed, defaults to None
+    :type rng: np.random.Generator | int, optional
+    :return: время (datetime64[us]) и значения (float64)
+    :rtype: tuple(np.ndarray, np.ndarray)
+    """
+    if scenario not in SCENARIOS:
+        raise ValueError("Invalid scenario param")
+    rng = make_rng(rng)
+    c_time = np.datetime64(c_time, "us")
+    day = np.timedelta64(1, "D")
+    hour = np.timedelta64(1, "h")
+    segments = []
+
+    # record each 10 minutes for the first days of the history
+    dtime = 10 * 60
+    out_val = generate_smooth_curve(
+        0.2 * limit_value,
+        0.6 * limit_value,
+        int((days - 1) * 24 * 60 * 60 / dtime),
+        rng=rng,
+    )
+    # apply workmode
+    if scenario == "smooth_drop":
+        inject_drop(out_val, 0.85 * limit_value, 2, 10, rng)
+    elif scenario == "sudden_drop":
+        inject_drop(out_val, 0.85 * limit_value, 20, 10, rng)
+    segments.append((c_time - days * day, dtime, out_val))
+    # 2 minute interval for the first 23 hours of the last day
+    dtime = 60 * 2
+    out_val = generate_smooth_curve(
+        0.19 * limit_value, 0.59 * limit_value, int(23 * 60 * 60 / dtime), rng=rng
+    )
+    segments.append((c_time - day, dtime, out_val))
+    # hour before generation, 5 seconds for better resolution
+    dtime = 5
+    out_val = generate_smooth_curve(
+        0.1 * limit_value, 0.5 * limit_value, int(60 * 60 / dtime), rng=rng
+    )
+    segments.append((c_time - hour, dtime, out_val))
+    # data for further 2 hours
+    out_val = generate_smooth_curve(
+        0.05 * limit_value, 0.65 * limit_value, int(2 * 60 * 60 / interval), rng=rng
+    )
+    segments.append((c_time, interval, out_val))
+
+    times = np.concatenate(
+        [
+            start + np.arange(len(val)) * np.timedelta64(dtime, "s")
+            for start, dtime, val in segments
+        ]
+    )
+    values = np.concatenate([val for _, _, val in segments])
+    return times, values
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    limits = rng.uniform(10, 1000, 1000)
+    for name, func in (
+        ("smooth batch", lambda: sensor_batch(limits, 1000, "smooth_drop", rng=rng)),
+        ("walk batch", lambda: gradient_walk(5, 1000, 100, n_series=1000, rng=rng)),
+    ):
+        begin = time.perf_counter()
+        out = func()
+        elapsed = time.perf_counter() - begin
+        print(f"{name}: {out.size} points in {elapsed * 1000:.1f} ms")